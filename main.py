@@ -17,7 +17,8 @@ from PySide6.QtGui import QAction, QDesktopServices, QColor, QPalette, QUndoStac
 from PySide6.QtCore import Qt, QTimer, QUrl, QSettings, QSize, QPropertyAnimation, QEasingCurve, QRect, QEvent, QPoint, QThread, Signal, QPointF
 
 from src.core.language_manager import LanguageManager, tr
-from src.core.workers import SceneLoaderWorker
+from src.core.workers import SceneLoaderWorker, TileBuildWorker
+from src.core.scene_prefetcher import ScenePrefetcher
 from src.gui.effects import HoverEffectFilter
 from src.core.telemetry import telemetry
 
@@ -280,6 +281,12 @@ class MainWindow(QMainWindow):
         if hasattr(self.sample_list, "scene_structure_changed"):
             self.sample_list.scene_structure_changed.connect(self.on_channel_added)
         self.sample_dock.setWidget(self.sample_list)
+        
+        # Neighbour-scene prefetch into the scene cache (next/previous in list order, hovered samples)
+        self.scene_prefetcher = ScenePrefetcher(self.project_model, self.sample_list.get_scene_order, self)
+        # Builds tile pyramids of large flat images after their scenes are loaded (created here: GUI thread)
+        self.tile_build_worker = TileBuildWorker.instance()
+        self.sample_list.scene_hovered.connect(self.scene_prefetcher.note_hover)
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.sample_dock)
         
         # Unified minimum width for docks to allow extreme compression
@@ -1820,6 +1827,13 @@ class MainWindow(QMainWindow):
             from src.core.performance_monitor import PerformanceMonitor
             PerformanceMonitor.instance().stop()
             
+            if hasattr(self, 'scene_prefetcher'):
+                self.scene_prefetcher.shutdown()
+            if hasattr(self, 'tile_build_worker'):
+                self.tile_build_worker.stop()
+            if hasattr(self, 'sample_list'):
+                self.sample_list.shutdown_scan()
+            
             # --- Save UI State (Geometry, Docks, Splitters) ---
             settings = QSettings("FluoQuantPro", "Window")
             settings.setValue("geometry", self.saveGeometry())
@@ -1858,6 +1872,7 @@ class MainWindow(QMainWindow):
             
             # Set Root Path
             self.project_model.set_root_path(folder)
+            self._update_cache_dirs()
             
             self.sample_list.refresh_list()
             self.sample_list.refresh_pool_list()
@@ -1987,7 +2002,6 @@ class MainWindow(QMainWindow):
                 ch.file_path = ""
                 ch.update_data(np.zeros((1, 1), dtype=np.uint16))
                 ch.is_placeholder = True
-                ch.stats = {}
                 self.session.data_changed.emit()
                 self.update_all_view_containers(ch_index)
 
@@ -2066,6 +2080,7 @@ class MainWindow(QMainWindow):
         # Load
         if self.project_model.load_project(folder):
             self.current_project_path = folder
+            self._update_cache_dirs()
             self.sample_list.refresh_list()
             self.sample_list.refresh_pool_list()
             self.initialize_all_views()
@@ -2122,8 +2137,14 @@ class MainWindow(QMainWindow):
                  return False
         
         self.project_model.set_root_path(folder)
+        self._update_cache_dirs()
         return self.save_project()
 
+    def _update_cache_dirs(self):
+        """Points the shared thumbnail cache at the current project's .cache directory."""
+        from src.core.thumbnail_service import ThumbnailService
+        ThumbnailService.instance().set_cache_dir(self.project_model.get_cache_path())
+
     def save_project(self, manual: bool = True) -> bool:
         """
         Saves project structure and current scene state.
@@ -2334,9 +2355,12 @@ class MainWindow(QMainWindow):
                 try:
                     # Use robust ImageLoader instead of raw imread
                     from src.core.image_loader import ImageLoader
-                    data, is_rgb = ImageLoader.load_image(file_path)
+                    # Pyramidal slides and Z/T stacks stay lazy; only the overview level or
+                    # the max projection is decoded
+                    data, stack, pyramid = ImageLoader.open_source(file_path, overview_dim=ImageChannel.OVERVIEW_DIM)
+                    lazy = stack is not None or pyramid is not None
                     
-                    if data is not None:
+                    if data is not None and not lazy:
                             if data.ndim == 3 and data.shape[2] == 3:
                                 data = cv2.cvtColor(data, cv2.COLOR_BGR2RGB)
                             elif data.ndim == 3 and data.shape[2] == 4:
@@ -2344,20 +2368,23 @@ class MainWindow(QMainWindow):
 
                     if data is not None:
                         # Handle preprocessing (Max Projection)
-                        if data.ndim == 3 and data.shape[0] < 10:
+                        if not lazy and data.ndim == 3 and data.shape[0] < 10:
                              data = np.max(data, axis=0) # Z-stack max proj
-                        elif data.ndim == 3 and data.shape[2] < 10 and data.shape[2] not in (3,4):
+                        elif not lazy and data.ndim == 3 and data.shape[2] < 10 and data.shape[2] not in (3,4):
                              data = np.max(data, axis=2)
                              
                         # Update Session Channel
                         ch = self.session.channels[ch_index]
                         ch.file_path = file_path
-                        ch.update_data(data)
+                        if lazy and data.ndim == 3:
+                            data = ImageLoader.extract_channel_data(data, ch.name)
+                        ch.update_data(data, modified=False) # The new file's own data
+                        if stack is not None:
+                            ch.attach_stack(stack)
+                        if pyramid is not None:
+                            ch.attach_pyramid(pyramid)
                         ch.is_placeholder = False
                         
-                        from src.core.analysis import calculate_channel_stats
-                        ch.stats = calculate_channel_stats(data)
-                        
                         # INHERIT SETTINGS: Check if this file has existing settings in the project model pool
                         pool_settings = self.project_model.pool_display_settings.get(os.path.normpath(file_path))
                         if pool_settings:
@@ -2388,6 +2415,9 @@ class MainWindow(QMainWindow):
         if self.current_scene_id == scene_id and not force:
            return
         
+        # User navigated: abandon background prefetching immediately (a prefetch of this scene is adopted below)
+        self.scene_prefetcher.cancel(keep_scene=scene_id)
+        
         # Stop any existing loader
         if self.loader_worker and self.loader_worker.isRunning():
             self.loader_worker.stop()
@@ -2407,18 +2437,12 @@ class MainWindow(QMainWindow):
         if not scene_data:
              return
 
-        # Update Cache Manager Early (so cleanup knows what to keep)
+        # Update Cache Manager Early (so cleanup knows what to keep).
+        # The cache evicts background scenes against its own byte budget; process-wide
+        # memory pressure is still handled by PerformanceMonitor's heartbeat.
         from src.core.cache_manager import SceneCacheManager
         SceneCacheManager.instance().set_current_scene(scene_id)
 
-        # USER REQUEST: Respect performance settings for cache clearing
-        if hasattr(self, 'perf_monitor') and self.perf_monitor.auto_cleanup_enabled:
-            # Trigger a cleanup before loading a new scene to free up space
-            # This ensures we don't hit the threshold MID-loading which is slower
-            # UPDATE: Only trigger if actually needed (User request "too aggressive")
-            if SceneCacheManager.instance().should_cleanup_memory():
-                self.perf_monitor.trigger_cleanup()
-
         # 1. Check Scene Cache FIRST
         cached_channels = SceneCacheManager.instance().get_scene(scene_id)
         
@@ -2450,8 +2474,13 @@ class MainWindow(QMainWindow):
             self.on_scene_loading_finished(scene_id)
             return
 
-        # 3. If Not Cached, Start Async Loader
-        self.loader_worker = SceneLoaderWorker(scene_id, scene_data.channels)
+        # 3. If a prefetch of this scene is already in flight, take it over rather than starting again
+        if self.scene_prefetcher.hand_over(scene_id, self.on_channel_loaded, self.on_scene_loading_finished):
+            Logger.info(f"[UI] Adopted in-flight prefetch of scene {scene_id}")
+            return
+
+        # 4. If Not Cached, Start Async Loader
+        self.loader_worker = SceneLoaderWorker(scene_id, scene_data.channels, cache_dir=self.project_model.get_cache_path())
         self.loader_worker.channel_loaded.connect(self.on_channel_loaded)
         self.loader_worker.finished_loading.connect(self.on_scene_loading_finished)
         self.loader_worker.start()
@@ -2580,6 +2609,7 @@ class MainWindow(QMainWindow):
         finally:
             self.hide_view_loading()
             self.lbl_status.setText(tr("Scene loaded: {0}").format(scene_id))
+            self.scene_prefetcher.scene_ready(scene_id)
 
     def update_point_counter_targets(self):
         """Populates the point counter channel combo with current session channels."""
@@ -3013,8 +3043,8 @@ class MainWindow(QMainWindow):
         # Check bounds
         img_h, img_w = 0, 0
         for ch in self.session.channels:
-            if ch.raw_data is not None:
-                img_h, img_w = ch.raw_data.shape[:2]
+            if ch.has_data:
+                img_h, img_w = ch.shape[:2]
                 break
         
         if img_h > 0 and img_w > 0:
@@ -3664,7 +3694,7 @@ class MainWindow(QMainWindow):
         # Check bounds using the first valid channel
         ref_ch = None
         for ch in self.session.channels:
-            if ch.raw_data is not None:
+            if ch.has_data:
                 ref_ch = ch
                 break
         
@@ -3678,10 +3708,10 @@ class MainWindow(QMainWindow):
             # Get intensity for all channels
             intensities = []
             for i, ch in enumerate(self.session.channels):
-                if ch.raw_data is not None:
+                if ch.has_data:
                     try:
-                        # raw_data could be 2D (H, W)
-                        val = ch.raw_data[y, x]
+                        # raw_data could be 2D (H, W); pyramids read the pixel from the base level tile
+                        val = ch.sample_value(y, x)
                         intensities.append(f"{ch.name}: {val}")
                     except:
                         pass
@@ -3830,7 +3860,6 @@ class MainWindow(QMainWindow):
         # UI Feedback
         self.lbl_status.setText(tr("Processing Enhancement..."))
         Logger.debug("[Main] Display settings changed -> preview render")
-        QApplication.processEvents()
         
         # PERSIST SETTINGS
         for ch in self.session.channels:
@@ -3843,6 +3872,7 @@ class MainWindow(QMainWindow):
                 }
         
         # --- AUTOMATIC: Refresh Active View Container ---
+        # The preview renders on the container's render scheduler; a newer change supersedes it
         container = self.get_active_view_container()
         if hasattr(container, 'render_all'):
             container.render_all(preview=True)
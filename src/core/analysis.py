@@ -2,6 +2,7 @@ import numpy as np
 import cv2
 from typing import List, Dict, Optional, Tuple
 from src.core.data_model import ImageChannel
+from src.core.channel_stats import ChannelStats
 from src.core.roi_model import ROI
 from src.core.algorithms import qpath_to_mask
 from src.core.channel_config import get_rgb_mapping
@@ -203,18 +204,13 @@ class MeasureEngine:
 
 def calculate_channel_stats(data: np.ndarray) -> dict:
     """
-    Calculates basic statistics for a channel's raw data.
-    Used for auto-contrast and histogram.
+    Calculates basic statistics for arbitrary data.
+    For a channel's own data use ImageChannel.get_stats(), which is cached per data version.
     """
     if data is None or data.size == 0:
         return {'min': 0, 'max': 0, 'mean': 0, 'std': 0}
         
-    return {
-        'min': float(np.min(data)),
-        'max': float(np.max(data)),
-        'mean': float(np.mean(data)),
-        'std': float(np.std(data))
-    }
+    return ChannelStats(data).as_dict()
 
 class ColocalizationEngine:
     """
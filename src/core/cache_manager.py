@@ -1,8 +1,9 @@
-import time
+from collections import OrderedDict
 from typing import Dict, List, Optional
 from PySide6.QtCore import QObject, QSettings
 from src.core.data_model import ImageChannel
 from src.core.logger import Logger
+from src.core.spill_cache import EvictedChannelStore
 
 try:
     import psutil
@@ -14,224 +15,221 @@ class SceneCacheManager(QObject):
     """
     Manages caching of ImageChannel objects to prevent unnecessary reloading
     and control memory usage based on user settings.
+    Cached scenes are kept in least-recently-used order and accounted by the exact
+    bytes their channels hold (ImageChannel.memory_bytes); background scenes are
+    evicted oldest-first until the cache fits the configured byte budget.
+    The current scene is never evicted. The "all" policy (Aggressive Pre-cache) is not
+    bound by the budget: its scenes are only released on low memory (handle_low_memory).
+    Raw data of evicted channels is handed to EvictedChannelStore, so reopening a recently
+    evicted scene skips decoding.
     """
     _instance = None
-    
+
+    BUDGET_KEY = "performance/scene_cache_budget_mb"
+    MIN_BUDGET_MB = 256
+
     def __init__(self):
         super().__init__()
-        self._cache: Dict[str, List[ImageChannel]] = {}
+        self._cache: "OrderedDict[str, List[ImageChannel]]" = OrderedDict() # LRU first
+        self._sizes: Dict[str, int] = {} # scene_id -> bytes at last measurement
         self._current_scene_id: Optional[str] = None
         self._settings = QSettings("FluoQuantPro", "Settings")
-        
+
     @classmethod
     def instance(cls):
         if cls._instance is None:
             cls._instance = cls()
         return cls._instance
-        
+
+    @staticmethod
+    def default_budget_mb() -> int:
+        """A quarter of physical RAM, capped at 4 GB (2 GB if RAM is unknown)."""
+        if HAS_PSUTIL:
+            try:
+                total_mb = psutil.virtual_memory().total / (1024 * 1024)
+                return int(max(SceneCacheManager.MIN_BUDGET_MB, min(4096, total_mb * 0.25)))
+            except Exception:
+                pass
+        return 2048
+
+    def get_budget_mb(self) -> int:
+        return int(self._settings.value(self.BUDGET_KEY, self.default_budget_mb()))
+
+    def get_budget_bytes(self) -> int:
+        return self.get_budget_mb() * 1024 * 1024
+
+    def set_budget_mb(self, budget_mb: int):
+        budget_mb = max(self.MIN_BUDGET_MB, int(budget_mb))
+        self._settings.setValue(self.BUDGET_KEY, budget_mb)
+        Logger.info(f"[Cache] Scene cache budget set to {budget_mb} MB")
+        self.enforce_budget()
+
+    def get_stats(self) -> dict:
+        """Cached scene count, bytes in use (last measurement) and the budget in bytes."""
+        return {
+            "scenes": len(self._cache),
+            "bytes": sum(self._sizes.values()),
+            "budget": self.get_budget_bytes(),
+        }
+
     def set_current_scene(self, scene_id: str):
         self._current_scene_id = scene_id
-        
-        # Check memory status
-        is_memory_high = self.should_cleanup_memory()
         policy = self.get_policy()
+        Logger.debug(f"[Cache] set_current_scene: {scene_id}. Policy: {policy}")
 
-        Logger.debug(f"[Cache] set_current_scene: {scene_id}. Memory High: {is_memory_high}. Policy: {policy}")
+        if scene_id in self._cache:
+            self._cache.move_to_end(scene_id)
 
-        # Logic Update based on User Feedback (Aggressive Cleanup):
-        # The user explicitly requested that raw data be removed "promptly after switching".
-        # So if the policy is "current" (default), we MUST clear other scenes immediately.
-        # We no longer retain them for "fast switching" if it risks accumulation.
-        
-        if policy == "current":
-            # Strict mode: Only keep the current scene.
-            # This satisfies "timely removal" and "not accumulating".
-            Logger.info(f"[Cache] Policy is 'current'. Enforcing immediate cleanup of background scenes.")
+        if policy in ("none", "current"):
+            # Strict mode: Only keep the current scene (raw data of other scenes is released promptly).
             self.clear_all_except(scene_id)
-        
-        elif is_memory_high:
-             # For other policies (recent/all), only clear if memory is high
-             Logger.info(f"[Cache] High memory detected while switching to {scene_id}. Triggering LRU cleanup.")
-             self.handle_low_memory()
         else:
-             # Memory is fine and policy allows caching (recent/all).
-             Logger.debug(f"[Cache] Memory healthy. Retaining background scenes per policy '{policy}'.")
-
-    def should_cleanup_memory(self) -> bool:
-        try:
-            # Delegate to PerformanceMonitor which now has robust fallback logic
-            from src.core.performance_monitor import PerformanceMonitor
-            current_mb = PerformanceMonitor.instance()._get_current_memory_mb()
-            current_gb = current_mb / 1024.0
-            
-            # Read threshold from settings (consistent with PerformanceMonitor)
-            # Default fallback: 4GB
-            threshold_gb = float(self._settings.value("performance/memory_threshold_gb", 4.0))
-            
-            Logger.debug(f"[Cache] Memory Check: Current={current_gb:.2f}GB, Threshold={threshold_gb:.2f}GB")
-            
-            if current_gb > threshold_gb:
-                Logger.info(f"[Cache] Memory limit exceeded ({current_gb:.1f}GB > {threshold_gb:.1f}GB). Triggering cleanup.")
-                return True
-            return False
-        except Exception as e:
-            Logger.warning(f"[Cache] Memory check failed: {e}")
-            # If check fails, assume safe to NOT clean up? Or safe to cleanup?
-            # Safe default: Don't cleanup to avoid losing data on error, unless repeated OOM.
-            return False
+            # The previous scene just became a background scene; its caches may have grown while shown.
+            self.enforce_budget()
 
     def get_policy(self) -> str:
         # "none", "current", "recent", "all"
         return self._settings.value("display/precache_key", "current")
 
     def handle_low_memory(self):
-        """Called when memory is critically low. Implements iterative LRU cleanup."""
-        Logger.warning("[Cache] Low memory detected! Starting iterative LRU cleanup...")
-        
-        # Keys in self._cache are ordered by insertion (LRU = start of list)
-        keys = list(self._cache.keys())
-        
-        # Protect current scene
-        if self._current_scene_id and self._current_scene_id in keys:
-            keys.remove(self._current_scene_id)
-            
-        if not keys:
-            Logger.info("[Cache] No background scenes to clear.")
-            return
+        """
+        Called by PerformanceMonitor when process memory exceeds its threshold.
+        Drops all background scenes at once instead of polling memory after each eviction.
+        """
+        Logger.warning("[Cache] Low memory detected! Releasing background scenes...")
+        if self._current_scene_id is not None:
+            self.clear_all_except(self._current_scene_id)
+        else:
+            self.clear_all()
 
-        from src.core.performance_monitor import PerformanceMonitor
-        monitor = PerformanceMonitor.instance()
-        
-        cleared_count = 0
-        for scene_id in keys:
-            # Evict oldest
-            Logger.info(f"[Cache] Evicting oldest background scene: {scene_id}")
-            if scene_id in self._cache:
-                self._free_channels(self._cache[scene_id])
-                del self._cache[scene_id]
-                cleared_count += 1
-            
-            # Check if we recovered enough memory (Simple check)
-            # We assume python GC will eventually reflect this, but for now we just want to stop if we are "safe"
-            # Note: We don't force GC here because it's slow and handled by PerformanceMonitor async worker later.
-            # But to check 'current_mb', we need at least some update.
-            # We trust that removing one large scene (e.g. 500MB) is significant.
-            
-            current_mb = monitor._get_current_memory_mb()
-            if (current_mb / 1024.0) < monitor.memory_threshold_gb:
-                Logger.info(f"[Cache] Memory safe ({current_mb:.1f}MB < {monitor.memory_threshold_gb:.1f}GB). Stopping cleanup.")
-                break
-                
-        Logger.info(f"[Cache] Cleanup finished. Evicted {cleared_count} scenes.")
-        
     def store_scene(self, scene_id: str, channels: List[ImageChannel]):
-        """Stores a scene's channels in the cache based on policy."""
-        # Safety Check: If memory is high, ensure we enforce cleanup regardless of policy
-        is_memory_high = self.should_cleanup_memory()
-        Logger.debug(f"[Cache] store_scene: {scene_id}. Memory High: {is_memory_high}")
-        
-        if is_memory_high:
-             Logger.info(f"[Cache] Memory high during storage. Enforcing cleanup.")
-             self.clear_all_except(scene_id)
-
+        """Stores a scene's channels in the cache based on policy and the byte budget."""
         policy = self.get_policy()
-        
+
         if policy == "none":
             # Even if "none", we might want to ensure others are cleared
             self.clear_all()
             return
-            
+
         if policy == "current":
-            # Logic already handled by initial safety check + set_current_scene
-            self._cache[scene_id] = channels
-            
-        elif policy == "recent":
-            # Keep last 5
-            # First, add/update the current one
-            if scene_id in self._cache:
-                del self._cache[scene_id] # Remove to re-insert at end (LRU)
-            self._cache[scene_id] = channels
-            
-            # Trim if > 5
-            max_items = 5
-            if len(self._cache) > max_items:
-                # Remove oldest (first keys)
-                # We need to collect keys to remove first to avoid runtime error during iteration
-                keys = list(self._cache.keys())
-                # Keep the last 5
-                to_remove = keys[:-max_items]
-                
-                Logger.info(f"[Cache] Policy 'recent' limit reached. Clearing: {to_remove}")
-                for k in to_remove:
-                    self._free_channels(self._cache[k])
-                    del self._cache[k]
-                    
-        elif policy == "all":
-            # Keep everything
-            self._cache[scene_id] = channels
-            Logger.info(f"[Cache] Stored scene {scene_id} (Policy: all). Total cached: {len(self._cache)}")
-            
+            self.clear_all_except(scene_id)
+
+        self._cache[scene_id] = channels
+        self._cache.move_to_end(scene_id)
+        self._sizes[scene_id] = self._measure(channels)
+        Logger.info(f"[Cache] Stored scene {scene_id} ({self._sizes[scene_id] / 1024**2:.1f} MB, policy: {policy}).")
+        self.enforce_budget()
+
+    def store_prefetched(self, scene_id: str, channels: List[ImageChannel]) -> bool:
+        """
+        Stores a scene loaded ahead of time, only if it fits the remaining budget
+        (prefetching never evicts scenes). Returns False and frees the channels otherwise.
+        """
+        if self.get_policy() not in ("recent", "all") or scene_id in self._cache:
+            self._free_channels(channels)
+            return False
+
+        size = self._measure(channels)
+        in_use = sum(self._sizes.values())
+        if self.get_policy() != "all" and in_use + size > self.get_budget_bytes():
+            Logger.debug(f"[Cache] Prefetched scene {scene_id} ({size / 1024**2:.1f} MB) does not fit the budget.")
+            self._free_channels(channels)
+            return False
+
+        self._cache[scene_id] = channels
+        self._sizes[scene_id] = size
+        Logger.info(f"[Cache] Prefetched scene {scene_id} ({size / 1024**2:.1f} MB).")
+        return True
+
     def get_scene(self, scene_id: str) -> Optional[List[ImageChannel]]:
-        """Retrieves a scene from cache if available."""
-        policy = self.get_policy()
-        if policy == "none":
+        """Retrieves a scene from cache if available and marks it most recently used."""
+        if self.get_policy() == "none":
             return None
-            
+
         channels = self._cache.get(scene_id)
         if channels:
             Logger.info(f"[Cache] Hit for scene {scene_id}")
-            # For "recent" policy, update LRU order (move to end)
-            if policy == "recent":
-                del self._cache[scene_id]
-                self._cache[scene_id] = channels
+            self._cache.move_to_end(scene_id)
             return channels
         return None
-        
+
+    def contains(self, scene_id: str) -> bool:
+        return scene_id in self._cache
+
+    def enforce_budget(self):
+        """Re-measures cached scenes and evicts least-recently-used background scenes until within budget."""
+        for sid, channels in self._cache.items():
+            self._sizes[sid] = self._measure(channels)
+        if self.get_policy() == "all":
+            return # Aggressive Pre-cache keeps every scene until memory runs low
+
+        budget = self.get_budget_bytes()
+        total = sum(self._sizes.values())
+        if total <= budget:
+            return
+
+        evicted = []
+        for sid in list(self._cache.keys()):
+            if total <= budget:
+                break
+            if sid == self._current_scene_id:
+                continue
+            total -= self._sizes.get(sid, 0)
+            self._evict(sid)
+            evicted.append(sid)
+
+        if evicted:
+            Logger.info(f"[Cache] Budget {budget / 1024**2:.0f} MB: evicted {evicted}. In use: {total / 1024**2:.1f} MB")
+
     def remove_scene(self, scene_id: str):
         """Explicitly removes a specific scene from cache (e.g. when deleted by user)."""
         if scene_id in self._cache:
             Logger.info(f"[Cache] Explicit removal of scene {scene_id}")
-            self._free_channels(self._cache[scene_id])
-            del self._cache[scene_id]
-            
+            self._evict(scene_id)
+
     def clear_all_except(self, keep_id: str):
         """Removes all scenes except the specified one."""
-        current_keys = list(self._cache.keys())
-        to_remove = [k for k in current_keys if k != keep_id]
-        
-        Logger.debug(f"[Cache] cleanup request. Cache keys: {current_keys}, Keep: {keep_id}, Remove: {to_remove}")
-        
+        to_remove = [k for k in self._cache.keys() if k != keep_id]
         if not to_remove:
             return
 
         Logger.info(f"[Cache] Clearing {len(to_remove)} scenes: {to_remove}. Keeping: {keep_id}")
         for k in to_remove:
-            self._free_channels(self._cache[k])
-            del self._cache[k]
-        
-        import gc
-        gc.collect()
-        Logger.info(f"[Cache] Cleared {len(to_remove)} scenes. Remaining: {list(self._cache.keys())}")
-            
+            self._evict(k)
+
     def clear_all(self):
         """Clears the entire cache."""
         if not self._cache:
             return
-            
-        for channels in self._cache.values():
-            self._free_channels(channels)
-        self._cache.clear()
-        
-        import gc
-        gc.collect()
+
+        for k in list(self._cache.keys()):
+            self._evict(k)
         Logger.info("[Cache] All scenes cleared.")
-        
+
+    def _evict(self, scene_id: str):
+        channels = self._cache.pop(scene_id, None)
+        self._sizes.pop(scene_id, None)
+        if channels:
+            self._free_channels(channels)
+
+    @staticmethod
+    def _measure(channels: List[ImageChannel]) -> int:
+        total = 0
+        for ch in channels:
+            if hasattr(ch, 'memory_bytes'):
+                total += ch.memory_bytes()
+        return total
+
     def _free_channels(self, channels: List[ImageChannel]):
         """Releases resources for a list of channels."""
         Logger.debug(f"[Cache] Freeing {len(channels)} channels...")
+        # Policy "none" means no caching at all, including the compressed/disk tier
+        spill = self.get_policy() != "none"
+        store = EvictedChannelStore.instance()
         for ch in channels:
+            if spill:
+                store.put_channel(ch)
             if hasattr(ch, 'unload_raw_data'):
                 ch.unload_raw_data()
             elif hasattr(ch, 'clear_cache'):
                 ch.clear_cache()
-            # Explicitly break references if possible
@@ -0,0 +1,76 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Separators trimmed from a scene base name once the channel keyword is removed
+_EDGE_SEPARATORS = re.compile(r'^[\W_]+|[\W_]+$')
+
+
+class ChannelMatcher:
+    """
+    Precompiled channel keyword matcher used to group files into scenes.
+    All keywords of a channel_patterns dict are compiled once into a single
+    alternation (longest keyword first). When several keywords occur in a file
+    name, the one that sorts first by length wins, as with the former per-file loop.
+    """
+
+    def __init__(self, channel_patterns: Dict[str, Tuple[str, str]]):
+        self.signature = tuple(channel_patterns.items())
+        self.patterns = dict(channel_patterns)
+        # Stable sort: equal-length keywords keep their dict order
+        self.keys: List[str] = sorted(self.patterns.keys(), key=len, reverse=True)
+        self._rank = {key.upper(): i for i, key in enumerate(self.keys)}
+        self._by_upper = {key.upper(): key for key in self.keys}
+
+        if self.keys:
+            alternation = "|".join(re.escape(k.upper()) for k in self.keys)
+            # Zero-width lookahead reports overlapping occurrences as well
+            self._finder = re.compile(f"(?=({alternation}))")
+        else:
+            self._finder = None
+        self._strippers = {key: re.compile(re.escape(key), re.IGNORECASE) for key in self.keys}
+
+    def match(self, filename: str) -> Optional[str]:
+        """Returns the channel keyword found in filename, or None."""
+        if self._finder is None:
+            return None
+        best = None
+        for m in self._finder.finditer(filename.upper()):
+            found = m.group(1)
+            if best is None or self._rank[found] < self._rank[best]:
+                best = found
+                if self._rank[best] == 0:
+                    break
+        return self._by_upper[best] if best is not None else None
+
+    def classify(self, path: str) -> Tuple[str, Optional[str], str, str]:
+        """
+        Returns (filename without extension, matched keyword, channel type, color) for path.
+        Unmatched files are typed "Other" with a grey color.
+        """
+        filename = os.path.basename(path)
+        name_no_ext = os.path.splitext(filename)[0]
+        key = self.match(filename)
+        if key is None:
+            return name_no_ext, None, "Other", "#808080"
+        ch_type, ch_color = self.patterns[key]
+        return name_no_ext, key, ch_type, ch_color
+
+    def base_name(self, name_no_ext: str, key: Optional[str]) -> str:
+        """Scene name for a file: the file name with the channel keyword and edge separators removed."""
+        if not key:
+            return name_no_ext
+        base = _EDGE_SEPARATORS.sub('', self._strippers[key].sub("", name_no_ext))
+        return base or name_no_ext
+
+    def group(self, file_paths: List[str]) -> "Dict[str, List[Tuple[str, str, str]]]":
+        """
+        Groups paths by scene base name in one pass.
+        Returns {base_name: [(normalized path, channel type, color), ...]} in first-seen order.
+        """
+        groups: Dict[str, List[Tuple[str, str, str]]] = {}
+        for path in file_paths:
+            path = os.path.normpath(path)
+            name_no_ext, key, ch_type, ch_color = self.classify(path)
+            groups.setdefault(self.base_name(name_no_ext, key), []).append((path, ch_type, ch_color))
+        return groups
@@ -0,0 +1,91 @@
+from typing import Optional
+
+import numpy as np
+
+
+class ChannelStats:
+    """
+    Statistics of one channel's data, computed once per data version (see ImageChannel.get_stats).
+    uint8/uint16 data gets an exact full-range histogram (256 / 65,536 bins) from which
+    min, max, mean, std, percentiles and display histograms are derived without touching
+    the pixels again. Other dtypes fall back to direct reductions.
+    """
+
+    # Pixels per bincount chunk (bounds the intp temporary bincount needs)
+    CHUNK = 1 << 22
+
+    def __init__(self, data: Optional[np.ndarray]):
+        self.count = 0
+        self.min = 0.0
+        self.max = 0.0
+        self.mean = 0.0
+        self.std = 0.0
+        self.counts: Optional[np.ndarray] = None # exact histogram for integer data
+        self._cdf: Optional[np.ndarray] = None
+        self._sample: Optional[np.ndarray] = None
+        # Memo for EnhanceProcessor.estimate_auto_params of the same data
+        self.auto_params: Optional[dict] = None
+
+        if data is None or data.size == 0:
+            return
+        self.count = int(data.size)
+        if data.dtype in (np.uint8, np.uint16):
+            self._from_histogram(data)
+        else:
+            self._from_reductions(data)
+
+    def _from_histogram(self, data: np.ndarray):
+        bins = 256 if data.dtype == np.uint8 else 65536
+        flat = data.reshape(-1)
+        counts = np.zeros(bins, dtype=np.int64)
+        for start in range(0, flat.size, self.CHUNK):
+            counts += np.bincount(flat[start:start + self.CHUNK], minlength=bins)
+        self.counts = counts
+
+        nonzero = np.flatnonzero(counts)
+        self.min = float(nonzero[0])
+        self.max = float(nonzero[-1])
+        values = np.arange(bins, dtype=np.float64)
+        total = float(self.count)
+        self.mean = float(np.dot(counts, values) / total)
+        variance = float(np.dot(counts, (values - self.mean) ** 2) / total)
+        self.std = float(np.sqrt(max(variance, 0.0)))
+
+    def _from_reductions(self, data: np.ndarray):
+        self.min = float(np.min(data))
+        self.max = float(np.max(data))
+        self.mean = float(np.mean(data))
+        self.std = float(np.std(data))
+        # Percentiles are answered from a strided sample (~250k values)
+        step = int(max(1, (data.size / 250000) ** 0.5))
+        self._sample = data[::step, ::step] if data.ndim >= 2 else data[::step * step]
+
+    @property
+    def is_exact(self) -> bool:
+        return self.counts is not None
+
+    def percentile(self, q: float) -> float:
+        """q-th percentile (0-100); exact for integer data (lowest value whose CDF reaches q)."""
+        if self.count == 0:
+            return 0.0
+        if self.counts is None:
+            return float(np.percentile(self._sample, q))
+        if self._cdf is None:
+            self._cdf = np.cumsum(self.counts)
+        target = min(max(q, 0.0), 100.0) / 100.0 * self.count
+        return float(np.searchsorted(self._cdf, max(target, 1), side='left'))
+
+    def histogram(self, bins: int = 256, range_max: Optional[float] = None) -> Optional[np.ndarray]:
+        """Counts in `bins` equal bins over [0, range_max], like np.histogram(data, bins, (0, range_max))."""
+        if self.counts is None:
+            return None
+        if range_max is None:
+            range_max = self.max
+        range_max = max(float(range_max), 1.0)
+        upper = min(len(self.counts) - 1, int(np.floor(range_max)))
+        values = np.arange(upper + 1, dtype=np.float64)
+        idx = np.minimum((values * bins / range_max).astype(np.int64), bins - 1)
+        return np.bincount(idx, weights=self.counts[:upper + 1], minlength=bins).astype(np.int64)
+
+    def as_dict(self) -> dict:
+        return {'min': self.min, 'max': self.max, 'mean': self.mean, 'std': self.std}
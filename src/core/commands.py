@@ -2,7 +2,6 @@ import copy
 from PySide6.QtGui import QUndoCommand
 import numpy as np
 from src.core.language_manager import tr
-from src.core.analysis import calculate_channel_stats
 
 class AddManualSceneCommand(QUndoCommand):
     def __init__(self, model, name, channel_templates):
@@ -36,10 +35,7 @@ class RemoveSceneCommand(QUndoCommand):
 
     def undo(self):
         if self.scene_data:
-            self.model.scenes.insert(self.index, self.scene_data)
-            self.model._scene_map[self.scene_data.id] = self.scene_data
-            self.model.is_dirty = True
-            self.model.project_changed.emit()
+            self.model._insert_scene_internal(self.index, self.scene_data)
 
 
 class BatchRemoveScenesCommand(QUndoCommand):
@@ -74,10 +70,8 @@ class BatchRemoveScenesCommand(QUndoCommand):
         # Restore in order of index (ascending)
         sorted_data = sorted(self.scenes_data, key=lambda x: x[0])
         for idx, data in sorted_data:
-            self.model.scenes.insert(idx, data)
-            self.model._scene_map[data.id] = data
+            self.model._insert_scene_internal(idx, data, emit=False)
             
-        self.model.is_dirty = True
         self.model.project_changed.emit()
 
 
@@ -142,21 +136,31 @@ class AddFilesCommand(QUndoCommand):
 
 
 class AddFilesToPoolCommand(QUndoCommand):
-    def __init__(self, model, file_paths):
+    # Consecutive batches with the same merge_key (e.g. one streamed folder scan) become one undo step
+    MERGE_ID = 1001
+
+    def __init__(self, model, file_paths, merge_key=None):
         super().__init__("Add to Pool")
         self.model = model
         self.file_paths = file_paths
         self.added_files = []
+        self.merge_key = merge_key
+
+    def id(self):
+        return self.MERGE_ID if self.merge_key is not None else -1
+
+    def mergeWith(self, other):
+        if other.id() != self.id() or getattr(other, 'merge_key', None) != self.merge_key:
+            return False
+        self.file_paths = list(self.file_paths) + list(other.file_paths)
+        self.added_files.extend(other.added_files)
+        return True
 
     def redo(self):
-        before = set(self.model.pool_files)
-        self.model._add_to_pool_internal(self.file_paths)
-        after = set(self.model.pool_files)
-        self.added_files = list(after - before)
+        self.added_files = self.model._add_to_pool_internal(self.file_paths)
 
     def undo(self):
-        for f in self.added_files:
-            self.model._remove_from_pool_internal(f)
+        self.model._remove_pool_files_internal(self.added_files)
 
 
 class RemoveFromPoolCommand(QUndoCommand):
@@ -164,18 +168,14 @@ class RemoveFromPoolCommand(QUndoCommand):
         super().__init__("Remove from Pool")
         self.model = model
         self.file_path = file_path
-        self.index = -1
+        self.removed = [] # (path, index)
 
     def redo(self):
-        if self.file_path in self.model.pool_files:
-            self.index = self.model.pool_files.index(self.file_path)
-            self.model._remove_from_pool_internal(self.file_path)
+        self.removed = self.model._remove_pool_files_internal([self.file_path])
 
     def undo(self):
-        if self.index >= 0:
-            self.model.pool_files.insert(self.index, self.file_path)
-            self.model.is_dirty = True
-            self.model.project_changed.emit()
+        if self.removed:
+            self.model._insert_pool_files_internal(self.removed)
 
 
 class BatchRemoveFromPoolCommand(QUndoCommand):
@@ -183,39 +183,15 @@ class BatchRemoveFromPoolCommand(QUndoCommand):
         super().__init__(f"Remove {len(file_paths)} files from Pool")
         self.model = model
         self.file_paths = file_paths
-        self.indices = [] # (path, index)
+        self.indices = [] # (path, original index)
 
     def redo(self):
-        self.indices = []
-        # Sort to ensure we can restore in correct order (though set and pool_files might change)
-        # Actually, we should store indices from the end to the beginning to make it easier if we were removing in redo,
-        # but here we are removing individual items.
-        
-        # Block signals for performance during batch redo
-        self.model.blockSignals(True)
-        try:
-            for path in self.file_paths:
-                if path in self.model.pool_files:
-                    idx = self.model.pool_files.index(path)
-                    self.indices.append((path, idx))
-                    self.model._remove_from_pool_internal(path)
-        finally:
-            self.model.blockSignals(False)
-            self.model.project_changed.emit()
+        # Single pass over the pool; indices are captured before removal so undo restores the original order
+        self.indices = self.model._remove_pool_files_internal(self.file_paths)
 
     def undo(self):
-        # Restore in reverse order of indices to maintain original order
-        self.model.blockSignals(True)
-        try:
-            # Sort by original index to restore correctly
-            sorted_indices = sorted(self.indices, key=lambda x: x[1])
-            for path, idx in sorted_indices:
-                if path not in self.model.pool_files:
-                    self.model.pool_files.insert(idx, path)
-        finally:
-            self.model.blockSignals(False)
-            self.model.is_dirty = True
-            self.model.project_changed.emit()
+        if self.indices:
+            self.model._insert_pool_files_internal(self.indices)
 
 
 class AddChannelToSceneCommand(QUndoCommand):
@@ -232,10 +208,8 @@ class AddChannelToSceneCommand(QUndoCommand):
         self.model._add_channel_to_scene_internal(self.scene_id, self.file_path, self.channel_type, self.color)
 
     def undo(self):
-        scene = self.model.get_scene(self.scene_id)
-        if scene and self.scene_data_before:
-            scene.channels = copy.deepcopy(self.scene_data_before.channels)
-            self.model.project_changed.emit()
+        if self.model.get_scene(self.scene_id) and self.scene_data_before:
+            self.model._set_scene_channels_internal(self.scene_id, copy.deepcopy(self.scene_data_before.channels))
 
 
 class SetProjectTemplateCommand(QUndoCommand):
@@ -265,9 +239,7 @@ class AddEmptyChannelCommand(QUndoCommand):
         # Remove the last channel
         scene = self.model.get_scene(self.scene_id)
         if scene and scene.channels:
-            scene.channels.pop()
-            self.model.is_dirty = True
-            self.model.project_changed.emit()
+            self.model._remove_channel_internal(self.scene_id, len(scene.channels) - 1)
 
 
 class UpdateChannelColorCommand(QUndoCommand):
@@ -393,7 +365,6 @@ class CropCommand(QUndoCommand):
             
             # Use update_data to correctly set private _raw_data and update shape/dtype
             ch.update_data(np.ascontiguousarray(cropped))
-            ch.stats = calculate_channel_stats(cropped)
             
         self.session.data_changed.emit()
         
@@ -404,6 +375,5 @@ class CropCommand(QUndoCommand):
                 ch = self.session.channels[i]
                 # Use update_data to correctly restore raw data and properties
                 ch.update_data(old_data)
-                ch.stats = calculate_channel_stats(old_data)
                 
         self.session.data_changed.emit()
@@ -7,6 +7,7 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Tuple, Dict
 from .channel_config import get_channel_color, get_rgb_mapping
 from .image_loader import ImageLoader
+from .channel_stats import ChannelStats
 
 @dataclass
 class DisplaySettings:
@@ -21,6 +22,12 @@ class DisplaySettings:
     visible: bool = True
     opacity: float = 1.0
 
+    def render_signature(self) -> int:
+        """Hash of every field that affects how the channel renders (including enhance_params)."""
+        enhance = getattr(self, 'enhance_params', None) or {}
+        return hash((self.color, self.min_val, self.max_val, self.gamma, self.visible, self.opacity,
+                     tuple(sorted(enhance.items()))))
+
 @dataclass
 class ScaleBarSettings:
     """
@@ -53,6 +60,9 @@ class ImageChannel:
     Represents a single fluorescence channel (e.g., DAPI, GFP).
     Holds raw data (immutable) and display settings (mutable).
     """
+    # Long side of the pyramid level used for statistics and previews
+    OVERVIEW_DIM = 1024
+
     def __init__(self, file_path: str, color: str = None, name: Optional[str] = None, data: Optional[np.ndarray] = None, auto_contrast: bool = False):
         """
         Initializes an ImageChannel.
@@ -63,10 +73,24 @@ class ImageChannel:
         self.name = name if name else (os.path.basename(file_path) if file_path else "Empty")
         self.is_placeholder = False
         self.is_rgb = False
+        # True once raw data no longer matches the file (crop, replaced data)
+        self.data_modified = False
+        # Bumped whenever raw data is replaced (crop, plane/projection change)
+        self.data_version = 0
+        self._stats_cache = None # (data_version, ChannelStats)
+        self._index_cache = {} # target_shape -> (index key, uint8 display indices), see ImageRenderer
+        self._enhance_reference_cache = None # (data_version, {params key: reference}), see ImageRenderer
         
-        # Caching for Enhancement Pipeline
-        self._cached_enhanced_data = None
-        self._last_enhance_params = None
+        # Lazy Z/T stack (None for single-plane images)
+        self.stack = None
+        self.plane_index: Optional[int] = None # None = showing a projection
+        self.projection_mode = "max"
+        self.projection_range: Optional[Tuple[int, int]] = None
+        
+        # Lazy pyramid (None for flat images). The base level stays on disk until
+        # raw_data is accessed; display and statistics use reduced levels.
+        self.pyramid = None
+        self._pyramid_levels: Dict[int, np.ndarray] = {}
         
         # Determine default color based on name if not provided
         if color is None:
@@ -97,8 +121,19 @@ class ImageChannel:
                     self._raw_data = data
                 self.is_rgb = self._raw_data.ndim == 3
             else:
-                # Use dedicated ImageLoader for all disk I/O
-                raw_data, self.is_rgb = ImageLoader.load_image(file_path)
+                # Pyramidal slides and Z-stacks / time-series stay on disk; only a reduced
+                # level or the projection is decoded for display
+                raw_data, stack, pyramid = ImageLoader.open_source(file_path, overview_dim=self.OVERVIEW_DIM)
+                if pyramid is not None:
+                    self._raw_data = ImageLoader.extract_channel_data(raw_data, self.name)
+                    self.is_rgb = self._raw_data.ndim == 3
+                    self.attach_pyramid(pyramid)
+                    self.auto_scale(auto_contrast)
+                    print(f"[Timing] ImageChannel '{self.name}' initialized from pyramid {pyramid.level_shapes}. Dtype: {self.dtype}")
+                    return
+                
+                self.stack = stack
+                self.is_rgb = raw_data.ndim == 3
                 
                 # Extract/Combine channels based on biological mapping rules
                 self._raw_data = ImageLoader.extract_channel_data(raw_data, self.name)
@@ -121,44 +156,28 @@ class ImageChannel:
          
     def auto_scale(self, auto_contrast=True):
         t_stats = time.time()
+        # Pyramids are scaled from the overview level so the base level is never decoded here
+        data = self.overview_data
         try:
             # Special Handling for RGB or uint8 images: Default to full range
-            if self.is_rgb or self._raw_data.dtype == np.uint8:
+            if self.is_rgb or data.dtype == np.uint8:
                  data_min = 0.0
                  data_max = 255.0
             elif not auto_contrast:
                 # Default to full bit depth if auto_contrast is disabled
                 data_min = 0.0
-                data_max = 65535.0 if self._raw_data.dtype == np.uint16 else float(np.max(self._raw_data))
+                data_max = 65535.0 if data.dtype == np.uint16 else self.get_stats().max
             else:
-                # Scientific Auto-Scaling for 16-bit
+                # Scientific Auto-Scaling for 16-bit (from the cached exact histogram)
+                stats = self.get_stats()
                 # Min: Use absolute minimum to preserve background
-                data_min = float(np.min(self._raw_data))
+                data_min = stats.min
                 
                 # Max: Intelligent auto-scaling
                 # 1. Calculate 99.99% percentile (excludes 0.01% brightest pixels)
                 # 2. Check if absolute max is an outlier (hot pixel)
-                abs_max = float(np.max(self._raw_data))
-                
-                # Optimization: Use downsampled data for percentile calculation to speed up loading
-                # For 16-bit images (e.g. 2048x2048), full percentile is slow.
-                try:
-                    if self._raw_data.size > 1000000: # > 1MP
-                        # Stride slicing is very fast and sufficient for histogram stats
-                        step = int(max(1, (self._raw_data.size / 250000) ** 0.5)) # Target ~250k pixels (500x500)
-                        if self._raw_data.ndim == 2:
-                            sample_data = self._raw_data[::step, ::step]
-                        elif self._raw_data.ndim == 3:
-                            sample_data = self._raw_data[::step, ::step, :]
-                        else:
-                            sample_data = self._raw_data
-                    else:
-                        sample_data = self._raw_data
-                except Exception:
-                    # Fallback if slicing fails
-                    sample_data = self._raw_data
-                    
-                p_high = float(np.percentile(sample_data, 99.99))
+                abs_max = stats.max
+                p_high = stats.percentile(99.99)
                 
                 # Heuristic: If absolute max is significantly higher than 99.99% percentile,
                 # it's likely a hot pixel or artifact. Use percentile.
@@ -176,7 +195,7 @@ class ImageChannel:
         except Exception:
             # Fallback
             data_min = 0.0
-            data_max = 65535.0 if self._raw_data.dtype == np.uint16 else 255.0
+            data_max = 65535.0 if data.dtype == np.uint16 else 255.0
 
         self.display_settings.min_val = data_min
         self.display_settings.max_val = data_max
@@ -186,6 +205,159 @@ class ImageChannel:
         self.display_settings.enhance_params = {}
         # print(f"[Timing] ImageChannel stats: {time.time() - t_stats:.4f}s")
 
+    @property
+    def plane_count(self) -> int:
+        """Number of Z/T planes available (1 for flat images)."""
+        return self.stack.plane_count if self.stack is not None else 1
+
+    def attach_stack(self, stack, mode: str = "max"):
+        """
+        Attaches a lazy StackSource whose projection is the current raw data.
+        Used by SceneLoaderWorker, which computes the projection before creating the channel.
+        """
+        self.stack = stack
+        self.plane_index = None
+        self.projection_mode = mode
+        self.projection_range = None
+
+    def set_plane(self, index: int):
+        """Shows a single Z/T plane. Only that plane is decoded (LRU cached)."""
+        if self.stack is None:
+            return
+        plane = self.stack.read_plane(index)
+        self._apply_stack_data(plane)
+        self.plane_index = int(min(max(0, index), self.stack.plane_count - 1))
+
+    def set_projection(self, mode: str = "max", start: Optional[int] = None, stop: Optional[int] = None):
+        """Shows a projection over planes [start, stop). Results are cached per range."""
+        if self.stack is None:
+            return
+        data = self.stack.projection(mode, start, stop)
+        self._apply_stack_data(data)
+        self.plane_index = None
+        self.projection_mode = mode
+        self.projection_range = None if (start is None and stop is None) else (start, stop)
+
+    def attach_pyramid(self, pyramid):
+        """
+        Attaches a lazy PyramidSource. The current raw data (a reduced level, already
+        channel-extracted) becomes the overview; the base level is decoded on first raw_data access.
+        """
+        overview = self._raw_data
+        self.pyramid = pyramid
+        self._pyramid_levels = {}
+        if overview is not None:
+            level = pyramid.level_for_shape(overview.shape[:2])
+            if level != 0:
+                self._pyramid_levels[level] = overview
+                self._raw_data = None
+        self.shape = pyramid.base_shape
+        self.dtype = overview.dtype if overview is not None else pyramid.dtype
+
+    def get_display_data(self, target_shape: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        Returns the data to render at target_shape (H, W).
+        For pyramids this is the coarsest level covering target_shape; otherwise raw_data.
+        """
+        if self.pyramid is None or target_shape is None:
+            return self.raw_data
+        level = self.pyramid.level_for_shape(target_shape)
+        if level == 0:
+            return self.raw_data
+        return self._get_pyramid_level(level)
+
+    @property
+    def overview_data(self) -> np.ndarray:
+        """Reduced-resolution data for statistics (raw_data for flat images)."""
+        if self.pyramid is None or self._raw_data is not None:
+            return self._raw_data
+        return self._get_pyramid_level(self.pyramid.level_for_max_dim(self.OVERVIEW_DIM))
+
+    @property
+    def overview_scale(self) -> float:
+        """Size ratio of overview_data to the full-resolution image."""
+        data = self.overview_data
+        if data is None or not self.shape[1]:
+            return 1.0
+        return data.shape[1] / float(self.shape[1])
+
+    def get_stats(self) -> ChannelStats:
+        """
+        Statistics of overview_data (raw_data for flat images), computed once per data_version.
+        Only update_data invalidates them; unloading and reloading the same data keeps them.
+        """
+        cached = self._stats_cache
+        if cached is not None and cached[0] == self.data_version:
+            return cached[1]
+        stats = ChannelStats(self.overview_data)
+        self._stats_cache = (self.data_version, stats)
+        return stats
+
+    @property
+    def stats(self) -> dict:
+        """min/max/mean/std of the channel data (see get_stats)."""
+        return self.get_stats().as_dict()
+
+    def data_max(self) -> int:
+        """Maximum data value from the cached statistics (used to size render LUTs)."""
+        return int(self.get_stats().max)
+
+    @property
+    def has_data(self) -> bool:
+        """True if pixel data is available (possibly still on disk for pyramids)."""
+        return self._raw_data is not None or self.pyramid is not None
+
+    def sample_value(self, y: int, x: int):
+        """Pixel value at full-resolution (y, x); pyramids read it from the base level without decoding the level."""
+        if self._raw_data is not None or self.pyramid is None:
+            return self._raw_data[y, x]
+        pixel = self.pyramid.read_region(0, y, y + 1, x, x + 1).reshape(-1)
+        if pixel.size == 1:
+            return pixel[0]
+        # (1, 1, S) and (S, 1, 1) are ambiguous to extract_channel_data: hand it an unambiguous channels-last block
+        return ImageLoader.extract_channel_data(np.broadcast_to(pixel, (8, 8, pixel.size)), self.name)[0, 0]
+
+    def read_region(self, y0: int, y1: int, x0: int, x1: int, downsample: int = 1) -> np.ndarray:
+        """
+        Data of the full-resolution region [y0:y1, x0:x1] at 1/downsample resolution (tiled display).
+        Pyramids read the coarsest level at or above that resolution, decoding only the tiles
+        or strips covering the region, so neither the base nor a whole level is decoded for it.
+        Flat images (and any remaining factor) are decimated.
+        Reads from disk: call it off the GUI thread (see TiledImageItem).
+        """
+        step = max(1, int(downsample))
+        if self.pyramid is not None and (step > 1 or self._raw_data is None):
+            level = self.pyramid.level_for_scale(1.0 / step)
+            if level > 0 or self._raw_data is None:
+                d = self.pyramid.downsample(level)
+                ly0, ly1 = int(y0 / d), int(np.ceil(y1 / d))
+                lx0, lx1 = int(x0 / d), int(np.ceil(x1 / d))
+                if level in self._pyramid_levels:
+                    block = self._pyramid_levels[level][ly0:ly1, lx0:lx1]
+                else:
+                    block = ImageLoader.extract_channel_data(self.pyramid.read_region(level, ly0, ly1, lx0, lx1), self.name)
+                sub = max(1, int(round(step / d)))
+                return block[::sub, ::sub]
+        return self.raw_data[y0:y1:step, x0:x1:step]
+
+    def _get_pyramid_level(self, level: int) -> np.ndarray:
+        data = self._pyramid_levels.get(level)
+        if data is None:
+            data = ImageLoader.extract_channel_data(self.pyramid.read_level(level), self.name)
+            # Keep at most two reduced levels per channel (overview + current display level)
+            overview_level = self.pyramid.level_for_max_dim(self.OVERVIEW_DIM)
+            for key in list(self._pyramid_levels):
+                if key != overview_level:
+                    del self._pyramid_levels[key]
+            self._pyramid_levels[level] = data
+        return data
+
+    def _apply_stack_data(self, data: np.ndarray):
+        """Swaps in a plane/projection of the attached stack without detaching it."""
+        if data.ndim == 3:
+            data = ImageLoader.extract_channel_data(data, self.name)
+        self._set_data(data)
+
     def reset_display_settings(self):
         """Resets display settings to default auto-scaled values."""
         self.auto_scale(auto_contrast=True)
@@ -201,11 +373,22 @@ class ImageChannel:
         new_ch = ImageChannel(file_path="", color=self.display_settings.color, name=self.name)
         new_ch.file_path = self.file_path
         new_ch.is_placeholder = self.is_placeholder
+        new_ch.data_modified = self.data_modified
         
-        # Deep copy raw data
-        new_ch._raw_data = self._raw_data.copy()
+        # Deep copy raw data (pyramids may not have decoded the base level yet)
+        new_ch._raw_data = self._raw_data.copy() if self._raw_data is not None else None
         new_ch.shape = self.shape
         new_ch.dtype = self.dtype
+        new_ch.is_rgb = self.is_rgb
+        
+        # Share the lazy stack/pyramid handles (read-only; each owner closes its reference)
+        # and current plane selection
+        new_ch.stack = self.stack.acquire() if self.stack is not None else None
+        new_ch.plane_index = self.plane_index
+        new_ch.projection_mode = self.projection_mode
+        new_ch.projection_range = self.projection_range
+        new_ch.pyramid = self.pyramid.acquire() if self.pyramid is not None else None
+        new_ch._pyramid_levels = dict(self._pyramid_levels)
         
         # Copy display settings
         ds = self.display_settings
@@ -221,12 +404,39 @@ class ImageChannel:
 
     def clear_cache(self):
         """Forcefully clears all rendering and enhancement caches to free memory."""
-        self._cached_enhanced_data = None
-        self._last_enhance_params = None
-        if hasattr(self, '_preview_enhance_cache'):
-            self._preview_enhance_cache.clear()
+        from .render_cache import EnhanceStageCache
+        EnhanceStageCache.instance().invalidate_channel(self)
+        self._index_cache.clear()
+        self._enhance_reference_cache = None
         # Note: We do NOT clear _raw_data here as it's the core scientific signal.
 
+    def memory_bytes(self) -> int:
+        """
+        Bytes this channel holds in memory: raw data, decoded pyramid levels / stack planes
+        and display index images (enhancement stage outputs are in EnhanceStageCache). Arrays sharing a buffer are counted once; memory-mapped
+        (file-backed) arrays are not counted.
+        """
+        arrays = [getattr(self, '_raw_data', None)]
+        arrays.extend(self._pyramid_levels.values())
+        arrays.extend(indices for _, indices in self._index_cache.values())
+        for source in (self.stack, self.pyramid):
+            if source is not None:
+                arrays.extend(source.cached_arrays())
+
+        seen = set()
+        total = 0
+        for arr in arrays:
+            if not isinstance(arr, np.ndarray):
+                continue
+            root = arr
+            while isinstance(root.base, np.ndarray):
+                root = root.base
+            if id(root) in seen or isinstance(root, np.memmap):
+                continue
+            seen.add(id(root))
+            total += root.nbytes
+        return total
+
     def unload_raw_data(self):
         """
         Forcefully unloads the raw data to free memory.
@@ -236,11 +446,36 @@ class ImageChannel:
         self.clear_cache()
         if hasattr(self, '_raw_data'):
             self._raw_data = None
+        self._release_sources()
         # We also mark it as 'unloaded' if we want to track state, 
         # but usually this object is about to be destroyed.
 
-    def update_data(self, new_data: np.ndarray):
-        """Updates the raw data (e.g. after cropping)."""
+    def _release_sources(self):
+        """Closes this channel's reference to its lazy stack/pyramid and detaches them."""
+        if getattr(self, 'stack', None) is not None:
+            self.stack.close()
+            self.stack = None
+        self.plane_index = None
+        if getattr(self, 'pyramid', None) is not None:
+            self.pyramid.close()
+            self.pyramid = None
+        self._pyramid_levels = {}
+
+    def update_data(self, new_data: np.ndarray, modified: bool = True):
+        """
+        Updates the raw data (e.g. after cropping).
+        The new data no longer corresponds to the file's planes/levels, so any lazy stack
+        or pyramid is closed and detached.
+        modified=False for data that is still the file's content (e.g. a newly assigned file).
+        """
+        self._release_sources()
+        self.data_modified = modified
+        self._set_data(new_data)
+
+    def _set_data(self, new_data: np.ndarray):
+        """Swaps in new raw data and invalidates what was derived from the old data."""
+        self.clear_cache()
+        self.data_version += 1
         self._raw_data = new_data
         self.shape = self._raw_data.shape[:2]
         self.dtype = self._raw_data.dtype
@@ -253,7 +488,13 @@ class ImageChannel:
 
     @property
     def raw_data(self) -> np.ndarray:
-        """Access the raw pixel data. Read-only recommended."""
+        """
+        Access the raw pixel data. Read-only recommended.
+        For pyramids the full-resolution base level is decoded here on first access.
+        """
+        if self._raw_data is None and getattr(self, 'pyramid', None) is not None:
+            print(f"[ImageChannel] Decoding full-resolution level of '{self.name}' {self.shape}")
+            self._raw_data = ImageLoader.extract_channel_data(self.pyramid.read_level(0), self.name)
         return self._raw_data
 
 from PySide6.QtCore import QObject, Signal
@@ -1,7 +1,11 @@
+import time
 import numpy as np
 import cv2
 from typing import Tuple
 
+from .logger import Logger
+from .preview_controller import record_stage_time
+
 # --- GPU Acceleration (OpenCL) Support ---
 def is_opencl_enabled():
     """Checks if OpenCL is both available and enabled in OpenCV."""
@@ -35,20 +39,34 @@ class EnhanceProcessor:
         return max(10, min(50, radius))
 
     @staticmethod
-    def apply_signal_stretch(image: np.ndarray, low_p: float = 2.0, high_p: float = 98.0) -> np.ndarray:
+    def apply_signal_stretch(image: np.ndarray, low_p: float = 2.0, high_p: float = 98.0, levels: Tuple = None) -> np.ndarray:
         """
         Applies Percentile-based Intensity Rescaling (Signal Stretch).
         Optimized version using histograms for speed.
+        levels: (low, high, out_min, out_max) from signal_stretch_levels of the whole image,
+        to stretch a region of it the same way.
         """
         if image is None:
             return image
-            
+        if levels is None:
+            levels = EnhanceProcessor.signal_stretch_levels(image, low_p, high_p)
+        if levels is None:
+            return image
+        low, high, out_min, out_max = levels
+        rng = high - low
+        
+        result = (image.astype(np.float32) - low) * ((out_max - out_min) / rng) + out_min
+        return np.clip(result, out_min, out_max).astype(image.dtype)
+
+    @staticmethod
+    def signal_stretch_levels(image: np.ndarray, low_p: float = 2.0, high_p: float = 98.0) -> Tuple:
+        """(low, high, out_min, out_max) of the signal stretch of image, or None if it leaves it unchanged."""
         # Ensure percentiles are within 0-100
         low_p = np.clip(low_p, 0, 100)
         high_p = np.clip(high_p, 0, 100)
         
         if low_p >= high_p:
-            return image
+            return None
             
         # Optimization: Use histogram to find percentiles (MUCH faster than np.percentile for large arrays)
         dtype = image.dtype
@@ -72,14 +90,12 @@ class EnhanceProcessor:
         # Fast rescaling using cv2 or numpy
         rng = high - low
         if rng < 1e-6:
-            return image
+            return None
             
         # Result = (image - low) / (high - low) * (orig_max - orig_min) + orig_min?
         # Actually standard rescale_intensity maps (low, high) to (min, max) of dtype
         out_min, out_max = float(image.min()), float(image.max())
-        
-        result = (image.astype(np.float32) - low) * ((out_max - out_min) / rng) + out_min
-        return np.clip(result, out_min, out_max).astype(dtype)
+        return (low, high, out_min, out_max)
 
     @staticmethod
     def apply_background_suppression(image: np.ndarray, strength: float = 1.0, kernel_size: int = 50) -> np.ndarray:
@@ -122,9 +138,11 @@ class EnhanceProcessor:
         return result
 
     @staticmethod
-    def apply_local_contrast(image: np.ndarray, clip_limit: float = 0.01, tile_size: int = 8) -> np.ndarray:
+    def apply_local_contrast(image: np.ndarray, clip_limit: float = 0.01, tile_size: int = 8, tile_px: Tuple[int, int] = None) -> np.ndarray:
         """
         Applies Local Contrast Enhancement (CLAHE). Supports OpenCL acceleration.
+        tile_size is the number of tiles per side. tile_px: (height, width) of the tiles in
+        pixels instead, for a region of a larger image that starts on that image's tile grid.
         """
         if image is None: return None
         
@@ -132,13 +150,21 @@ class EnhanceProcessor:
         if image.ndim == 3:
             # Recursively apply to each channel
             chans = cv2.split(image)
-            processed_chans = [EnhanceProcessor.apply_local_contrast(c, clip_limit, tile_size) for c in chans]
+            processed_chans = [EnhanceProcessor.apply_local_contrast(c, clip_limit, tile_size, tile_px) for c in chans]
             return cv2.merge(processed_chans)
         
         # Determine clip limit value
         # Standard OpenCV clipLimit ranges from 1.0 to 40.0.
         # We use a 100.0 multiplier so that 0.01 is the 1.0 baseline.
         limit_val = clip_limit * 100.0 
+        
+        if tile_px is not None:
+            # Pad to whole tiles the way OpenCV pads the full image (reflect at the bottom/right edge)
+            h, w = image.shape[:2]
+            th, tw = tile_px
+            gy, gx = -(-h // th), -(-w // tw)
+            padded = cv2.copyMakeBorder(image, 0, gy * th - h, 0, gx * tw - w, cv2.BORDER_REFLECT_101)
+            return cv2.createCLAHE(clipLimit=limit_val, tileGridSize=(gx, gy)).apply(padded)[:h, :w]
             
         # Create CLAHE object
         clahe = cv2.createCLAHE(clipLimit=limit_val, tileGridSize=(tile_size, tile_size))
@@ -155,22 +181,28 @@ class EnhanceProcessor:
             return clahe.apply(image)
 
     @staticmethod
-    def apply_noise_smoothing(image: np.ndarray, sigma: float = 1.0) -> np.ndarray:
+    def noise_smoothing_diameter(sigma: float = 1.0) -> int:
+        """Bilateral filter diameter used by apply_noise_smoothing."""
+        return max(3, int(sigma * 4) | 1)
+
+    @staticmethod
+    def apply_noise_smoothing(image: np.ndarray, sigma: float = 1.0, value_range: Tuple[float, float] = None) -> np.ndarray:
         """
         Applies Noise Smoothing (Gaussian or Bilateral).
+        value_range: (min, max) the filter normalizes by (default: of image).
         """
         if image is None: return None
         
         # Map sigma to Bilateral params
-        # d (diameter) ~ 4*sigma
-        d = int(sigma * 4) | 1 # Ensure odd
-        d = max(3, d)
+        # d (diameter) ~ 4*sigma, odd
+        d = EnhanceProcessor.noise_smoothing_diameter(sigma)
         
         # Sigma Color: how much intensity difference is preserved.
         sigma_color = sigma * 20.0 # Heuristic
         sigma_space = sigma * 3.0 
         
-        return EnhanceProcessor.apply_bilateral_filter(image, d=d, sigma_color=sigma_color, sigma_space=sigma_space)
+        return EnhanceProcessor.apply_bilateral_filter(image, d=d, sigma_color=sigma_color, sigma_space=sigma_space,
+                                                       value_range=value_range)
 
     @staticmethod
     def apply_gamma(image: np.ndarray, gamma: float = 1.0) -> np.ndarray:
@@ -337,9 +369,9 @@ class EnhanceProcessor:
 
     # --- Wrapper for old Bilateral (helper) ---
     @staticmethod
-    def apply_bilateral_filter(image: np.ndarray, d: int = 7, sigma_color: float = 50, sigma_space: float = 50) -> np.ndarray:
-        """Applies Bilateral Filter. Supports OpenCL acceleration."""
-        d_min, d_max = image.min(), image.max()
+    def apply_bilateral_filter(image: np.ndarray, d: int = 7, sigma_color: float = 50, sigma_space: float = 50, value_range: Tuple[float, float] = None) -> np.ndarray:
+        """Applies Bilateral Filter (on 8-bit data scaled from value_range, default the image's). Supports OpenCL acceleration."""
+        d_min, d_max = value_range if value_range is not None else (image.min(), image.max())
         rng = d_max - d_min
         if rng == 0: rng = 1
         
@@ -451,11 +483,53 @@ class EnhanceProcessor:
             'gamma': 1.0
         }
 
+    @staticmethod
+    def background_kernel_size(params: dict, scale_factor: float = 1.0) -> int:
+        """Top-hat kernel the pipeline uses at scale_factor (the kernel is given at full resolution)."""
+        bg_k = int(params.get('bg_kernel', 50))
+        if scale_factor < 1.0:
+            bg_k = max(3, int(bg_k * scale_factor))
+        return bg_k
+
+    @classmethod
+    def enhancement_margin(cls, params: dict, scale_factor: float = 1.0) -> int:
+        """
+        Pixels around a region that the local stages of the pipeline read (top-hat kernel,
+        bilateral radius); CLAHE tiles are handled separately (see apply_pipeline reference).
+        """
+        margin = 0
+        if params.get('bg_enabled', False) and abs(params.get('bg_strength', 1.0)) >= 0.001:
+            margin += max(3, cls.background_kernel_size(params, scale_factor) | 1)
+        if params.get('noise_enabled', False):
+            margin += cls.noise_smoothing_diameter(params.get('noise_sigma', 1.0)) // 2 + 1
+        return margin
+
+    # Pipeline stages in order and the parameters each reads (besides '<stage>_enabled')
+    PIPELINE_STAGES = (
+        ('bg', ('bg_strength', 'bg_kernel')),
+        ('contrast', ('contrast_clip', 'contrast_tile')),
+        ('noise', ('noise_sigma',)),
+        ('stretch', ('stretch_clip',)),
+        ('gamma', ('gamma',)),
+    )
+
     @classmethod
-    def apply_pipeline(cls, image: np.ndarray, params: dict, scale_factor: float = 1.0) -> np.ndarray:
-        """Apply full scientific enhancement pipeline with logging."""
+    def apply_pipeline(cls, image: np.ndarray, params: dict, scale_factor: float = 1.0, reference: dict = None,
+                       stage_cache=None) -> np.ndarray:
+        """
+        Apply full scientific enhancement pipeline with logging.
+        reference: whole-image quantities of the stages that are not local ('noise_range',
+        'stretch_levels', and 'contrast_tile_px' for a region on the image's CLAHE grid).
+        Missing entries are filled in from this image, present ones are used as given, so
+        a region can be processed like the same area of the whole image (see
+        ImageRenderer.render_tile).
+        stage_cache: memoizes stage outputs for this input (see EnhanceStageCache.for_input),
+        keyed by the parameters of the stage and the enabled stages before it; the pipeline
+        resumes after the last stage with an unchanged chain. Cached outputs are read-only.
+        With a reference it must be complete and determined by the input and parameters
+        (ImageRenderer._enhance_reference), since cached stages do not fill it in.
+        """
         if image is None: return None
-        import time
         t_start = time.time()
         
         # --- Symmetry Verification Logging ---
@@ -463,55 +537,92 @@ class EnhanceProcessor:
         in_mean = np.mean(image)
         in_std = np.std(image)
         
-        result = image.copy()
+        # Disabled stages leave the image unchanged, so they are not part of the chain
+        chain = tuple((stage, tuple(params.get(key) for key in keys) + ((scale_factor,) if stage == 'bg' else ()))
+                      for stage, keys in cls.PIPELINE_STAGES if params.get(f'{stage}_enabled', False))
+        result, done = image, 0
+        if stage_cache is not None:
+            for depth in range(len(chain), 0, -1):
+                cached = stage_cache.get(chain[:depth])
+                if cached is not None:
+                    result, done = cached, depth
+                    break
+            if done:
+                Logger.debug(f"[Enhance] Reusing cached stages: {', '.join(stage for stage, _ in chain[:done])}")
         
+        for depth in range(done, len(chain)):
+            stage = chain[depth][0]
+            t_stage = time.perf_counter()
+            previous = result
+            result = cls._apply_stage(stage, result, params, scale_factor, reference)
+            record_stage_time(stage, (time.perf_counter() - t_stage) * 1000)
+            if stage_cache is not None and result is not previous:
+                stage_cache.put(chain[:depth + 1], result)
+        if result is image:
+            result = image.copy()
+            
+        t_total = time.time() - t_start
+        
+        # --- Symmetry Verification Summary ---
+        out_mean = np.mean(result)
+        out_std = np.std(result)
+        diff_mean = out_mean - in_mean
+        
+        if chain:
+            print(f"DEBUG: [Enhance] Pipeline Summary: Mean {in_mean:.2f}->{out_mean:.2f} (diff={diff_mean:+.2f}), Std {in_std:.2f}->{out_std:.2f}")
+        
+        if t_total > 0.01:
+            print(f"[Timing] Enhance: Pipeline Total {t_total:.4f}s")
+            
+        return result
+
+    @classmethod
+    def _apply_stage(cls, stage: str, result: np.ndarray, params: dict, scale_factor: float, reference: dict) -> np.ndarray:
+        """One pipeline stage (PIPELINE_STAGES); returns a new image or result itself if it leaves it unchanged."""
         # 1. Background Suppression
-        if params.get('bg_enabled', False):
+        if stage == 'bg':
             bg_s = params.get('bg_strength', 1.0)
-            bg_k = int(params.get('bg_kernel', 50))
-            if scale_factor < 1.0:
-                bg_k = max(3, int(bg_k * scale_factor))
+            bg_k = cls.background_kernel_size(params, scale_factor)
             print(f"DEBUG: [Enhance] Applying BG Suppression: Strength={bg_s:.4f}, Kernel={bg_k}")
-            result = cls.apply_background_suppression(result, strength=bg_s, kernel_size=bg_k)
+            return cls.apply_background_suppression(result, strength=bg_s, kernel_size=bg_k)
             
         # 2. Local Contrast (CLAHE)
-        if params.get('contrast_enabled', False):
+        if stage == 'contrast':
             c_clip = params.get('contrast_clip', 0.01)
             c_grid = int(params.get('contrast_tile', 8))
             print(f"DEBUG: [Enhance] Applying Local Contrast: Clip={c_clip:.4f}, Tile={c_grid}")
-            result = cls.apply_local_contrast(result, clip_limit=c_clip, tile_size=c_grid)
+            return cls.apply_local_contrast(result, clip_limit=c_clip, tile_size=c_grid,
+                                            tile_px=reference.get('contrast_tile_px') if reference is not None else None)
             
         # 3. Noise Smoothing
-        if params.get('noise_enabled', False):
+        if stage == 'noise':
             n_sigma = params.get('noise_sigma', 1.0)
             print(f"DEBUG: [Enhance] Applying Noise Reduction: Sigma={n_sigma:.4f}")
-            result = cls.apply_noise_smoothing(result, sigma=n_sigma)
+            value_range = None
+            if reference is not None:
+                if 'noise_range' not in reference:
+                    reference['noise_range'] = (result.min(), result.max())
+                value_range = reference['noise_range']
+            return cls.apply_noise_smoothing(result, sigma=n_sigma, value_range=value_range)
             
         # 4. Signal Stretch
-        if params.get('stretch_enabled', False):
+        if stage == 'stretch':
             s_clip = params.get('stretch_clip', 2.0)
             print(f"DEBUG: [Enhance] Applying Signal Stretch: Clip={s_clip:.4f}")
-            result = cls.apply_signal_stretch(result, low_p=s_clip, high_p=100.0-s_clip)
+            if reference is None:
+                return cls.apply_signal_stretch(result, low_p=s_clip, high_p=100.0-s_clip)
+            if 'stretch_levels' not in reference:
+                reference['stretch_levels'] = cls.signal_stretch_levels(result, low_p=s_clip, high_p=100.0-s_clip)
+            if reference['stretch_levels'] is None: # The stretch leaves the image unchanged
+                return result
+            return cls.apply_signal_stretch(result, levels=reference['stretch_levels'])
             
         # 5. Gamma
-        if params.get('gamma_enabled', False):
+        if stage == 'gamma':
             g_val = params.get('gamma', 1.0)
             print(f"DEBUG: [Enhance] Applying Gamma: Val={g_val:.4f}")
-            result = cls.apply_display_gamma(result, gamma=g_val)
-            
-        t_total = time.time() - t_start
-        
-        # --- Symmetry Verification Summary ---
-        out_mean = np.mean(result)
-        out_std = np.std(result)
-        diff_mean = out_mean - in_mean
-        
-        if any(params.get(k, False) for k in ['bg_enabled', 'contrast_enabled', 'noise_enabled', 'stretch_enabled', 'gamma_enabled']):
-            print(f"DEBUG: [Enhance] Pipeline Summary: Mean {in_mean:.2f}->{out_mean:.2f} (diff={diff_mean:+.2f}), Std {in_std:.2f}->{out_std:.2f}")
+            return cls.apply_display_gamma(result, gamma=g_val)
         
-        if t_total > 0.01:
-            print(f"[Timing] Enhance: Pipeline Total {t_total:.4f}s")
-            
         return result
 
     @classmethod
@@ -0,0 +1,97 @@
+import os
+import json
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.core.logger import Logger
+
+
+def iter_image_files(folder_path: str, extensions: tuple, recursive: bool = False) -> Iterator[os.DirEntry]:
+    """
+    Yields directory entries of image files below folder_path using os.scandir.
+    Hidden directories (e.g. the project .cache) are skipped when recursing.
+    """
+    stack = [folder_path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                subdirs = []
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            if entry.name.lower().endswith(extensions):
+                                yield entry
+                        elif recursive and entry.is_dir() and not entry.name.startswith('.'):
+                            subdirs.append(entry.path)
+                    except OSError:
+                        continue
+                # Keep a stable, os.walk-like order
+                stack.extend(sorted(subdirs, reverse=True))
+        except OSError as e:
+            print(f"Error scanning folder: {e}")
+
+
+class FileIndex:
+    """
+    Persistent path -> (size, mtime_ns) index of imported files for one project.
+    A re-scan consults it to report only files that are new or changed since they were
+    imported; files are recorded once they are validated and added to the project.
+    """
+    VERSION = 1
+
+    def __init__(self, index_path: Optional[str] = None):
+        self.index_path = index_path
+        self._entries: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                with self._lock:
+                    self._entries = {k: (int(v[0]), int(v[1])) for k, v in data.get("files", {}).items()}
+        except Exception as e:
+            Logger.warning(f"[FileIndex] Could not read {self.index_path}: {e}")
+
+    def save(self):
+        if not self.index_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": self.VERSION, "files": {k: list(v) for k, v in self._entries.items()}}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            Logger.warning(f"[FileIndex] Could not write {self.index_path}: {e}")
+
+    def is_current(self, path: str, size: int, mtime_ns: int) -> bool:
+        """True if path was recorded with this stat."""
+        with self._lock:
+            return self._entries.get(os.path.normpath(path)) == (int(size), int(mtime_ns))
+
+    def update(self, path: str, size: int, mtime_ns: int) -> bool:
+        """Records path's stat; returns True if it is new or changed since the last record."""
+        key = os.path.normpath(path)
+        stamp = (int(size), int(mtime_ns))
+        with self._lock:
+            if self._entries.get(key) == stamp:
+                return False
+            self._entries[key] = stamp
+            self._dirty = True
+            return True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
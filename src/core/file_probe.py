@@ -0,0 +1,256 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+import tifffile
+
+from src.core.logger import Logger
+from src.core.tiff_window import read_page_window
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+
+# Pillow mode -> (samples per pixel or None for 2D, numpy dtype name)
+_PIL_MODES = {
+    "L": (None, "uint8"),
+    "P": (3, "uint8"),
+    "RGB": (3, "uint8"),
+    "RGBA": (4, "uint8"),
+    "LA": (2, "uint8"),
+    "I;16": (None, "uint16"),
+    "I;16B": (None, "uint16"),
+    "I;16L": (None, "uint16"),
+    "I": (None, "int32"),
+    "F": (None, "float32"),
+}
+
+
+class FileProbe:
+    """
+    Header-level description of an image file used by import validation and channel checks.
+    Shape, dtype, axes and samples come from TIFF tags / image headers only. A small strided
+    pixel sample (H, W[, C], RGB order) is decoded on demand for colour/channel heuristics.
+    """
+    SAMPLE_DIM = 256
+    TIFF_EXTS = (".tif", ".tiff")
+    RASTER_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ext = os.path.splitext(path)[1].lower() if path else ""
+        self.ok = False
+        self.reason = "exception"
+        self.meta = {}
+        self.shape: Optional[Tuple[int, ...]] = None   # First page / image shape
+        self.dtype: Optional[str] = None
+        self.series_shape: Optional[Tuple[int, ...]] = None
+        self.series_axes: str = ""
+        self.samples = 1
+        self._sample = None
+        self._sample_loaded = False
+        self._lock = threading.Lock()
+        self._probe()
+
+    @property
+    def is_tiff(self) -> bool:
+        return self.ext in self.TIFF_EXTS
+
+    def _probe(self):
+        try:
+            if not self.path or not os.path.isfile(self.path):
+                self.reason = "not_a_file"
+                return
+            if os.path.getsize(self.path) <= 0:
+                self.reason = "empty_file"
+                return
+
+            if self.is_tiff:
+                with tifffile.TiffFile(self.path) as tif:
+                    page = tif.pages[0]
+                    self.shape = tuple(page.shape) if page.shape is not None else None
+                    self.dtype = str(page.dtype) if page.dtype is not None else None
+                    self.samples = int(getattr(page, 'samplesperpixel', 1) or 1)
+                    if tif.series:
+                        self.series_shape = tuple(tif.series[0].shape)
+                        self.series_axes = tif.series[0].axes
+            elif self.ext in self.RASTER_EXTS:
+                if not self._probe_raster_header():
+                    # No usable header reader: decode once and keep only a sample
+                    data = self._decode_raster()
+                    if data is None:
+                        self.reason = "decode_failed"
+                        return
+                    self.shape = tuple(data.shape)
+                    self.dtype = str(data.dtype)
+                    self._sample = self._stride(data)
+                    self._sample_loaded = True
+            else:
+                self.reason = "unsupported_extension"
+                self.meta = {"ext": self.ext}
+                return
+
+            self.meta = {"shape": self.shape, "dtype": self.dtype}
+            if not self.shape or len(self.shape) not in (2, 3):
+                self.reason = "unsupported_shape"
+                return
+            self.ok = True
+            self.reason = "ok"
+        except Exception as e:
+            self.reason = "exception"
+            self.meta = {"error": str(e)}
+
+    def _probe_raster_header(self) -> bool:
+        if not HAS_PIL:
+            return False
+        try:
+            with Image.open(self.path) as im:
+                mode_info = _PIL_MODES.get(im.mode)
+                if mode_info is None:
+                    return False
+                samples, dtype = mode_info
+                w, h = im.size
+                self.shape = (h, w) if samples is None else (h, w, samples)
+                self.dtype = dtype
+                self.samples = samples or 1
+                return True
+        except Exception:
+            return False
+
+    def get_sample(self) -> Optional[np.ndarray]:
+        """Strided pixel sample (about SAMPLE_DIM on the short side), channels last, RGB order."""
+        with self._lock:
+            if not self._sample_loaded:
+                self._sample_loaded = True
+                try:
+                    self._sample = self._read_tiff_sample() if self.is_tiff else self._read_raster_sample()
+                except Exception as e:
+                    Logger.debug(f"[FileProbe] Sample read failed for {self.path}: {e}")
+                    self._sample = None
+            return self._sample
+
+    def _stride(self, data: np.ndarray) -> np.ndarray:
+        step = max(1, min(data.shape[0], data.shape[1]) // self.SAMPLE_DIM)
+        return np.ascontiguousarray(data[::step, ::step])
+
+    def _read_tiff_sample(self) -> Optional[np.ndarray]:
+        with tifffile.TiffFile(self.path) as tif:
+            series = tif.series[0] if tif.series else None
+            page = tif.pages[0]
+
+            # RGB(A) / multi-sample page: (Y, X, S) or planar (S, Y, X)
+            if page.ndim == 3:
+                return self._page_sample(tif, page)
+
+            # Channels stored as separate pages, e.g. (C, Y, X): sample each page
+            if series is not None:
+                extra = [(a, s) for a, s in zip(series.axes, series.shape) if a not in "YX" and s > 1]
+                if len(extra) == 1 and extra[0][1] <= 10 and len(series.pages) == extra[0][1]:
+                    planes = [self._page_sample(tif, series.pages[i]) for i in range(extra[0][1])]
+                    return np.stack(planes, axis=-1)
+                if extra:
+                    # Higher-dimensional stacks: no channel heuristics (treated like the raw 4D+ data before)
+                    return None
+
+            return self._page_sample(tif, page)
+
+    def _page_sample(self, tif: tifffile.TiffFile, page) -> np.ndarray:
+        """Strided sample of a TIFF page (channels last), as _stride of the whole page but without decoding it."""
+        if isinstance(page, tifffile.TiffFrame):
+            page = page.aspage() # Frames of a series share tags with its first page
+        _, _, h, w, _ = page.shaped
+        data = read_page_window(tif, page, 0, h, 0, w, step=max(1, min(h, w) // self.SAMPLE_DIM))
+        if data is not None:
+            return data
+        data = page.asarray()
+        if page.ndim == 3 and page.axes.startswith('S'):
+            data = np.moveaxis(data, 0, -1)
+        return self._stride(data)
+
+    def _read_raster_sample(self) -> Optional[np.ndarray]:
+        if HAS_PIL:
+            try:
+                with Image.open(self.path) as im:
+                    # JPEG: decode at reduced scale directly
+                    im.draft(im.mode, (self.SAMPLE_DIM, self.SAMPLE_DIM))
+                    if im.mode == "P":
+                        im = im.convert("RGB")
+                    return self._stride(np.asarray(im))
+            except Exception:
+                pass
+        data = self._decode_raster()
+        return self._stride(data) if data is not None else None
+
+    def _decode_raster(self) -> Optional[np.ndarray]:
+        # np.fromfile handles Unicode paths
+        stream = np.fromfile(self.path, dtype=np.uint8)
+        data = cv2.imdecode(stream, cv2.IMREAD_UNCHANGED)
+        if data is not None and data.ndim == 3:
+            if data.shape[2] == 3:
+                data = cv2.cvtColor(data, cv2.COLOR_BGR2RGB)
+            elif data.shape[2] == 4:
+                data = cv2.cvtColor(data, cv2.COLOR_BGRA2RGBA)
+        return data
+
+
+class FileProbeCache:
+    """
+    Process-wide cache of FileProbe results keyed by path, validated by mtime and size,
+    so repeated checks on drop/import open each file once.
+    """
+    _instance = None
+
+    def __init__(self, max_items: int = 4096):
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[int, int, FileProbe]]" = OrderedDict()
+        self._max_items = max(1, int(max_items))
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def max_items(self) -> int:
+        return self._max_items
+
+    def get(self, path: str) -> FileProbe:
+        key = os.path.normcase(os.path.abspath(path)) if path else ""
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except (OSError, TypeError, ValueError):
+            stamp = (-1, -1)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and (entry[0], entry[1]) == stamp:
+                self._cache.move_to_end(key)
+                return entry[2]
+
+        probe = FileProbe(path)
+        with self._lock:
+            self._cache[key] = (stamp[0], stamp[1], probe)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_items:
+                self._cache.popitem(last=False)
+        return probe
+
+    def invalidate(self, path: Optional[str] = None):
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.normcase(os.path.abspath(path)), None)
+
+
+def probe_file(path: str) -> FileProbe:
+    """Cached header probe for path (see FileProbeCache)."""
+    return FileProbeCache.instance().get(path)
@@ -4,6 +4,9 @@ import tifffile
 import cv2
 from typing import Optional, Tuple, Union
 from .channel_config import get_rgb_mapping
+from .stack_source import StackSource
+from .pyramid_source import PyramidSource
+from .tile_cache import TilePyramid
 
 class ImageLoader:
     """
@@ -88,6 +91,66 @@ class ImageLoader:
         is_rgb = raw_data.ndim == 3
         return raw_data, is_rgb
 
+    @staticmethod
+    def open_stack(file_path: str) -> Optional[StackSource]:
+        """
+        Opens a Z-stack / time-series TIFF lazily.
+        Returns a StackSource for plane-by-plane access, or None for single-plane images
+        (which should be loaded with load_image).
+        """
+        return StackSource.open(file_path)
+
+    @staticmethod
+    def open_pyramid(file_path: str) -> Optional[PyramidSource]:
+        """
+        Opens a pyramidal TIFF (OME sub-resolutions / sub-IFDs) lazily.
+        Returns a PyramidSource for level-by-level access, or None if the file has no
+        reduced-resolution levels.
+        """
+        return PyramidSource.open(file_path)
+
+    @staticmethod
+    def open_tile_pyramid(file_path: str, cache_root: Optional[str]) -> Optional[TilePyramid]:
+        """
+        Returns the on-disk tile pyramid previously built for a large flat image,
+        or None if there is no up-to-date cache (see TilePyramid.build).
+        """
+        if not cache_root:
+            return None
+        return TilePyramid.open(file_path, cache_root)
+
+    @staticmethod
+    def open_source(file_path: str, cache_root: Optional[str] = None,
+                    overview_dim: int = 1024) -> Tuple[np.ndarray, Optional[StackSource], Optional[Union[PyramidSource, TilePyramid]]]:
+        """
+        Opens an image for display, lazily where the file allows it: pyramids (in the file,
+        or a tile pyramid built under cache_root) decode only the coarsest level whose long
+        side is at least overview_dim, Z/T stacks only their max projection; other images
+        are loaded whole (load_image).
+        Returns (data, stack, pyramid); at most one of stack and pyramid is set, and the
+        caller owns it (close() when done).
+        """
+        pyramid = ImageLoader.open_pyramid(file_path)
+        if pyramid is None:
+            pyramid = ImageLoader.open_tile_pyramid(file_path, cache_root)
+        if pyramid is not None:
+            try:
+                return pyramid.read_level(pyramid.level_for_max_dim(overview_dim)), None, pyramid
+            except Exception:
+                pyramid.close()
+                raise
+
+        stack = ImageLoader.open_stack(file_path)
+        if stack is not None:
+            try:
+                return stack.projection("max"), stack, None
+            except Exception:
+                stack.close()
+                raise
+
+        data, _ = ImageLoader.load_image(file_path)
+        return data, None, None
+
     @staticmethod
     def extract_channel_data(raw_data: np.ndarray, channel_name: str) -> np.ndarray:
         """
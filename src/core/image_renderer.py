@@ -1,8 +1,11 @@
+import threading
 import numpy as np
 import cv2
-from typing import List, Tuple
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from .data_model import ImageChannel
 from .enhance import EnhanceProcessor
+from .preview_controller import record_stage_time
 
 def is_opencl_enabled():
     """Checks if OpenCL is both available and enabled in OpenCV."""
@@ -30,6 +33,19 @@ class ImageRenderer:
        >>> lut = ImageRenderer.generate_rgb_lut(min_val=0, max_val=1000, gamma=1.0, hex_color='#00FF00')
     """
 
+    # LRU of generated LUTs keyed by (min, max, gamma, color, size, depth); shared by render threads
+    LUT_CACHE_SIZE = 64
+    _lut_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+    _lut_lock = threading.Lock()
+
+    # Long side of the decimated whole image that region enhancement takes its global quantities from
+    REFERENCE_DIM = 1024
+
+    @staticmethod
+    def clear_cache():
+        with ImageRenderer._lut_lock:
+            ImageRenderer._lut_cache.clear()
+
     @staticmethod
     def hex_to_rgb(hex_color: str) -> Tuple[float, float, float]:
         """Converts hex string (e.g., '#FF0000') to normalized RGB tuple (1.0, 0.0, 0.0)."""
@@ -44,7 +60,116 @@ class ImageRenderer:
         Generates an Nx3 LUT for fast bit-depth -> RGB mapping.
         Default size 65536 is for 16-bit data.
         out_depth: 8 for uint8, 16 for uint16.
+        LUTs are memoized (LRU); the returned array is shared and read-only.
+        """
+        key = (float(min_val), float(max_val), float(gamma), hex_color, int(lut_size), int(out_depth))
+        return ImageRenderer._memoized_lut(
+            key, lambda: ImageRenderer._build_rgb_lut(min_val, max_val, gamma, hex_color, lut_size, out_depth))
+
+    @staticmethod
+    def generate_index_lut(min_val: float, max_val: float, lut_size: int = 65536) -> np.ndarray:
+        """
+        Generates the uint8 LUT that quantizes raw values to display indices 0-255 for the
+        min/max window (the linear part of generate_rgb_lut). Memoized like the RGB LUTs.
         """
+        key = ('index', float(min_val), float(max_val), int(lut_size))
+        return ImageRenderer._memoized_lut(
+            key, lambda: ImageRenderer._build_rgb_lut(min_val, max_val, 1.0, '#FFFFFF', lut_size, 8)[:, 0].copy())
+
+    @staticmethod
+    def generate_index_palette(gamma: float, hex_color: str) -> np.ndarray:
+        """(256, 3) uint8 palette mapping display indices to colour (gamma applied on the 256 levels)."""
+        return ImageRenderer.generate_rgb_lut(0, 255, gamma, hex_color, lut_size=256, out_depth=8)
+
+    @staticmethod
+    def apply_index_palette(indices: np.ndarray, palette: np.ndarray) -> np.ndarray:
+        """palette[indices] as (H, W, 3) uint8, via cv2.LUT (several times faster than fancy indexing)."""
+        return cv2.LUT(cv2.merge([indices, indices, indices]), palette.reshape(256, 1, 3))
+
+    @staticmethod
+    def _memoized_lut(key: tuple, build) -> np.ndarray:
+        with ImageRenderer._lut_lock:
+            lut = ImageRenderer._lut_cache.get(key)
+            if lut is not None:
+                ImageRenderer._lut_cache.move_to_end(key)
+                return lut
+
+        lut = build()
+        lut.flags.writeable = False
+        with ImageRenderer._lut_lock:
+            ImageRenderer._lut_cache[key] = lut
+            while len(ImageRenderer._lut_cache) > ImageRenderer.LUT_CACHE_SIZE:
+                ImageRenderer._lut_cache.popitem(last=False)
+        return lut
+
+    @staticmethod
+    def has_enhancement(enhance_params: dict) -> bool:
+        """True if the enhancement parameters change the data (a gamma of 1.0 alone does not)."""
+        if not enhance_params:
+            return False
+        other_ops = (
+            enhance_params.get('stretch_enabled', False) or
+            enhance_params.get('bg_enabled', False) or
+            enhance_params.get('contrast_enabled', False) or
+            enhance_params.get('noise_enabled', False) or
+            enhance_params.get('median_enabled', False)
+        )
+        if other_ops:
+            return True
+        return (enhance_params.get('gamma_enabled', False) and
+                abs(enhance_params.get('gamma', 1.0) - 1.0) >= 0.001)
+
+    @staticmethod
+    def _lut_size_for(channel: ImageChannel, processed_data: np.ndarray, data: np.ndarray) -> int:
+        if processed_data.dtype == np.uint8:
+            return 256
+        if processed_data is data and channel.pyramid is None:
+            # Unenhanced flat data (possibly subsampled): the channel's cached maximum bounds it
+            return min(65536, max(256, channel.data_max() + 1))
+        # Enhanced data or pyramid levels: full-range LUT (memoized, so no scan and no rebuild)
+        return 65536
+
+    @staticmethod
+    def _index_key(channel: ImageChannel) -> tuple:
+        settings = channel.display_settings
+        return (channel.data_version, float(settings.min_val), float(settings.max_val))
+
+    @staticmethod
+    def _quantize_for_display(channel: ImageChannel, data: np.ndarray, target_shape, lut_size: int) -> np.ndarray:
+        """
+        uint8 index image of the display data for the current min/max window.
+        Cached on the channel per target shape until the data or the window changes.
+        """
+        key = ImageRenderer._index_key(channel)
+        entry = channel._index_cache.get(target_shape)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        settings = channel.display_settings
+        indices = ImageRenderer.generate_index_lut(settings.min_val, settings.max_val, lut_size)[data]
+        if target_shape not in channel._index_cache and len(channel._index_cache) >= 4:
+            channel._index_cache.clear() # Display sizes of the view containers (preview, full, thumbnail)
+        channel._index_cache[target_shape] = (key, indices)
+        return indices
+
+    @staticmethod
+    def indexed_display(channel: ImageChannel, target_shape: Tuple[int, int] = None):
+        """
+        (indices, palette) of the channel's display image if its last display render at
+        target_shape took the indexed path and is still current, else None.
+        The image equals palette[indices]; a colour or gamma change only changes the palette.
+        """
+        settings = channel.display_settings
+        entry = channel._index_cache.get(target_shape)
+        if entry is None or entry[0] != ImageRenderer._index_key(channel):
+            return None
+        if not settings.visible or getattr(channel, 'is_rgb', False) or \
+                ImageRenderer.has_enhancement(getattr(settings, 'enhance_params', {})):
+            return None
+        return entry[1], ImageRenderer.generate_index_palette(settings.gamma, settings.color)
+
+    @staticmethod
+    def _build_rgb_lut(min_val: float, max_val: float, gamma: float, hex_color: str, lut_size: int, out_depth: int) -> np.ndarray:
         # Create base ramp 0 to (lut_size - 1)
         ramp = np.arange(lut_size, dtype=np.float32)
         
@@ -74,10 +199,18 @@ class ImageRenderer:
         return lut
 
     @staticmethod
-    def render_channel(channel: ImageChannel, target_shape: Tuple[int, int] = None, out_depth: int = 8) -> np.ndarray:
+    def render_channel(channel: ImageChannel, target_shape: Tuple[int, int] = None, out_depth: int = 8, integer_output: bool = False, indexed: bool = False, skip_stages=()) -> np.ndarray:
         """
         Renders a single channel to an RGB image.
         out_depth: 8 (uint8 result) or 16 (uint16 result).
+        By default the result is normalized float32 RGB. With integer_output=True it is
+        uint8/uint16 RGB (per out_depth): integer data maps straight through the LUT
+        without float temporaries.
+        indexed=True (on-screen display, with integer_output and out_depth 8): unenhanced
+        single-plane integer data is quantized to a cached 8-bit index image and coloured
+        through a 256-entry palette (see indexed_display); gamma then works on 256 levels.
+        skip_stages: enhancement stages ('bg', 'contrast', 'noise', ...) left out, for
+        adjustment previews that would not fit their frame budget (see PreviewController).
         
         Scientific Rigor Notes:
         1. Signal Integrity: Uses raw_data for processing. If target_shape is provided,
@@ -95,8 +228,8 @@ class ImageRenderer:
         if not channel.display_settings.visible:
             return None
 
-        # 1. Source Data (Always start with Raw Data)
-        data = channel.raw_data
+        # 1. Source Data (Raw Data, or the closest pyramid level for downsampled display)
+        data = channel.get_display_data(target_shape)
         
         if data is None or data.size == 0:
             return None
@@ -128,75 +261,30 @@ class ImageRenderer:
 
         # Check for Enhancement Parameters
         enhance_params = getattr(settings, 'enhance_params', {})
-        
-        has_enhancement = False
-        if enhance_params:
-            has_enhancement = (
-                enhance_params.get('stretch_enabled', False) or
-                enhance_params.get('bg_enabled', False) or
-                enhance_params.get('contrast_enabled', False) or
-                enhance_params.get('noise_enabled', False) or
-                enhance_params.get('gamma_enabled', False) or
-                enhance_params.get('median_enabled', False)
-            )
-            
-            if has_enhancement and enhance_params.get('gamma_enabled', False):
-                 if abs(enhance_params.get('gamma', 1.0) - 1.0) < 0.001:
-                      other_ops = (
-                        enhance_params.get('stretch_enabled', False) or
-                        enhance_params.get('bg_enabled', False) or
-                        enhance_params.get('contrast_enabled', False) or
-                        enhance_params.get('noise_enabled', False) or
-                        enhance_params.get('median_enabled', False)
-                      )
-                      if not other_ops:
-                           has_enhancement = False
-
-        if not has_enhancement:
-            if hasattr(channel, '_cached_enhanced_data'):
-                channel._cached_enhanced_data = None
-            if hasattr(channel, '_last_enhance_params'):
-                channel._last_enhance_params = None
-            if hasattr(channel, '_preview_enhance_cache'):
-                channel._preview_enhance_cache.clear()
+        if skip_stages and enhance_params:
+            enhance_params = dict(enhance_params, **{f'{stage}_enabled': False for stage in skip_stages})
+        has_enhancement = ImageRenderer.has_enhancement(enhance_params)
 
         processed_data = data
         
         if has_enhancement:
-            use_cache = False
-            # Fix: is_full_res should also check if the current data matches the cached shape
-            current_shape = data.shape
-            is_full_res = (data.shape == channel.raw_data.shape)
+            from .render_cache import EnhanceStageCache
+            # Stage outputs are memoized per input (this channel's data at this render size):
+            # changing a later stage reuses the results of the stages before it
+            stage_cache = EnhanceStageCache.instance().for_input(channel, (target_shape, data.shape, scale_factor))
+            reference = None
+            if target_shape is not None and ImageRenderer.is_tileable(channel):
+                # Reduced display renders (the overviews detail tiles are drawn over) share the
+                # tiles' whole-image quantities; full-frame renders (exports) compute their own
+                reference = dict(ImageRenderer._enhance_reference(channel, enhance_params))
+            processed_data = EnhanceProcessor.apply_pipeline(processed_data, enhance_params, scale_factor=scale_factor,
+                                                             reference=reference, stage_cache=stage_cache)
             
-            if (getattr(channel, '_last_enhance_params', None) == enhance_params and 
-                getattr(channel, '_cached_enhanced_data', None) is not None and
-                channel._cached_enhanced_data.shape == current_shape):
-                processed_data = channel._cached_enhanced_data
-                use_cache = True
-            elif target_shape is not None:
-                cache_key = (target_shape, tuple(sorted(enhance_params.items())))
-                preview_cache = getattr(channel, '_preview_enhance_cache', {})
-                if cache_key in preview_cache:
-                    processed_data = preview_cache[cache_key]
-                    use_cache = True
-            
-            if not use_cache:
-                processed_data = EnhanceProcessor.process_scientific_pipeline(processed_data, enhance_params, scale_factor=scale_factor)
-                
-                if enhance_params.get('median_enabled', False):
-                    k = enhance_params.get('median_kernel', 3)
-                    processed_data = EnhanceProcessor.apply_median_filter(processed_data, k)
-                    
-                if is_full_res:
-                    channel._cached_enhanced_data = processed_data
-                    channel._last_enhance_params = enhance_params.copy()
-                elif target_shape is not None:
-                    cache_key = (target_shape, tuple(sorted(enhance_params.items())))
-                    if not hasattr(channel, '_preview_enhance_cache'):
-                        channel._preview_enhance_cache = {}
-                    if len(channel._preview_enhance_cache) > 5:
-                        channel._preview_enhance_cache.clear()
-                    channel._preview_enhance_cache[cache_key] = processed_data
+            if enhance_params.get('median_enabled', False):
+                k = enhance_params.get('median_kernel', 3)
+                t_median = time.perf_counter()
+                processed_data = EnhanceProcessor.apply_median_filter(processed_data, k)
+                record_stage_time('median', (time.perf_counter() - t_median) * 1000)
             
             # Final Safety: Ensure processed_data matches expected spatial dimensions
             if target_shape is not None and processed_data.shape[:2] != target_shape:
@@ -224,23 +312,29 @@ class ImageRenderer:
                   
                   result = mapped_data
 
+        # INDEXED PATH: unenhanced single-plane integer data for display. Quantized once per
+        # min/max window to an 8-bit index image; colour and gamma only change the 256-entry palette.
+        if (result is None and indexed and integer_output and out_depth == 8 and processed_data is data
+                and processed_data.ndim == 2 and processed_data.dtype in (np.uint8, np.uint16)):
+            try:
+                lut_size = ImageRenderer._lut_size_for(channel, processed_data, data)
+                indices = ImageRenderer._quantize_for_display(channel, processed_data, target_shape, lut_size)
+                result = ImageRenderer.apply_index_palette(indices, ImageRenderer.generate_index_palette(lut_gamma, settings.color))
+            except Exception as e:
+                print(f"[ImageRenderer ERROR] Indexed path failed: {e}")
+
         # FAST PATH: Integer -> RGB LUT
         if result is None and processed_data.dtype in (np.uint8, np.uint16):
             try:
-                # Use a safer way to determine LUT size
-                if processed_data.dtype == np.uint8:
-                    lut_size = 256
-                else:
-                    d_max = np.max(processed_data)
-                    lut_size = int(d_max) + 1
-                    if lut_size < 256: lut_size = 256
-                    if lut_size > 65536: lut_size = 65536
-                
+                lut_size = ImageRenderer._lut_size_for(channel, processed_data, data)
                 lut = ImageRenderer.generate_rgb_lut(settings.min_val, settings.max_val, lut_gamma, settings.color, lut_size=lut_size, out_depth=out_depth)
                 rgb_mapped = lut[processed_data]
                 
-                max_val_out = 255.0 if out_depth == 8 else 65535.0
-                result = rgb_mapped.astype(np.float32) / max_val_out
+                if integer_output:
+                    result = rgb_mapped
+                else:
+                    max_val_out = 255.0 if out_depth == 8 else 65535.0
+                    result = rgb_mapped.astype(np.float32) / max_val_out
             except Exception as e:
                 print(f"[ImageRenderer ERROR] LUT path failed: {e}")
 
@@ -272,12 +366,135 @@ class ImageRenderer:
             except Exception as e:
                 print(f"[ImageRenderer CRITICAL] Fallback path failed: {e}")
             
+        if integer_output and result is not None and result.dtype.kind == 'f':
+            result = ImageRenderer.float_to_integer_rgb(result, out_depth)
         return result
 
+    @staticmethod
+    def is_tileable(channel: ImageChannel) -> bool:
+        """True if the channel can be rendered region by region (render_tile): single-plane integer data."""
+        return (channel.has_data and not getattr(channel, 'is_rgb', False)
+                and np.dtype(channel.dtype) in (np.uint8, np.uint16))
+
+    @staticmethod
+    def render_tile(channels: List[ImageChannel], y0: int, y1: int, x0: int, x1: int, downsample: int = 1) -> Optional[np.ndarray]:
+        """
+        uint8 RGB of the full-resolution region [y0:y1, x0:x1] at 1/downsample resolution:
+        one channel, or the saturated sum of several (as the merge). Only the region is read
+        and mapped; enhanced channels are enhanced over the region only (see _enhanced_region).
+        Returns None if a visible channel is not tileable.
+        """
+        layers = []
+        for channel in channels:
+            if not channel.display_settings.visible:
+                continue
+            if not ImageRenderer.is_tileable(channel):
+                return None
+            enhance_params = getattr(channel.display_settings, 'enhance_params', {})
+            if ImageRenderer.has_enhancement(enhance_params):
+                block = ImageRenderer._enhanced_region(channel, enhance_params, y0, y1, x0, x1, downsample)
+            else:
+                block = channel.read_region(y0, y1, x0, x1, downsample)
+            if block.ndim != 2:
+                return None
+            settings = channel.display_settings
+            lut_size = 256 if block.dtype == np.uint8 else 65536
+            lut = ImageRenderer.generate_rgb_lut(settings.min_val, settings.max_val, settings.gamma, settings.color, lut_size=lut_size)
+            layers.append(lut[block])
+
+        if not layers:
+            h = -(-(y1 - y0) // max(1, downsample))
+            w = -(-(x1 - x0) // max(1, downsample))
+            return np.zeros((h, w, 3), dtype=np.uint8)
+        if len(layers) == 1:
+            return layers[0]
+        # Pyramid levels of different channels can differ by a pixel
+        h = min(layer.shape[0] for layer in layers)
+        w = min(layer.shape[1] for layer in layers)
+        total = np.zeros((h, w, 3), dtype=np.uint16)
+        for layer in layers:
+            np.add(total, layer[:h, :w], out=total)
+        out = np.empty((h, w, 3), dtype=np.uint8)
+        np.minimum(total, 255, out=out, casting='unsafe')
+        return out
+
+    @staticmethod
+    def _enhanced_region(channel: ImageChannel, enhance_params: dict, y0: int, y1: int, x0: int, x1: int, downsample: int = 1) -> np.ndarray:
+        """
+        Enhanced data of the full-resolution region [y0:y1, x0:x1] at 1/downsample resolution.
+        The pipeline runs on the region plus the margin its local stages read (top-hat kernel,
+        bilateral radius), widened to whole tiles of the image's CLAHE grid when local contrast
+        is on, and takes its global quantities (bilateral range, stretch levels) from the whole
+        image (_enhance_reference), so the result matches the same area of the whole image.
+        """
+        step = max(1, int(downsample))
+        h, w = channel.shape[:2]
+        scale_factor = 1.0 / step
+        reference = dict(ImageRenderer._enhance_reference(channel, enhance_params))
+        margin = EnhanceProcessor.enhancement_margin(enhance_params, scale_factor) # at this resolution
+
+        # Region at this resolution (multiples of step in full resolution keep the decimation aligned)
+        ry0, ry1 = max(0, y0 // step - margin), -(-min(h, y1 + margin * step) // step)
+        rx0, rx1 = max(0, x0 // step - margin), -(-min(w, x1 + margin * step) // step)
+        if enhance_params.get('contrast_enabled', False):
+            tiles = int(enhance_params.get('contrast_tile', 8))
+            hd, wd = -(-h // step), -(-w // step)
+            # OpenCV pads the whole image to (n // tiles + 1) * tiles unless both sides divide evenly
+            if hd % tiles == 0 and wd % tiles == 0:
+                th, tw = hd // tiles, wd // tiles
+            else:
+                th, tw = hd // tiles + 1, wd // tiles + 1
+            # Whole tiles plus a ring whose histograms the region interpolates with, and one more
+            # ring if the local stages' margin could reach into those histograms
+            ring = 1 + -(-margin // max(1, min(th, tw)))
+            ry0, ry1 = max(0, (ry0 // th - ring) * th), min(hd, (-(-ry1 // th) + ring) * th)
+            rx0, rx1 = max(0, (rx0 // tw - ring) * tw), min(wd, (-(-rx1 // tw) + ring) * tw)
+            reference['contrast_tile_px'] = (th, tw)
+
+        block = channel.read_region(ry0 * step, min(h, ry1 * step), rx0 * step, min(w, rx1 * step), step)
+        processed = EnhanceProcessor.apply_pipeline(block, enhance_params, scale_factor=scale_factor, reference=reference)
+        oy, ox = y0 // step - ry0, x0 // step - rx0
+        return processed[oy:oy + -(-(y1 - y0) // step), ox:ox + -(-(x1 - x0) // step)]
+
+    @staticmethod
+    def _enhance_reference(channel: ImageChannel, enhance_params: dict) -> dict:
+        """
+        Whole-image quantities of the channel's enhancement (see EnhanceProcessor.apply_pipeline
+        reference), from the image decimated to about REFERENCE_DIM; cached per data version and parameters
+        (the last few: previews that leave out stages alternate with full renders).
+        Shared by the reduced display renders (render_channel) and the detail tiles (_enhanced_region).
+        """
+        key = (channel.data_version, tuple(sorted(enhance_params.items())))
+        cached = channel._enhance_reference_cache
+        if cached is None or cached[0] != key[0]:
+            cached = channel._enhance_reference_cache = (key[0], {})
+        if key in cached[1]:
+            return cached[1][key]
+        h, w = channel.shape[:2]
+        step = max(1, -(-max(h, w) // ImageRenderer.REFERENCE_DIM))
+        reference = {}
+        EnhanceProcessor.apply_pipeline(channel.read_region(0, h, 0, w, step), enhance_params,
+                                        scale_factor=1.0 / step, reference=reference)
+        while len(cached[1]) >= 4:
+            del cached[1][next(iter(cached[1]))]
+        cached[1][key] = reference
+        return reference
+
+    @staticmethod
+    def float_to_integer_rgb(image: np.ndarray, out_depth: int = 8) -> np.ndarray:
+        """Converts normalized float RGB to uint8/uint16 the way the float pipeline always has (clip, scale, truncate)."""
+        max_val_out = 255.0 if out_depth == 8 else 65535.0
+        dtype_out = np.uint8 if out_depth == 8 else np.uint16
+        scaled = np.clip(image, 0.0, 1.0)
+        np.multiply(scaled, max_val_out, out=scaled)
+        return scaled.astype(dtype_out)
+
     @staticmethod
     def composite(channels: List[ImageChannel], target_shape: Tuple[int, int] = None, out_depth: int = 8) -> np.ndarray:
         """
         Merges all visible channels into a single normalized float32 RGB image.
+        Layers are rendered as integer RGB and summed in a wider integer buffer (uint16 for
+        8-bit output, uint32 for 16-bit), which is clamped and normalized in place at the end.
         """
         if target_shape is None and channels:
             for ch in channels:
@@ -288,31 +505,21 @@ class ImageRenderer:
         if target_shape is None:
             return None
             
-        if is_opencl_enabled():
-            final_img_u = cv2.UMat(np.zeros((target_shape[0], target_shape[1], 3), dtype=np.float32))
-        else:
-            final_img = np.zeros((target_shape[0], target_shape[1], 3), dtype=np.float32)
+        max_val_out = 255 if out_depth == 8 else 65535
+        # Headroom for 257 full-scale layers before wrapping, far beyond any real channel count
+        acc = np.zeros((target_shape[0], target_shape[1], 3), dtype=np.uint16 if out_depth == 8 else np.uint32)
         
         for ch in channels:
             if not ch.display_settings.visible:
                 continue
                 
-            layer = ImageRenderer.render_channel(ch, target_shape, out_depth=out_depth)
+            layer = ImageRenderer.render_channel(ch, target_shape, out_depth=out_depth, integer_output=True)
             if layer is not None:
-                if layer.dtype != np.float32:
-                    layer = layer.astype(np.float32)
-                    
-                if layer.shape[:2] != target_shape:
+                if layer.shape[:2] != tuple(target_shape):
                     layer = cv2.resize(layer, (target_shape[1], target_shape[0]), interpolation=cv2.INTER_NEAREST)
-                    
-                if is_opencl_enabled():
-                    layer_u = cv2.UMat(layer)
-                    final_img_u = cv2.add(final_img_u, layer_u)
-                else:
-                    final_img += layer
-                
-        if is_opencl_enabled():
-            final_img = final_img_u.get()
+                np.add(acc, layer, out=acc)
             
-        np.clip(final_img, 0.0, 1.0, out=final_img)
+        np.minimum(acc, max_val_out, out=acc)
+        final_img = acc.astype(np.float32)
+        final_img /= max_val_out
         return final_img
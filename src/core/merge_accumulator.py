@@ -0,0 +1,100 @@
+from typing import Dict, Hashable, Optional
+
+import cv2
+import numpy as np
+
+
+class MergeAccumulator:
+    """
+    Running sum of the visible channel layers of a merge view.
+    update() receives the layers that should be in the merge; a layer that changed is
+    subtracted and its replacement added, a hidden layer is subtracted, a shown one added,
+    so a single-channel change costs one or two layer operations instead of re-adding all.
+    uint8 layers are summed exactly in a uint16 buffer; float layers (normalized) in float32.
+    The sum is rebuilt from scratch when the shape or layer type changes, when that is cheaper
+    than the incremental update, or every REBUILD_EVERY incremental operations (float drift).
+    """
+
+    REBUILD_EVERY = 64
+
+    def __init__(self):
+        self._sum: Optional[np.ndarray] = None
+        self._layers: Dict[Hashable, np.ndarray] = {}
+        self._sources: Dict[Hashable, np.ndarray] = {} # key -> array passed to update (identity check)
+        self._ops_since_rebuild = 0
+
+    def reset(self):
+        self._sum = None
+        self._layers = {}
+        self._sources = {}
+        self._ops_since_rebuild = 0
+
+    def update(self, layers: Dict[Hashable, np.ndarray]) -> Optional[np.ndarray]:
+        """Brings the sum in line with {key: layer} and returns it (None if there are no layers)."""
+        if not layers:
+            self.reset()
+            return None
+
+        shape = next(iter(layers.values())).shape[:2]
+        integer = all(layer.dtype == np.uint8 for layer in layers.values())
+        removed = [k for k in self._sources if k not in layers or layers[k] is not self._sources[k]]
+        added = [k for k in layers if k not in self._sources or layers[k] is not self._sources[k]]
+        incremental_ops = len(removed) + len(added)
+
+        if (self._sum is None or self._sum.shape[:2] != shape
+                or integer != (self._sum.dtype == np.uint16)
+                or incremental_ops >= len(layers)
+                or (not integer and self._ops_since_rebuild + incremental_ops > self.REBUILD_EVERY)):
+            self._rebuild(layers, shape, integer)
+            return self._sum
+
+        for key in removed:
+            np.subtract(self._sum, self._layers.pop(key), out=self._sum)
+            del self._sources[key]
+        for key in added:
+            layer = self._as_layer(layers[key], shape, integer)
+            np.add(self._sum, layer, out=self._sum)
+            self._layers[key] = layer
+            self._sources[key] = layers[key]
+        self._ops_since_rebuild += incremental_ops
+        return self._sum
+
+    def to_uint8(self) -> Optional[np.ndarray]:
+        """The merge saturated to uint8 RGB (the sum itself is left untouched)."""
+        if self._sum is None:
+            return None
+        out = np.empty(self._sum.shape, dtype=np.uint8)
+        if self._sum.dtype == np.uint16:
+            # Saturating narrow straight into the display buffer
+            np.minimum(self._sum, 255, out=out, casting='unsafe')
+            return out
+        scaled = np.clip(self._sum, 0.0, 1.0)
+        np.multiply(scaled, 255.0, out=scaled)
+        out[...] = scaled
+        return out
+
+    def _rebuild(self, layers: Dict[Hashable, np.ndarray], shape, integer: bool):
+        self._layers = {}
+        self._sources = {}
+        total = np.zeros((shape[0], shape[1], 3), dtype=np.uint16 if integer else np.float32)
+        for key, source in layers.items():
+            layer = self._as_layer(source, shape, integer)
+            np.add(total, layer, out=total)
+            self._layers[key] = layer
+            self._sources[key] = source
+        self._sum = total
+        self._ops_since_rebuild = 0
+
+    @staticmethod
+    def _as_layer(image: np.ndarray, shape, integer: bool) -> np.ndarray:
+        if integer:
+            layer = image
+        elif image.dtype == np.float32:
+            layer = image
+        elif image.dtype == np.uint8:
+            layer = image.astype(np.float32) / 255.0
+        else:
+            layer = image.astype(np.float32)
+        if layer.shape[:2] != tuple(shape):
+            layer = cv2.resize(layer, (shape[1], shape[0]), interpolation=cv2.INTER_NEAREST)
+        return layer
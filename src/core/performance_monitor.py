@@ -3,6 +3,7 @@ import os
 from PySide6.QtCore import QObject, QThread, Signal, QTimer, Qt
 from src.core.logger import Logger
 from src.core.language_manager import tr
+from src.core.preview_controller import PreviewController
 
 try:
     import psutil
@@ -90,6 +91,8 @@ class PerformanceMonitor(QObject):
     LEVEL_HIGH = "high"      # High speed, low resolution
     LEVEL_BALANCED = "balanced" # Standard speed/quality
     LEVEL_QUALITY = "quality"   # Max quality, full resolution
+    
+    PREVIEW_BUDGET_KEY = "performance/preview_frame_budget_ms"
 
     # Signals
     lag_detected = Signal(float) # Emitted when a lag spike finishes
@@ -135,6 +138,12 @@ class PerformanceMonitor(QObject):
         self.use_antialiasing = not self.is_low_end_machine
         self.is_low_quality = not self.use_antialiasing
         
+        # Adaptive preview resolution (auto level): starts from the hardware heuristic,
+        # then follows the measured frame times
+        self.preview_controller = PreviewController(
+            initial_limit=384 if self.is_low_end_machine else 1024,
+            budget_ms=float(self._settings.value(self.PREVIEW_BUDGET_KEY, PreviewController.DEFAULT_BUDGET_MS)))
+        
         # Memory Monitoring Settings
         self.auto_cleanup_enabled = self._settings.value("performance/auto_cleanup", True, type=bool)
         # Default threshold: 75% of total RAM or 6GB, whichever is lower for safety
@@ -311,7 +320,10 @@ class PerformanceMonitor(QObject):
         self.cleanup_started.emit()
         
         from src.core.renderer import Renderer
+        from src.core.render_cache import EnhanceStageCache, RenderCache
         Renderer.clear_cache()
+        RenderCache.instance().clear()
+        EnhanceStageCache.instance().clear()
         Logger.info("[Performance] Renderer caches cleared.")
         
         try:
@@ -377,8 +389,12 @@ class PerformanceMonitor(QObject):
             self.performance_mode_changed.emit(is_high_perf)
             Logger.info(f"[Performance] Level set to: {level}")
 
-    def get_preview_limit(self, base_limit=1024):
-        """Returns a recommended resolution limit for preview rendering."""
+    def get_preview_limit(self, base_limit=1024, max_limit=None):
+        """
+        Returns a recommended resolution limit for preview rendering.
+        max_limit: the display resolution previews are refined to; in auto mode the adaptive
+        controller may raise the limit up to it once it has measured frames.
+        """
         level = self.current_level
         
         # 1. Manual Overrides
@@ -391,7 +407,10 @@ class PerformanceMonitor(QObject):
         elif level == self.LEVEL_QUALITY:
             return max(base_limit, 2048) # Allow higher res for quality mode
             
-        # 2. Auto Logic (Default)
+        # 2. Auto Logic (Default): closed loop once preview frames have been measured
+        if self.preview_controller.has_measurements:
+            return min(self.preview_controller.preview_limit, max_limit or base_limit)
+        
         if self.is_low_end_machine:
             return min(base_limit, 384) # Lowered from 512
         
@@ -401,6 +420,29 @@ class PerformanceMonitor(QObject):
             
         return base_limit
 
+    def get_preview_skip_stages(self):
+        """Enhancement stages adjustment previews leave out to stay within the frame budget (auto mode)."""
+        if self.current_level != self.LEVEL_AUTO:
+            return ()
+        return self.preview_controller.skipped_stages
+
+    def report_preview_frame(self, shape, render_ms, stage_ms, upload_ms, refined=False):
+        """View containers report each delivered preview (or refined) frame (see PreviewController.report_frame)."""
+        self.preview_controller.report_frame(shape, render_ms, stage_ms, upload_ms, decide=not refined)
+
+    def get_preview_budget_ms(self):
+        return self.preview_controller.budget_ms
+
+    def set_preview_budget_ms(self, budget_ms):
+        self.preview_controller.set_budget_ms(budget_ms)
+        self._settings.setValue(self.PREVIEW_BUDGET_KEY, self.preview_controller.budget_ms)
+
+    def get_preview_telemetry(self):
+        """Adaptive preview state and decisions (see PreviewController.telemetry)."""
+        telemetry = self.preview_controller.telemetry()
+        telemetry['level'] = self.current_level
+        return telemetry
+
     def optimize_for_speed(self):
         """Downgrades rendering settings to recover responsiveness."""
         if self.use_antialiasing:
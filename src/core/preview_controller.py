@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+from src.core.logger import Logger
+
+# Stage timings (ms) recorded on a thread while a render job collects them
+_local = threading.local()
+
+
+@contextmanager
+def collect_stage_times():
+    """Collects the record_stage_time() calls made on this thread inside the block into a dict."""
+    stages: Dict[str, float] = {}
+    previous = getattr(_local, 'stages', None)
+    _local.stages = stages
+    try:
+        yield stages
+    finally:
+        _local.stages = previous
+
+
+def record_stage_time(stage: str, ms: float):
+    """Adds a stage's time to the collecting render job on this thread (no-op outside one, e.g. exports)."""
+    stages = getattr(_local, 'stages', None)
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + ms
+
+
+class PreviewController:
+    """
+    Closed-loop choice of the resolution and enhancement stages of adjustment previews.
+    Every delivered preview frame reports its render time (submit to delivery, including
+    enhancement), the enhancement stages' share of it and the time spent handing it to the
+    views. These become per-megapixel costs (moving averages) from which the frame time at
+    each preview resolution is predicted; the largest resolution that fits the frame budget
+    is chosen. Only when the smallest one does not fit are the costliest enhancement stages
+    left out of previews (the refined frame always applies all of them).
+    Hysteresis: a frame predicted over budget * DOWN_MARGIN steps down at once, stepping up
+    (a dropped stage first, then resolution) needs UP_FRAMES frames within budget * UP_MARGIN.
+    Refined frames (all stages) are reported with decide=False: they keep the costs of the
+    stages previews leave out up to date.
+    """
+
+    RESOLUTIONS = (256, 384, 512, 768, 1024, 1536, 2048, 2560)
+    # Stages previews may leave out, in the order they are dropped (neighbourhood filters;
+    # stretch and gamma are per-pixel and cheap)
+    DROP_ORDER = ('noise', 'contrast', 'bg')
+    DEFAULT_BUDGET_MS = 33.0
+    DOWN_MARGIN = 1.15
+    UP_MARGIN = 0.75
+    UP_FRAMES = 3
+    SMOOTHING = 0.3
+
+    def __init__(self, initial_limit: int = 1024, budget_ms: float = DEFAULT_BUDGET_MS):
+        self.budget_ms = float(budget_ms)
+        self._index = self._index_for(initial_limit)
+        self._skipped: Tuple[str, ...] = ()
+        self._costs: Dict[str, float] = {} # ms per megapixel: 'render', 'upload' and enhancement stages
+        self._active_stages: Tuple[str, ...] = ()
+        self._aspect = 0.75 # pixels / long side^2 of the previews
+        self._up_streak = 0
+        self.frames = 0
+        self.last_frame: Optional[dict] = None
+        self.decisions = deque(maxlen=100)
+
+    @classmethod
+    def _index_for(cls, limit: int) -> int:
+        candidates = [i for i, res in enumerate(cls.RESOLUTIONS) if res <= limit]
+        return candidates[-1] if candidates else 0
+
+    @property
+    def has_measurements(self) -> bool:
+        return self.frames > 0
+
+    @property
+    def preview_limit(self) -> int:
+        return self.RESOLUTIONS[self._index]
+
+    @property
+    def skipped_stages(self) -> Tuple[str, ...]:
+        return self._skipped
+
+    def set_budget_ms(self, budget_ms: float):
+        self.budget_ms = max(1.0, float(budget_ms))
+        self._up_streak = 0
+
+    # --- Measurement ---
+
+    def report_frame(self, shape: Sequence[int], render_ms: float, stage_ms: Dict[str, float], upload_ms: float,
+                     decide: bool = True):
+        """
+        A delivered frame: its render shape, wall time from submit to delivery, per-stage
+        render job times summed over its jobs ('render' = whole renders, others = enhancement
+        stages within them) and the time spent updating the views. decide=False only updates
+        the cost model (refined frames).
+        """
+        pixels = int(shape[0]) * int(shape[1])
+        cpu_render = stage_ms.get('render', 0.0)
+        if pixels <= 0 or cpu_render <= 0.0:
+            return # Served from the render cache: says nothing about render cost
+        mpx = pixels / 1e6
+        self._aspect = pixels / float(max(shape[:2]) ** 2)
+
+        # Wall time split by the stages' share of the jobs' render time
+        stages = {name: ms for name, ms in stage_ms.items() if name != 'render'}
+        stage_wall = {name: render_ms * min(1.0, ms / cpu_render) for name, ms in stages.items()}
+        samples = {'render': max(0.0, render_ms - sum(stage_wall.values())) / mpx, 'upload': upload_ms / mpx}
+        samples.update({name: ms / mpx for name, ms in stage_wall.items()})
+        for name, value in samples.items():
+            previous = self._costs.get(name)
+            self._costs[name] = value if previous is None else previous + self.SMOOTHING * (value - previous)
+        if not decide:
+            return
+        self._active_stages = tuple(stages) + tuple(s for s in self._skipped if s not in stages)
+
+        self.frames += 1
+        self.last_frame = {'shape': tuple(shape[:2]), 'render_ms': round(render_ms, 1),
+                           'upload_ms': round(upload_ms, 1), 'total_ms': round(render_ms + upload_ms, 1),
+                           'stages_ms': {name: round(ms, 1) for name, ms in stage_wall.items()}}
+        self._decide(render_ms + upload_ms)
+
+    def predict_ms(self, index: int, skipped: Sequence[str] = ()) -> float:
+        """Predicted frame time at RESOLUTIONS[index] with the given stages left out."""
+        mpx = self._aspect * self.RESOLUTIONS[index] ** 2 / 1e6
+        cost = self._costs.get('render', 0.0) + self._costs.get('upload', 0.0)
+        cost += sum(self._costs.get(stage, 0.0) for stage in self._active_stages if stage not in skipped)
+        return mpx * cost
+
+    # --- Decision ---
+
+    def _decide(self, measured_ms: float):
+        budget = self.budget_ms
+        if self.predict_ms(self._index, self._skipped) > budget * self.DOWN_MARGIN:
+            index, skipped = self._index, list(self._skipped)
+            while index > 0 and self.predict_ms(index, skipped) > budget:
+                index -= 1
+            for stage in self.DROP_ORDER:
+                if self.predict_ms(index, skipped) <= budget:
+                    break
+                if stage in self._active_stages and stage not in skipped:
+                    skipped.append(stage)
+            self._up_streak = 0
+            self._apply(index, tuple(skipped), "over budget", measured_ms)
+            return
+
+        # One step towards quality: restore the last dropped stage, then raise the resolution
+        if self._skipped:
+            candidate = (self._index, self._skipped[:-1])
+        elif self._index < len(self.RESOLUTIONS) - 1:
+            candidate = (self._index + 1, ())
+        else:
+            candidate = None
+        if candidate is not None and self.predict_ms(*candidate) <= budget * self.UP_MARGIN:
+            self._up_streak += 1
+            if self._up_streak >= self.UP_FRAMES:
+                self._up_streak = 0
+                self._apply(candidate[0], candidate[1], "under budget", measured_ms)
+        else:
+            self._up_streak = 0
+
+    def _apply(self, index: int, skipped: Tuple[str, ...], reason: str, measured_ms: float):
+        if index == self._index and skipped == self._skipped:
+            return
+        self._index, self._skipped = index, skipped
+        decision = {'time': time.time(), 'frame': self.frames, 'reason': reason,
+                    'preview_limit': self.preview_limit, 'skipped_stages': list(skipped),
+                    'measured_ms': round(measured_ms, 1), 'predicted_ms': round(self.predict_ms(index, skipped), 1)}
+        self.decisions.append(decision)
+        Logger.info(f"[Performance] Preview {reason} ({measured_ms:.0f} ms / {self.budget_ms:.0f} ms): "
+                    f"limit {self.preview_limit} px, skipped stages {list(skipped) or 'none'}")
+
+    def telemetry(self) -> dict:
+        """Snapshot of the controller state, cost model and recent decisions."""
+        return {
+            'budget_ms': self.budget_ms,
+            'preview_limit': self.preview_limit,
+            'skipped_stages': list(self._skipped),
+            'frames': self.frames,
+            'costs_ms_per_mpx': {name: round(cost, 2) for name, cost in self._costs.items()},
+            'predicted_ms': round(self.predict_ms(self._index, self._skipped), 1) if self.frames else None,
+            'last_frame': self.last_frame,
+            'decisions': list(self.decisions),
+        }
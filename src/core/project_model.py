@@ -7,6 +7,9 @@ from typing import List, Dict, Optional, Tuple, Union
 from PySide6.QtCore import QObject, Signal
 from PySide6.QtGui import QUndoStack
 
+from .file_index import FileIndex, iter_image_files
+from .channel_matcher import ChannelMatcher
+
 @dataclass
 class ChannelDef:
     """Definition of a single channel file within a scene."""
@@ -50,6 +53,15 @@ class ProjectModel(QObject):
         self.pool_files: List[str] = [] # List of all imported file paths
         self.pool_display_settings: Dict[str, dict] = {} # path -> display_settings dict
         self.undo_stack = undo_stack or QUndoStack(self)
+        self._file_index: Optional[FileIndex] = None
+        self._channel_matcher: Optional[ChannelMatcher] = None
+        
+        # Maintained lookup indexes (kept current by the *_internal mutators):
+        # normalized path -> {scene_id: number of channel slots using it},
+        # pool membership and the pool files not assigned to any scene.
+        self._path_refs: Dict[str, Dict[str, int]] = {}
+        self._pool_set: set = set()
+        self._unassigned: set = set()
         
         # Default Channel Configs (Keyword -> (Type, Color))
         self.channel_patterns = {
@@ -144,6 +156,15 @@ class ProjectModel(QObject):
             return export_dir
         return os.getcwd()
 
+    def get_cache_path(self) -> Optional[str]:
+        """
+        Returns the project's .cache directory (None if no project folder is set).
+        The directory may not exist yet: whatever writes into it creates it.
+        """
+        if not self.root_path:
+            return None
+        return os.path.join(self.root_path, ".cache")
+
     def update_channel_name(self, scene_id: str, ch_index: int, new_name: str):
         """Updates the name (type) of a specific channel."""
         if scene_id in self._scene_map:
@@ -236,6 +257,7 @@ class ProjectModel(QObject):
                 self._scene_map[scene.id] = scene
                 
             self.project_channel_template = data.get("project_channel_template", [])
+            self._rebuild_indexes()
             self.is_dirty = False
             return True
         except Exception as e:
@@ -248,6 +270,7 @@ class ProjectModel(QObject):
         self.scenes = []
         self._scene_map = {}
         self.pool_files = []
+        self._rebuild_indexes()
         self.project_channel_template = []
         self.root_path = None
         self.is_dirty = False
@@ -274,21 +297,16 @@ class ProjectModel(QObject):
         self.project_changed.emit()
 
     def scan_folder(self, folder_path: str, extensions: tuple = ('.tif', '.tiff', '.png', '.jpg', '.jpeg'), recursive: bool = False) -> List[str]:
-        """Scans a folder for image files (non-recursive by default)."""
-        files = []
-        if recursive:
-            for root, _, fnames in os.walk(folder_path):
-                for fname in fnames:
-                    if fname.lower().endswith(extensions):
-                        files.append(os.path.join(root, fname))
-        else:
-            try:
-                for fname in os.listdir(folder_path):
-                    if fname.lower().endswith(extensions):
-                        files.append(os.path.join(folder_path, fname))
-            except Exception as e:
-                print(f"Error scanning folder: {e}")
-        return files
+        """Scans a folder for image files (non-recursive by default). See FolderScanWorker for large folders."""
+        return [entry.path for entry in iter_image_files(folder_path, extensions, recursive)]
+
+    def get_file_index(self) -> FileIndex:
+        """Scan index for this project, persisted in .cache (in-memory only without a project folder)."""
+        cache_dir = self.get_cache_path()
+        index_path = os.path.join(cache_dir, "file_index.json") if cache_dir else None
+        if self._file_index is None or self._file_index.index_path != index_path:
+            self._file_index = FileIndex(index_path)
+        return self._file_index
 
     def get_project_template(self) -> List[Dict[str, str]]:
         return self.project_channel_template
@@ -299,44 +317,38 @@ class ProjectModel(QObject):
         from .commands import AddFilesCommand
         self.undo_stack.push(AddFilesCommand(self, file_paths))
 
+    def get_channel_matcher(self) -> ChannelMatcher:
+        """Compiled matcher for channel_patterns; rebuilt only when the patterns change."""
+        if self._channel_matcher is None or self._channel_matcher.signature != tuple(self.channel_patterns.items()):
+            self._channel_matcher = ChannelMatcher(self.channel_patterns)
+        return self._channel_matcher
+
     def _add_files_internal(self, file_paths: List[str]):
-        """Internal method for adding files without pushing to Undo stack."""
-        # Add to pool first
-        self.add_to_pool(file_paths, undoable=False)
+        """
+        Internal method for adding files without pushing to Undo stack.
+        Files are classified and grouped in one pass, then applied with a single project_changed.
+        """
+        if not file_paths:
+            return
+
+        # Add to pool first (the change is announced together with the scenes below)
+        self._add_to_pool_internal(file_paths, emit=False)
         
+        matcher = self.get_channel_matcher()
         last_modified_scene = None
 
-        for path in file_paths:
-            path = os.path.normpath(path)
-            filename = os.path.basename(path)
-            name_no_ext = os.path.splitext(filename)[0]
-            name_upper = filename.upper()
-            
-            # Detect Channel
-            matched_key = None
-            ch_type = "Other"
-            ch_color = "#808080"
-            
-            # Sort patterns by length desc to match "CY5" before "C" if we had "C"
-            sorted_keys = sorted(self.channel_patterns.keys(), key=len, reverse=True)
-            
-            for key in sorted_keys:
-                if key in name_upper:
-                    matched_key = key
-                    ch_type, ch_color = self.channel_patterns[key]
-                    break
-            
-            # --- Logic Branch based on Mode ---
-            if self.is_single_channel_mode:
-                # SINGLE CHANNEL MODE: Direct mapping (1 File -> 1 Sample)
-                # Use filename as Sample Name
-                scene_id = name_no_ext
+        # --- Logic Branch based on Mode ---
+        if self.is_single_channel_mode:
+            # SINGLE CHANNEL MODE: Direct mapping (1 File -> 1 Sample)
+            for path in file_paths:
+                path = os.path.normpath(path)
+                name_no_ext, _, ch_type, ch_color = matcher.classify(path)
                 
-                # Ensure uniqueness (avoid merging with existing if names collide in this mode)
-                base_name = scene_id
+                # Use filename as Sample Name, unique (avoid merging with existing if names collide in this mode)
+                scene_id = name_no_ext
                 counter = 1
                 while scene_id in self._scene_map:
-                    scene_id = f"{base_name}_{counter}"
+                    scene_id = f"{name_no_ext}_{counter}"
                     counter += 1
                     
                 new_scene = SceneData(id=scene_id, name=scene_id)
@@ -344,61 +356,38 @@ class ProjectModel(QObject):
                 
                 self.scenes.append(new_scene)
                 self._scene_map[scene_id] = new_scene
+                self._ref_path(path, scene_id, 1)
                 last_modified_scene = new_scene
-                
-            else:
-                # MULTI CHANNEL MODE: Smart Grouping
-                # Determine Scene Name (Base Name)
-                if matched_key:
-                    pattern = re.compile(re.escape(matched_key), re.IGNORECASE)
-                    base_name = pattern.sub("", name_no_ext)
-                    base_name = re.sub(r'^[\W_]+|[\W_]+$', '', base_name)
-                    if not base_name:
-                        base_name = name_no_ext
-                else:
-                    base_name = name_no_ext
-                
-                # Create or Get Scene
-                scene_id = base_name
-                if scene_id not in self._scene_map:
-                    new_scene = SceneData(id=scene_id, name=base_name)
+        else:
+            # MULTI CHANNEL MODE: Smart Grouping by base name
+            for scene_id, entries in matcher.group(file_paths).items():
+                scene = self._scene_map.get(scene_id)
+                if scene is None:
+                    scene = SceneData(id=scene_id, name=scene_id)
                     
                     # INHERIT PROJECT TEMPLATE if available
-                    if self.project_channel_template:
-                        # Pre-populate channels from template
-                        for ch_def in self.project_channel_template:
-                            new_scene.channels.append(
-                                ChannelDef(path="", channel_type=ch_def.get('name', 'Other'), color=ch_def.get('color', '#FFFFFF'))
-                            )
+                    for ch_def in self.project_channel_template:
+                        scene.channels.append(
+                            ChannelDef(path="", channel_type=ch_def.get('name', 'Other'), color=ch_def.get('color', '#FFFFFF'))
+                        )
                             
-                    self.scenes.append(new_scene)
-                    self._scene_map[scene_id] = new_scene
-                
-                scene = self._scene_map[scene_id]
+                    self.scenes.append(scene)
+                    self._scene_map[scene_id] = scene
                 last_modified_scene = scene
                 
-                # Assign file to appropriate channel slot
-                assigned = False
-                
-                # 1. Try to match by channel type in existing slots (from template or previous auto-add)
-                for ch in scene.channels:
-                    if ch.channel_type == ch_type and not ch.path:
-                        ch.path = path
-                        # Keep template color or update? Usually template color is preferred.
-                        # But if auto-detection found a specific color (e.g. from filename), maybe use it?
-                        # Let's stick to template color if it exists, otherwise auto color.
-                        if not ch.color or ch.color == "#FFFFFF":
-                             ch.color = ch_color
-                        assigned = True
-                        break
-                
-                # 2. If not assigned (no empty slot matching type), append new channel
-                if not assigned:
-                    # Only append if we didn't fully fill the template?
-                    # Or always append if extra file?
-                    # If we have a template, we might want to be strict or flexible.
-                    # Flexible: Append extra channels.
-                    scene.channels.append(ChannelDef(path=path, channel_type=ch_type, color=ch_color))
+                for path, ch_type, ch_color in entries:
+                    self._ref_path(path, scene_id, 1)
+                    # 1. Fill an empty slot of the same channel type (from template or previous auto-add).
+                    #    Keep the template color unless it is unset/white.
+                    for ch in scene.channels:
+                        if ch.channel_type == ch_type and not ch.path:
+                            ch.path = path
+                            if not ch.color or ch.color == "#FFFFFF":
+                                ch.color = ch_color
+                            break
+                    else:
+                        # 2. No matching empty slot: append the extra channel
+                        scene.channels.append(ChannelDef(path=path, channel_type=ch_type, color=ch_color))
             
         # --- AUTO-DETECTION LOGIC ---
         if last_modified_scene:
@@ -409,9 +398,8 @@ class ProjectModel(QObject):
             elif len(last_modified_scene.channels) == 1:
                 self.is_single_channel_mode = True
 
-        if file_paths:
-            self.is_dirty = True
-            self.project_changed.emit()
+        self.is_dirty = True
+        self.project_changed.emit()
 
     def add_imported_merge_scene(self, name: str, channels_data: List[Dict]):
         """
@@ -446,6 +434,7 @@ class ProjectModel(QObject):
             
         self.scenes.append(new_scene)
         self._scene_map[name] = new_scene
+        self._index_scene(new_scene, 1)
         self.is_dirty = True
         
         # Auto-detect mode
@@ -517,6 +506,7 @@ class ProjectModel(QObject):
         
         self.scenes.append(new_scene)
         self._scene_map[name] = new_scene
+        self._index_scene(new_scene, 1)
         self.is_dirty = True
         self.project_changed.emit()
         return name
@@ -535,10 +525,10 @@ class ProjectModel(QObject):
         if scene_id in self._scene_map:
             scene = self._scene_map[scene_id]
             if 0 <= ch_index < len(scene.channels):
-                if not new_path:
-                    scene.channels[ch_index].path = ""
-                else:
-                    scene.channels[ch_index].path = os.path.normpath(new_path)
+                ch = scene.channels[ch_index]
+                self._ref_path(ch.path, scene_id, -1)
+                ch.path = os.path.normpath(new_path) if new_path else ""
+                self._ref_path(ch.path, scene_id, 1)
                 self.is_dirty = True
                 self.project_changed.emit()
 
@@ -564,6 +554,7 @@ class ProjectModel(QObject):
             scene = self._scene_map.pop(scene_id)
             if scene in self.scenes:
                 self.scenes.remove(scene)
+            self._index_scene(scene, -1)
             self.is_dirty = True
             self.project_changed.emit()
             return True
@@ -583,9 +574,11 @@ class ProjectModel(QObject):
     def _rename_scene_internal(self, old_id: str, new_name: str):
         if old_id in self._scene_map:
             scene = self._scene_map.pop(old_id)
+            self._index_scene(scene, -1)
             scene.id = new_name
             scene.name = new_name
             self._scene_map[new_name] = scene
+            self._index_scene(scene, 1)
             self.is_dirty = True
             self.project_changed.emit()
             return True
@@ -594,49 +587,114 @@ class ProjectModel(QObject):
     def _rebuild_scene_map(self):
         """Rebuilds the internal ID -> Scene map from the list."""
         self._scene_map = {s.id: s for s in self.scenes}
+        self._rebuild_indexes()
 
-    def get_assigned_files(self) -> set:
-        """Returns a set of all file paths currently assigned to any scene."""
-        assigned = set()
+    # --- Lookup indexes ---
+
+    def _rebuild_indexes(self):
+        """Recomputes the path and pool indexes from scratch (load, clear, bulk replacement)."""
+        self._path_refs = {}
         for scene in self.scenes:
             for ch in scene.channels:
                 if ch.path:
-                    assigned.add(os.path.normpath(ch.path))
-        return assigned
+                    refs = self._path_refs.setdefault(os.path.normpath(ch.path), {})
+                    refs[scene.id] = refs.get(scene.id, 0) + 1
+        self._pool_set = {os.path.normpath(p) for p in self.pool_files}
+        self._unassigned = {p for p in self._pool_set if p not in self._path_refs}
+
+    def _ref_path(self, path: str, scene_id: str, delta: int):
+        """Adds (delta=1) or removes (delta=-1) one channel reference of path in scene_id."""
+        if not path:
+            return
+        key = os.path.normpath(path)
+        refs = self._path_refs.get(key)
+        if delta > 0:
+            if refs is None:
+                refs = self._path_refs[key] = {}
+                self._unassigned.discard(key)
+            refs[scene_id] = refs.get(scene_id, 0) + 1
+        elif refs is not None:
+            count = refs.get(scene_id, 0) - 1
+            if count > 0:
+                refs[scene_id] = count
+            else:
+                refs.pop(scene_id, None)
+            if not refs:
+                del self._path_refs[key]
+                if key in self._pool_set:
+                    self._unassigned.add(key)
+
+    def _index_scene(self, scene: SceneData, delta: int):
+        for ch in scene.channels:
+            self._ref_path(ch.path, scene.id, delta)
+
+    def is_assigned(self, file_path: str) -> bool:
+        return bool(file_path) and os.path.normpath(file_path) in self._path_refs
+
+    def find_assignments(self, file_path: str) -> List[Tuple[str, int]]:
+        """Returns (scene_id, channel index) for every channel slot that uses file_path."""
+        if not file_path:
+            return []
+        key = os.path.normpath(file_path)
+        result = []
+        for scene_id in self._path_refs.get(key, {}):
+            scene = self._scene_map.get(scene_id)
+            if scene is None:
+                continue
+            for i, ch in enumerate(scene.channels):
+                if ch.path and os.path.normpath(ch.path) == key:
+                    result.append((scene_id, i))
+        return result
+
+    def get_assigned_files(self) -> set:
+        """Returns a set of all file paths currently assigned to any scene."""
+        return set(self._path_refs)
+
+    def get_unassigned_count(self) -> int:
+        return len(self._unassigned)
 
     @property
     def unassigned_files(self) -> List[str]:
-        assigned = self.get_assigned_files()
-        return [p for p in self.pool_files if os.path.normpath(p) not in assigned]
+        """Pool files not assigned to any scene, in pool order."""
+        unassigned = self._unassigned
+        if not unassigned:
+            return []
+        return [p for p in self.pool_files if p in unassigned]
 
-    def add_to_pool(self, file_paths: List[str], undoable: bool = True):
-        """Adds files to the pool with Undo support."""
+    def add_to_pool(self, file_paths: List[str], undoable: bool = True, merge_key: Optional[str] = None):
+        """
+        Adds files to the pool with Undo support.
+        Batches pushed with the same merge_key are merged into a single undo step.
+        """
         if not undoable:
             self._add_to_pool_internal(file_paths)
             return
 
         from .commands import AddFilesToPoolCommand
-        self.undo_stack.push(AddFilesToPoolCommand(self, file_paths))
+        self.undo_stack.push(AddFilesToPoolCommand(self, file_paths, merge_key=merge_key))
 
-    def _add_to_pool_internal(self, file_paths: List[str]):
-        """Internal method for adding files to pool without pushing to Undo stack."""
+    def _add_to_pool_internal(self, file_paths: List[str], emit: bool = True) -> List[str]:
+        """Internal method for adding files to pool without pushing to Undo stack. Returns the newly added paths."""
         # Avoid duplicates
-        existing = set(self.pool_files)
-        changed = False
+        added = []
         for p in file_paths:
             p_norm = os.path.normpath(p)
-            if p_norm not in existing:
+            if p_norm not in self._pool_set:
                 self.pool_files.append(p_norm)
-                existing.add(p_norm)
-                changed = True
+                self._pool_set.add(p_norm)
+                if p_norm not in self._path_refs:
+                    self._unassigned.add(p_norm)
+                added.append(p_norm)
         
-        if changed:
+        if added:
             self.is_dirty = True
-            self.project_changed.emit()
+            if emit:
+                self.project_changed.emit()
+        return added
 
     def remove_from_pool(self, file_path: str):
         """Removes file from pool completely with Undo support."""
-        if file_path in self.pool_files:
+        if file_path in self._pool_set:
             from .commands import RemoveFromPoolCommand
             self.undo_stack.push(RemoveFromPoolCommand(self, file_path))
 
@@ -648,10 +706,52 @@ class ProjectModel(QObject):
         self.undo_stack.push(BatchRemoveFromPoolCommand(self, file_paths))
 
     def _remove_from_pool_internal(self, file_path: str):
-        if file_path in self.pool_files:
-            self.pool_files.remove(file_path)
-            self.is_dirty = True
+        self._remove_pool_files_internal([file_path])
+
+    def _remove_pool_files_internal(self, file_paths: List[str], emit: bool = True) -> List[Tuple[str, int]]:
+        """Removes files from the pool in one pass. Returns (path, original index) of the removed files."""
+        to_remove = {os.path.normpath(p) for p in file_paths if p} & self._pool_set
+        if not to_remove:
+            return []
+        removed = [(p, i) for i, p in enumerate(self.pool_files) if p in to_remove]
+        self.pool_files = [p for p in self.pool_files if p not in to_remove]
+        self._pool_set.difference_update(to_remove)
+        self._unassigned.difference_update(to_remove)
+        self.is_dirty = True
+        if emit:
             self.project_changed.emit()
+        return removed
+
+    def _insert_pool_files_internal(self, indexed_paths: List[Tuple[str, int]]):
+        """Restores (path, index) pairs as returned by _remove_pool_files_internal."""
+        for path, idx in sorted(indexed_paths, key=lambda x: x[1]):
+            if path in self._pool_set:
+                continue
+            self.pool_files.insert(idx, path)
+            self._pool_set.add(path)
+            if path not in self._path_refs:
+                self._unassigned.add(path)
+        self.is_dirty = True
+        self.project_changed.emit()
+
+    def _insert_scene_internal(self, index: int, scene: SceneData, emit: bool = True):
+        """Re-inserts a scene object (undo of removal, externally built scenes)."""
+        self.scenes.insert(index, scene)
+        self._scene_map[scene.id] = scene
+        self._index_scene(scene, 1)
+        self.is_dirty = True
+        if emit:
+            self.project_changed.emit()
+
+    def _set_scene_channels_internal(self, scene_id: str, channels: List[ChannelDef]):
+        scene = self._scene_map.get(scene_id)
+        if scene is None:
+            return
+        self._index_scene(scene, -1)
+        scene.channels = channels
+        self._index_scene(scene, 1)
+        self.is_dirty = True
+        self.project_changed.emit()
 
     def add_channel_to_scene(self, scene_id: str, file_path: str, channel_type: str, color: str):
         """Adds a new channel to a scene with Undo support."""
@@ -663,6 +763,7 @@ class ProjectModel(QObject):
         if scene_id in self._scene_map:
             scene = self._scene_map[scene_id]
             scene.channels.append(ChannelDef(path=os.path.normpath(file_path), channel_type=channel_type, color=color))
+            self._ref_path(file_path, scene_id, 1)
             self.is_dirty = True
             self.project_changed.emit()
 
@@ -713,7 +814,8 @@ class ProjectModel(QObject):
         if scene_id in self._scene_map:
             scene = self._scene_map[scene_id]
             if 0 <= ch_index < len(scene.channels):
-                scene.channels.pop(ch_index)
+                ch = scene.channels.pop(ch_index)
+                self._ref_path(ch.path, scene_id, -1)
                 self.is_dirty = True
                 self.project_changed.emit()
 
@@ -721,5 +823,6 @@ class ProjectModel(QObject):
         if scene_id in self._scene_map:
             scene = self._scene_map[scene_id]
             scene.channels.insert(ch_index, ch_def)
+            self._ref_path(ch_def.path, scene_id, 1)
             self.is_dirty = True
             self.project_changed.emit()
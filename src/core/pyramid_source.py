@@ -0,0 +1,225 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import tifffile
+
+from .logger import Logger
+from .tiff_window import read_page_window
+
+
+class PyramidLevels(ABC):
+    """
+    Level bookkeeping shared by pyramid backends.
+    Subclasses set level_shapes (H, W per level, base first), base_shape and dtype,
+    and implement read_level() and read_region().
+    """
+
+    level_shapes: List[Tuple[int, int]]
+    base_shape: Tuple[int, int]
+
+    @property
+    def level_count(self) -> int:
+        return len(self.level_shapes)
+
+    def downsample(self, level: int) -> float:
+        """Base-to-level size ratio along the longest side (1.0 for the base level)."""
+        bh, bw = self.base_shape
+        lh, lw = self.level_shapes[level]
+        return float(max(bh, bw)) / max(1, max(lh, lw))
+
+    def level_for_shape(self, target_shape: Optional[Tuple[int, int]]) -> int:
+        """
+        Returns the coarsest level that still covers target_shape (H, W) without upsampling.
+        None (no display limit) selects the base level.
+        """
+        if target_shape is None:
+            return 0
+        th, tw = target_shape
+        for level in range(self.level_count - 1, -1, -1):
+            lh, lw = self.level_shapes[level]
+            if lh >= th and lw >= tw:
+                return level
+        return 0
+
+    def level_for_scale(self, scale: float) -> int:
+        """Returns the level closest to a viewport scale (screen pixels per base pixel)."""
+        if scale <= 0 or scale >= 1.0:
+            return 0
+        bh, bw = self.base_shape
+        return self.level_for_shape((int(bh * scale), int(bw * scale)))
+
+    def level_for_max_dim(self, max_dim: int) -> int:
+        """Returns the coarsest level whose long side is at least max_dim (e.g. for statistics)."""
+        for level in range(self.level_count - 1, -1, -1):
+            if max(self.level_shapes[level]) >= max_dim:
+                return level
+        return 0
+
+    @abstractmethod
+    def read_level(self, level: int) -> np.ndarray:
+        """Returns a whole level (H, W[, samples])."""
+
+    @abstractmethod
+    def read_region(self, level: int, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """Returns [y0:y1, x0:x1] of a level (level coordinates), laid out as read_level()."""
+
+
+class PyramidSource(PyramidLevels):
+    """
+    Lazy handle on a pyramidal TIFF (OME-TIFF sub-resolutions, sub-IFD or series levels).
+    The display path asks for the level closest to the on-screen size, so large slides
+    can be opened and navigated without decoding the full-resolution base level.
+    Level 0 is the base (full resolution) level and is only decoded on explicit request.
+    """
+
+    # Non-spatial axes a display level may carry (RGB samples or a small channel axis).
+    SAMPLE_AXES = "SC"
+
+    def __init__(self, file_path: str, tif: tifffile.TiffFile, series_index: int = 0,
+                 max_cached_levels: int = 2):
+        self.file_path = file_path
+        self._tif = tif
+        self._series_index = series_index
+        series = tif.series[series_index]
+
+        self.axes = series.axes
+        self.dtype = np.dtype(series.dtype)
+        y_idx, x_idx = self.axes.index('Y'), self.axes.index('X')
+        self.level_shapes: List[Tuple[int, int]] = [
+            (int(level.shape[y_idx]), int(level.shape[x_idx])) for level in series.levels
+        ]
+        self.base_shape = self.level_shapes[0]
+        # read_level() keeps the stored axis order: a sample/channel axis stored before Y leads
+        self._samples_first = any(n > 1 for n in series.shape[:y_idx])
+
+        self._lock = threading.Lock()
+        self._owners = 1
+        self._max_cached_levels = max(1, int(max_cached_levels))
+        self._level_cache: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    @classmethod
+    def open(cls, file_path: str) -> Optional["PyramidSource"]:
+        """
+        Opens file_path as a lazy pyramid.
+        Returns None if the file is not a TIFF or carries no reduced-resolution levels,
+        in which case the caller should fall back to the regular loaders.
+        """
+        if not file_path or not os.path.exists(file_path):
+            return None
+        if os.path.splitext(file_path)[1].lower() not in (".tif", ".tiff"):
+            return None
+
+        tif = None
+        try:
+            tif = tifffile.TiffFile(file_path)
+            if not tif.series:
+                tif.close()
+                return None
+            series = tif.series[0]
+            if len(series.levels) <= 1 or 'Y' not in series.axes or 'X' not in series.axes:
+                tif.close()
+                return None
+
+            # Pyramidal Z/T stacks are not supported here: only YX plus samples/channels
+            extra = [(a, s) for a, s in zip(series.axes, series.shape) if a not in "YX" and s > 1]
+            if any(a not in cls.SAMPLE_AXES or s > 4 for a, s in extra):
+                tif.close()
+                return None
+
+            source = cls(file_path, tif)
+            Logger.info(f"[PyramidSource] Opened {os.path.basename(file_path)} lazily: axes={source.axes}, levels={source.level_shapes}")
+            return source
+        except Exception as e:
+            Logger.debug(f"[PyramidSource] Lazy open failed for {file_path}: {e}")
+            if tif is not None:
+                try:
+                    tif.close()
+                except Exception:
+                    pass
+            return None
+
+    def read_level(self, level: int) -> np.ndarray:
+        """Decodes a whole level, served from the LRU if available."""
+        level = int(min(max(0, level), self.level_count - 1))
+        with self._lock:
+            cached = self._level_cache.get(level)
+            if cached is not None:
+                self._level_cache.move_to_end(level)
+                return cached
+
+            if self._tif is None:
+                # Released by its last owner: reopening would leak a handle nobody closes
+                raise ValueError(f"Pyramid {os.path.basename(self.file_path)} is closed")
+            data = self._tif.series[self._series_index].levels[level].asarray()
+            if data.ndim > 2:
+                data = np.squeeze(data)
+
+            # The base level is owned by the channel once decoded; do not keep a second copy.
+            if level != 0:
+                self._level_cache[level] = data
+                while len(self._level_cache) > self._max_cached_levels:
+                    self._level_cache.popitem(last=False)
+            return data
+
+    def read_region(self, level: int, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """
+        Reads [y0:y1, x0:x1] of a level by decoding only the strips/tiles it overlaps,
+        so base-level regions and pixels do not require the whole base in memory.
+        """
+        level = int(min(max(0, level), self.level_count - 1))
+        with self._lock:
+            cached = self._level_cache.get(level)
+            if cached is not None:
+                self._level_cache.move_to_end(level)
+                return cached[:, y0:y1, x0:x1] if self._samples_first and cached.ndim == 3 else cached[y0:y1, x0:x1]
+            if self._tif is None:
+                raise ValueError(f"Pyramid {os.path.basename(self.file_path)} is closed")
+            # Channels stored as separate pages are windowed page by page
+            pages = self._tif.series[self._series_index].levels[level].pages
+            windows = [read_page_window(self._tif, page, y0, y1, x0, x1) for page in pages]
+
+        if any(w is None for w in windows):
+            data = self.read_level(level)
+            return data[:, y0:y1, x0:x1] if self._samples_first and data.ndim == 3 else data[y0:y1, x0:x1]
+        if len(windows) > 1:
+            return np.stack(windows, axis=0)
+        data = windows[0]
+        return np.moveaxis(data, -1, 0) if self._samples_first and data.ndim == 3 else data
+
+    def cached_arrays(self) -> List[np.ndarray]:
+        """Decoded levels currently held in memory (for cache accounting)."""
+        with self._lock:
+            return list(self._level_cache.values())
+
+    def clear_cache(self):
+        """Drops decoded levels."""
+        with self._lock:
+            self._level_cache.clear()
+
+    def acquire(self) -> "PyramidSource":
+        """Registers another owner of the handle (e.g. a cloned channel); each owner calls close() once."""
+        with self._lock:
+            self._owners += 1
+        return self
+
+    def close(self):
+        """Releases one owner; the last one releases the file handle and all cached levels."""
+        with self._lock:
+            self._owners -= 1
+            if self._owners > 0:
+                return
+            self._level_cache.clear()
+            if self._tif is not None:
+                try:
+                    self._tif.close()
+                except Exception:
+                    pass
+                self._tif = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._tif is not None
@@ -0,0 +1,226 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+
+import numpy as np
+from PySide6.QtCore import QSettings
+
+from src.core.preview_controller import record_stage_time
+from src.core.renderer import Renderer
+
+# One lock per channel: renders of the same channel must not interleave their
+# writes to the channel's enhancement caches (e.g. a superseded render still running).
+_channel_locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_channel_locks_guard = threading.Lock()
+
+
+def channel_render_lock(channel) -> threading.Lock:
+    with _channel_locks_guard:
+        lock = _channel_locks.get(channel)
+        if lock is None:
+            lock = _channel_locks[channel] = threading.Lock()
+        return lock
+
+
+def render_signature(channel, target_shape, skip_stages=()) -> tuple:
+    """
+    Identifies a rendered channel image: channel object and data version, render size and
+    display settings (plus the enhancement stages a preview left out, if any).
+    """
+    signature = (id(channel), getattr(channel, 'data_version', 0), target_shape,
+                 channel.display_settings.render_signature())
+    return signature + (tuple(skip_stages),) if skip_stages else signature
+
+
+def fit_target_shape(h: int, w: int, max_dim: int) -> Optional[Tuple[int, int]]:
+    """Render shape (target_shape) with the long side limited to max_dim; None (full resolution) if it fits."""
+    long_side = max(h, w)
+    if long_side <= max_dim:
+        return None
+    scale = float(max_dim) / long_side
+    return (int(h * scale), int(w * scale))
+
+
+class RenderCache:
+    """
+    Session-wide cache of display renders (Renderer.render_display), shared by the multi view,
+    the filmstrip (thumbnails, main view) and the merge views built from them, so switching
+    view modes or returning to earlier settings does not render again.
+    Entries are keyed by render_signature: channel, data version, target shape and the hash
+    of the display settings including enhancement parameters. The cache is an LRU bounded by
+    a byte budget; a channel's entries are dropped when its data changes (new data version)
+    and when the channel object is released. Cached images are read-only and shared.
+    """
+    _instance = None
+
+    BUDGET_KEY = "performance/render_cache_budget_mb"
+    DEFAULT_BUDGET_MB = 256
+
+    def __init__(self):
+        # Reentrant: a channel's release callback can run during garbage collection inside a locked section
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._keys_by_channel: Dict[int, Set[tuple]] = {}
+        # channel id -> (weak reference, data version of its entries); guards against reused ids
+        self._owners: Dict[int, Tuple[weakref.ref, int]] = {}
+        self._settings = QSettings("FluoQuantPro", "Settings")
+        self._budget = self.get_budget_mb() * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # --- Budget ---
+
+    def get_budget_mb(self) -> int:
+        return int(self._settings.value(self.BUDGET_KEY, self.DEFAULT_BUDGET_MB))
+
+    def set_budget_mb(self, budget_mb: int):
+        self._settings.setValue(self.BUDGET_KEY, int(budget_mb))
+        with self._lock:
+            self._budget = max(0, int(budget_mb)) * 1024 * 1024
+            self._trim_locked()
+
+    @property
+    def used_bytes(self) -> int:
+        return self._bytes
+
+    # --- Access ---
+
+    def get(self, channel, target_shape, skip_stages=()) -> Optional[np.ndarray]:
+        return self._lookup(channel, render_signature(channel, target_shape, skip_stages))
+
+    def _lookup(self, channel, key: tuple) -> Optional[np.ndarray]:
+        """Entry under key, whose first two items are the channel's id and data version."""
+        with self._lock:
+            image = self._entries.get(key)
+            owner = self._owners.get(key[0])
+            if image is not None and (owner is None or owner[0]() is not channel):
+                image = None
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return image
+
+    def put(self, channel, target_shape, image: Optional[np.ndarray], signature: Optional[tuple] = None):
+        """Stores a render; signature is the render_signature taken when the render started (default: now)."""
+        if image is None:
+            return
+        key = signature if signature is not None else render_signature(channel, target_shape)
+        image.flags.writeable = False
+        channel_id = key[0]
+        with self._lock:
+            owner = self._owners.get(channel_id)
+            if owner is not None and owner[0]() is channel and owner[1] > key[1]:
+                return # Rendered from data that has since been replaced
+            if owner is None or owner[0]() is not channel or owner[1] != key[1]:
+                # New channel, or its data changed since the cached renders: they can never be hit again
+                self._drop_channel_locked(channel_id)
+                self._owners[channel_id] = (weakref.ref(channel, self._release_callback(channel_id)), key[1])
+            if key in self._entries or image.nbytes > self._budget:
+                return
+            self._entries[key] = image
+            self._bytes += image.nbytes
+            self._keys_by_channel.setdefault(channel_id, set()).add(key)
+            self._trim_locked()
+
+    def render(self, channel, target_shape, should_continue: Optional[Callable[[], bool]] = None,
+               skip_stages=()) -> Optional[np.ndarray]:
+        """
+        Cached display render of the channel at target_shape, rendering (under the channel's lock)
+        on a miss. should_continue is checked once the lock is held (None result if it fails).
+        skip_stages: enhancement stages a preview leaves out (see PreviewController).
+        """
+        image = self.get(channel, target_shape, skip_stages)
+        if image is not None:
+            return image
+        with channel_render_lock(channel):
+            if should_continue is not None and not should_continue():
+                return None
+            signature = render_signature(channel, target_shape, skip_stages)
+            t_start = time.perf_counter()
+            image = Renderer.render_display(channel, target_shape=target_shape, skip_stages=skip_stages)
+            record_stage_time('render', (time.perf_counter() - t_start) * 1000)
+        self.put(channel, target_shape, image, signature)
+        return image
+
+    # --- Invalidation ---
+
+    def invalidate_channel(self, channel):
+        with self._lock:
+            self._drop_channel_locked(id(channel))
+            self._owners.pop(id(channel), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_channel.clear()
+            self._owners.clear()
+            self._bytes = 0
+
+    def _release_callback(self, channel_id: int):
+        def on_released(ref):
+            with self._lock:
+                # The id may already belong to a new channel with its own entries
+                owner = self._owners.get(channel_id)
+                if owner is not None and owner[0] is ref:
+                    self._drop_channel_locked(channel_id)
+                    del self._owners[channel_id]
+        return on_released
+
+    def _drop_channel_locked(self, channel_id: int):
+        for key in self._keys_by_channel.pop(channel_id, ()):
+            image = self._entries.pop(key, None)
+            if image is not None:
+                self._bytes -= image.nbytes
+
+    def _trim_locked(self):
+        while self._entries and self._bytes > self._budget:
+            key, image = self._entries.popitem(last=False)
+            self._bytes -= image.nbytes
+            keys = self._keys_by_channel.get(key[0])
+            if keys is not None:
+                keys.discard(key)
+
+
+class EnhanceStageCache(RenderCache):
+    """
+    Outputs of the enhancement pipeline's stages (see EnhanceProcessor.apply_pipeline stage_cache),
+    so changing a later stage (stretch, gamma) reuses the results of the stages before it.
+    An entry is keyed by the pipeline input (channel, data version, render size) and the
+    parameters of its stage and the enabled stages before it. Same budget, LRU and invalidation
+    rules as RenderCache.
+    """
+    _instance = None
+
+    BUDGET_KEY = "performance/enhance_cache_budget_mb"
+    DEFAULT_BUDGET_MB = 256
+
+    def for_input(self, channel, input_key: tuple) -> "StageCacheView":
+        """The stage cache of one pipeline input: the channel's data as prepared for input_key (e.g. a render size)."""
+        return StageCacheView(self, channel, input_key)
+
+
+class StageCacheView:
+    """Stage outputs of one pipeline input, looked up by the chain of (stage, parameters) that produced them."""
+
+    def __init__(self, cache: EnhanceStageCache, channel, input_key: tuple):
+        self._cache = cache
+        self._channel = channel
+        # Data version at the start: outputs of data replaced meanwhile are not stored
+        self._prefix = (id(channel), getattr(channel, 'data_version', 0), input_key)
+
+    def get(self, stages: tuple) -> Optional[np.ndarray]:
+        return self._cache._lookup(self._channel, self._prefix + (stages,))
+
+    def put(self, stages: tuple, image: np.ndarray):
+        self._cache.put(self._channel, None, image, self._prefix + (stages,))
@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, Signal
+
+from src.core.logger import Logger
+from src.core.preview_controller import collect_stage_times
+from src.core.render_cache import RenderCache
+
+
+class _RenderJob(QRunnable):
+    def __init__(self, scheduler, generation, key, channel, target_shape, skip_stages=()):
+        super().__init__()
+        self.scheduler = scheduler
+        self.generation = generation
+        self.key = key
+        self.channel = channel
+        self.target_shape = target_shape
+        self.skip_stages = skip_stages
+        self.setAutoDelete(True)
+
+    def run(self):
+        if not self.scheduler.is_current(self.generation):
+            return
+        image = None
+        with collect_stage_times() as stages:
+            try:
+                # Re-checked once the channel lock is held: the request may have been superseded while waiting
+                image = RenderCache.instance().render(self.channel, self.target_shape,
+                                                      should_continue=lambda: self.scheduler.is_current(self.generation),
+                                                      skip_stages=self.skip_stages)
+                if image is None and not self.scheduler.is_current(self.generation):
+                    return
+            except Exception as e:
+                Logger.error(f"[RenderScheduler] Render of {self.key} failed: {e}")
+        self.scheduler._job_done.emit(self.generation, self.key, (image, stages))
+
+
+class RenderScheduler(QObject):
+    """
+    Renders channels for a view container on a worker pool.
+    Every submit() starts a new generation: queued jobs of older generations are dropped,
+    running ones finish but their results are discarded, and frame_ready is emitted
+    (on the GUI thread) only once all images of the latest generation are done.
+    last_frame_timing then holds the frame's wall time from submit to delivery and its
+    jobs' summed stage times (see collect_stage_times), for the adaptive preview controller.
+    """
+    # generation, {key: rendered image or None}, context passed to submit()
+    frame_ready = Signal(int, object, object)
+    _job_done = Signal(int, object, object)
+
+    def __init__(self, parent=None, max_threads: Optional[int] = None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        if max_threads is None:
+            max_threads = min(4, max(1, QThread.idealThreadCount() - 1))
+        self._pool.setMaxThreadCount(max_threads)
+        self._generation = 0
+        self._gen_lock = threading.Lock()
+        self._expected = 0
+        self._results: dict = {}
+        self._context = None
+        self._submitted_at = 0.0
+        self._stage_ms: Dict[str, float] = {}
+        self.last_frame_timing: Optional[dict] = None
+        self._job_done.connect(self._on_job_done)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def is_current(self, generation: int) -> bool:
+        with self._gen_lock:
+            return generation == self._generation
+
+    def is_pending(self) -> bool:
+        """True while a submitted frame has not been delivered yet."""
+        return self._expected > 0
+
+    def submit(self, jobs: Dict[Hashable, Tuple[object, Optional[Tuple[int, int]]]], context=None,
+               skip_stages=()) -> int:
+        """
+        Queues {key: (channel, target_shape)} renders as a new generation, superseding
+        any frame still in flight. skip_stages: enhancement stages the renders leave out.
+        Returns the generation number.
+        """
+        generation = self.cancel()
+        self._expected = len(jobs)
+        self._results = {}
+        self._context = context
+        self._submitted_at = time.perf_counter()
+        self._stage_ms = {}
+        if not jobs:
+            self._expected = 0
+            self.last_frame_timing = {'render_ms': 0.0, 'stages': {}}
+            self.frame_ready.emit(generation, {}, context)
+            return generation
+        for key, (channel, target_shape) in jobs.items():
+            self._pool.start(_RenderJob(self, generation, key, channel, target_shape, skip_stages))
+        return generation
+
+    def cancel(self) -> int:
+        """Drops the frame in flight (e.g. before a synchronous render). Returns the new generation."""
+        with self._gen_lock:
+            self._generation += 1
+            generation = self._generation
+        self._pool.clear()
+        self._expected = 0
+        self._results = {}
+        self._context = None
+        return generation
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _on_job_done(self, generation, key, result):
+        if generation != self._generation or self._expected == 0:
+            return # Superseded frame
+        image, stages = result
+        self._results[key] = image
+        for stage, ms in stages.items():
+            self._stage_ms[stage] = self._stage_ms.get(stage, 0.0) + ms
+        if len(self._results) < self._expected:
+            return
+        results, context = self._results, self._context
+        self._expected = 0
+        self._results = {}
+        self._context = None
+        self.last_frame_timing = {'render_ms': (time.perf_counter() - self._submitted_at) * 1000,
+                                  'stages': self._stage_ms}
+        self.frame_ready.emit(generation, results, context)
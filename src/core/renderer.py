@@ -46,6 +46,21 @@ class Renderer:
             
         return result
 
+    @staticmethod
+    def render_display(channel: ImageChannel, target_shape: Tuple[int, int] = None, skip_stages=()) -> np.ndarray:
+        """
+        Renders a channel for on-screen display as uint8 RGB (no float intermediates on the LUT path).
+        Single-channel integer data goes through the indexed path (see indexed_display).
+        skip_stages: enhancement stages left out of an adjustment preview.
+        """
+        return ImageRenderer.render_channel(channel, target_shape, out_depth=8, integer_output=True, indexed=True,
+                                            skip_stages=skip_stages)
+
+    @staticmethod
+    def indexed_display(channel: ImageChannel, target_shape: Tuple[int, int] = None):
+        """(indices, palette) behind the channel's current display image, or None (see ImageRenderer.indexed_display)."""
+        return ImageRenderer.indexed_display(channel, target_shape)
+
     @staticmethod
     def composite(channels: List[ImageChannel], target_shape: Tuple[int, int] = None, out_depth: int = 8, scale_bar_settings=None, annotations: List = None, dpi: int = 72, view_scale: float = 1.0, screen_dpi: float = 96.0, export_line_scans: bool = False) -> np.ndarray:
         """
@@ -0,0 +1,225 @@
+from collections import deque
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QObject, QThread, QTimer
+
+from src.core.cache_manager import SceneCacheManager
+from src.core.data_model import ImageChannel
+from src.core.logger import Logger
+from src.core.workers import SceneLoaderWorker
+
+
+class ScenePrefetcher(QObject):
+    """
+    Loads likely-next scenes into SceneCacheManager while the user looks at the current one.
+    Once the current scene has been idle for IDLE_MS, the next and previous scenes in
+    sample-list order (then recently hovered ones) are loaded one at a time on a
+    low-priority SceneLoaderWorker. A prefetched scene is only kept if it fits the cache
+    byte budget without evicting anything. cancel() abandons the running load immediately,
+    unless it is loading the scene the user just opened: hand_over() then lets the view
+    adopt it instead of loading the scene a second time.
+    """
+
+    IDLE_MS = 600
+    MAX_HOVERED = 3
+
+    def __init__(self, project_model, scene_order: Callable[[], List[str]], parent=None):
+        super().__init__(parent)
+        self.project_model = project_model
+        self._scene_order = scene_order
+        self._current_id: Optional[str] = None
+        self._queue: deque = deque()
+        self._hovered: deque = deque(maxlen=self.MAX_HOVERED)
+        self._failed = set() # scenes that did not fit / failed, skipped until the budget frees up
+
+        self._worker: Optional[SceneLoaderWorker] = None
+        self._worker_scene: Optional[str] = None
+        self._worker_paths = None
+        self._loaded: dict = {}
+        self._handoff = None # (channel_loaded, finished) callbacks of the view that adopted the load
+        self._live_workers = set() # includes abandoned workers that have not exited yet
+
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(self.IDLE_MS)
+        self._idle_timer.timeout.connect(self._start_next)
+
+    def is_enabled(self) -> bool:
+        # With "none"/"current" every background scene is dropped anyway
+        return SceneCacheManager.instance().get_policy() in ("recent", "all")
+
+    def cancel(self, keep_scene: Optional[str] = None):
+        """
+        Stops the idle timer and abandons any prefetch in flight (does not block).
+        A load of keep_scene is left running for hand_over().
+        """
+        self._idle_timer.stop()
+        self._queue.clear()
+        if keep_scene is None or keep_scene != self._worker_scene:
+            self._abandon_worker()
+
+    def hand_over(self, scene_id: str, channel_loaded: Callable, finished: Callable) -> bool:
+        """
+        Lets the view adopt an in-flight prefetch of scene_id instead of loading it again:
+        channels already loaded are replayed to channel_loaded(scene_id, index, channel, ch_def),
+        later ones and finished(scene_id) are forwarded as the worker reports them.
+        Returns False (abandoning any other prefetch) if scene_id is not being prefetched.
+        """
+        scene_data = self.project_model.get_scene(scene_id)
+        if (self._worker is None or self._handoff is not None or self._worker_scene != scene_id
+                or scene_data is None or tuple(ch.path for ch in scene_data.channels) != self._worker_paths):
+            self._abandon_worker()
+            return False
+
+        Logger.info(f"[Prefetch] Handing in-flight load of {scene_id} over to the view")
+        self._worker.setPriority(QThread.Priority.NormalPriority)
+        self._handoff = (channel_loaded, finished)
+        loaded, self._loaded = self._loaded, {}
+        for index in sorted(loaded):
+            channel_loaded(scene_id, index, loaded[index], scene_data.channels[index])
+        return True
+
+    def scene_ready(self, scene_id: str):
+        """The current scene finished loading: prefetch its neighbours once idle."""
+        self.cancel()
+        self._current_id = scene_id
+        self._failed.clear()
+        if self.is_enabled():
+            self._idle_timer.start()
+
+    def note_hover(self, scene_id: str):
+        """Remembers a hovered scene as a prefetch candidate."""
+        if not scene_id or scene_id == self._current_id:
+            return
+        if scene_id in self._hovered:
+            self._hovered.remove(scene_id)
+        self._hovered.append(scene_id)
+        if self._current_id and self._worker is None and self.is_enabled() and not self._idle_timer.isActive():
+            self._idle_timer.start()
+
+    def _candidates(self) -> List[str]:
+        order = self._scene_order() or []
+        result = []
+        if self._current_id in order:
+            idx = order.index(self._current_id)
+            if idx + 1 < len(order):
+                result.append(order[idx + 1])
+            if idx > 0:
+                result.append(order[idx - 1])
+        for sid in reversed(self._hovered):
+            if sid not in result:
+                result.append(sid)
+
+        cache = SceneCacheManager.instance()
+        return [sid for sid in result
+                if sid != self._current_id and sid not in self._failed
+                and not cache.contains(sid) and self.project_model.get_scene(sid) is not None]
+
+    def _start_next(self):
+        if self._worker is not None or not self._current_id or not self.is_enabled():
+            return
+        if not self._queue:
+            self._queue.extend(self._candidates())
+
+        cache = SceneCacheManager.instance()
+        while self._queue:
+            scene_id = self._queue.popleft()
+            scene_data = self.project_model.get_scene(scene_id)
+            if scene_data is None or cache.contains(scene_id) or scene_id == self._current_id:
+                continue
+            stats = cache.get_stats()
+            if stats["bytes"] >= stats["budget"]:
+                Logger.debug("[Prefetch] Cache budget full, not prefetching.")
+                self._queue.clear()
+                return
+
+            Logger.info(f"[Prefetch] Loading scene {scene_id} in background")
+            self._worker_scene = scene_id
+            self._worker_paths = tuple(ch.path for ch in scene_data.channels)
+            self._loaded = {}
+            self._worker = SceneLoaderWorker(scene_id, list(scene_data.channels),
+                                             cache_dir=self.project_model.get_cache_path())
+            self._worker.channel_loaded.connect(self._on_channel_loaded)
+            self._worker.finished_loading.connect(self._on_finished)
+            worker = self._worker
+            self._live_workers.add(worker)
+            worker.finished.connect(self._on_thread_exited)
+            worker.start(QThread.Priority.LowPriority)
+            return
+
+    def _on_channel_loaded(self, scene_id, index, data_or_obj, ch_def):
+        if self.sender() is not self._worker or scene_id != self._worker_scene:
+            return
+        if self._handoff is not None:
+            self._handoff[0](scene_id, index, data_or_obj, ch_def)
+            return
+        self._loaded[index] = data_or_obj
+
+    def _on_finished(self, scene_id):
+        if self.sender() is not self._worker or scene_id != self._worker_scene:
+            return
+        worker = self._worker
+        channels = [self._loaded.get(i) for i in range(len(self._worker_paths))]
+        handoff = self._handoff
+        self._worker = None
+        self._worker_scene = None
+        self._loaded = {}
+        self._handoff = None
+
+        scene_data = self.project_model.get_scene(scene_id)
+        valid = all(isinstance(ch, ImageChannel) for ch in channels)
+        unchanged = scene_data is not None and tuple(ch.path for ch in scene_data.channels) == self._worker_paths
+        # The worker may go on building tile pyramids for the scene; it exits on its own
+        worker.channel_loaded.disconnect(self._on_channel_loaded)
+        worker.finished_loading.disconnect(self._on_finished)
+
+        if handoff is not None:
+            # Adopted by the view: its channels are the current scene's now
+            handoff[1](scene_id)
+            return
+
+        if valid and unchanged and scene_id != self._current_id:
+            if not SceneCacheManager.instance().store_prefetched(scene_id, channels):
+                self._failed.add(scene_id)
+        else:
+            self._failed.add(scene_id)
+            for ch in channels:
+                if isinstance(ch, ImageChannel):
+                    ch.unload_raw_data()
+
+        if self._queue:
+            QTimer.singleShot(0, self._start_next)
+
+    def _abandon_worker(self):
+        worker = self._worker
+        if worker is None:
+            return
+        Logger.debug(f"[Prefetch] Cancelled prefetch of {self._worker_scene}")
+        loaded = list(self._loaded.values())
+        self._worker = None
+        self._worker_scene = None
+        self._loaded = {}
+        self._handoff = None
+        try:
+            worker.channel_loaded.disconnect(self._on_channel_loaded)
+            worker.finished_loading.disconnect(self._on_finished)
+        except (RuntimeError, TypeError):
+            pass
+        # Flag only (no wait): the thread exits at its next checkpoint
+        worker.cancel()
+        for ch in loaded:
+            if isinstance(ch, ImageChannel):
+                ch.unload_raw_data()
+
+    def _on_thread_exited(self):
+        worker = self.sender()
+        if worker in self._live_workers:
+            self._live_workers.discard(worker)
+            worker.deleteLater()
+
+    def shutdown(self):
+        """Stops prefetching and waits for background loads to exit (application close)."""
+        self.cancel()
+        for worker in list(self._live_workers):
+            worker.cancel()
+            worker.wait(2000)
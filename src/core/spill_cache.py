@@ -0,0 +1,288 @@
+import os
+import zlib
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PySide6.QtCore import QRunnable, QThreadPool, QSettings
+
+from src.core.logger import Logger
+
+
+class _StoreTask(QRunnable):
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.setAutoDelete(True)
+
+    def run(self):
+        try:
+            self.fn(*self.args)
+        finally:
+            self.args = None # Release the array as soon as it is stored
+
+
+class EvictedChannelStore:
+    """
+    Second cache tier behind SceneCacheManager for the raw data of evicted channels.
+    Arrays are zlib-compressed into a memory tier; arrays that do not compress well, and
+    entries pushed out of the memory tier, are spilled as uncompressed .npy files to a
+    temporary directory and reloaded as copy-on-write memmaps. Each tier has its own byte
+    budget (0 disables it). Entries are keyed by file path, size, mtime and channel name,
+    so a changed source file is never served from the store.
+    Only flat channels whose data still matches their file are stored (no stacks,
+    pyramids or cropped data). Compression and spilling run on a background thread.
+    Spill files of dropped entries that are still mapped by a restored channel are removed
+    once the map is released (a mapped file cannot be deleted on Windows).
+    """
+    _instance = None
+
+    MEMORY_BUDGET_KEY = "performance/evicted_memory_budget_mb"
+    DISK_BUDGET_KEY = "performance/evicted_disk_budget_mb"
+    DEFAULT_MEMORY_BUDGET_MB = 512
+    DEFAULT_DISK_BUDGET_MB = 4096
+    # Store uncompressed on disk when zlib saves less than this fraction
+    MIN_COMPRESSION_GAIN = 0.3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (compressed bytes, dtype str, shape)
+        self._memory: "OrderedDict[str, Tuple[bytes, str, tuple]]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (.npy path, file size)
+        self._disk: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._disk_bytes = 0
+        # .npy path -> weak reference to the memmap restored from it
+        self._mapped: "Dict[str, weakref.ref]" = {}
+        # Spill files left to remove (mapped, or removal failed)
+        self._deferred = set()
+        self._spill_seq = 0
+        self._pending = set()
+        self._spill_dir: Optional[str] = None
+        self._settings = QSettings("FluoQuantPro", "Settings")
+        # Budgets in bytes, cached so the worker thread never touches QSettings
+        self._memory_budget = self.get_memory_budget_mb() * 1024 * 1024
+        self._disk_budget = self.get_disk_budget_mb() * 1024 * 1024
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(1)
+        atexit.register(self.clear)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # --- Budgets ---
+
+    def get_memory_budget_mb(self) -> int:
+        return int(self._settings.value(self.MEMORY_BUDGET_KEY, self.DEFAULT_MEMORY_BUDGET_MB))
+
+    def get_disk_budget_mb(self) -> int:
+        return int(self._settings.value(self.DISK_BUDGET_KEY, self.DEFAULT_DISK_BUDGET_MB))
+
+    def set_budgets_mb(self, memory_mb: int, disk_mb: int):
+        memory_mb, disk_mb = max(0, int(memory_mb)), max(0, int(disk_mb))
+        self._settings.setValue(self.MEMORY_BUDGET_KEY, memory_mb)
+        self._settings.setValue(self.DISK_BUDGET_KEY, disk_mb)
+        with self._lock:
+            self._memory_budget = memory_mb * 1024 * 1024
+            self._disk_budget = disk_mb * 1024 * 1024
+            self._trim_locked()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    # --- Keys ---
+
+    @staticmethod
+    def key_for(file_path: str, channel_name: str) -> Optional[str]:
+        try:
+            st = os.stat(file_path)
+        except (OSError, TypeError, ValueError):
+            return None
+        raw = f"{os.path.normcase(os.path.abspath(file_path))}|{st.st_size}|{st.st_mtime_ns}|{channel_name}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_eligible(channel) -> bool:
+        return (bool(getattr(channel, 'file_path', None))
+                and not getattr(channel, 'is_placeholder', False)
+                and not getattr(channel, 'data_modified', False)
+                and getattr(channel, 'stack', None) is None
+                and getattr(channel, 'pyramid', None) is None
+                and isinstance(getattr(channel, '_raw_data', None), np.ndarray))
+
+    # --- Public API ---
+
+    def put_channel(self, channel):
+        """Queues the raw data of an evicted channel for the store (call before unloading it)."""
+        if not self.is_eligible(channel):
+            return
+        if self._memory_budget <= 0 and self._disk_budget <= 0:
+            return
+        key = self.key_for(channel.file_path, channel.name)
+        if key is None:
+            return
+        with self._lock:
+            if key in self._memory or key in self._disk or key in self._pending:
+                return
+            self._pending.add(key)
+        self._pool.start(_StoreTask(self._store, key, channel._raw_data))
+
+    def get(self, file_path: str, channel_name: str) -> Optional[np.ndarray]:
+        """Returns the stored raw data for a channel of file_path, or None."""
+        key = self.key_for(file_path, channel_name)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            disk_entry = self._disk.get(key) if entry is None else None
+            if disk_entry is not None:
+                self._disk.move_to_end(key)
+
+        try:
+            if entry is not None:
+                payload, dtype, shape = entry
+                data = np.frombuffer(zlib.decompress(payload), dtype=np.dtype(dtype)).reshape(shape).copy()
+                Logger.debug(f"[EvictedStore] Restored {os.path.basename(file_path)} from memory tier")
+                return data
+            if disk_entry is not None:
+                # Copy-on-write memmap: pages are read on demand and the array stays writable
+                data = np.load(disk_entry[0], mmap_mode="c")
+                with self._lock:
+                    self._mapped[disk_entry[0]] = weakref.ref(data)
+                Logger.debug(f"[EvictedStore] Restored {os.path.basename(file_path)} from disk tier")
+                return data
+        except Exception as e:
+            Logger.warning(f"[EvictedStore] Could not restore {file_path}: {e}")
+            self._drop(key)
+        return None
+
+    def clear(self):
+        """Drops both tiers and removes the spill directory."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+            self._mapped.clear()
+            self._deferred.clear()
+            spill_dir, self._spill_dir = self._spill_dir, None
+        if spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    # --- Internals (worker thread) ---
+
+    def _store(self, key: str, data: np.ndarray):
+        try:
+            data = np.ascontiguousarray(data)
+            payload = None
+            if 0 < data.nbytes <= self._memory_budget:
+                payload = zlib.compress(data, 1)
+                if len(payload) > data.nbytes * (1.0 - self.MIN_COMPRESSION_GAIN):
+                    payload = None # Poor ratio: a memmap reload is cheaper than decompressing
+
+            if payload is not None:
+                with self._lock:
+                    self._memory[key] = (payload, data.dtype.str, data.shape)
+                    self._memory_bytes += len(payload)
+                    self._trim_locked()
+            else:
+                self._spill(key, data)
+        except Exception as e:
+            Logger.warning(f"[EvictedStore] Could not store channel data: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _spill(self, key: str, data: np.ndarray):
+        if data.nbytes > self._disk_budget:
+            return
+        with self._lock:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix="fluoquantpro_spill_")
+            # Unique name: an earlier file of the same key may still be mapped
+            self._spill_seq += 1
+            path = os.path.join(self._spill_dir, f"{key}_{self._spill_seq}.npy")
+        np.save(path, data)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._disk[key] = (path, size)
+            self._disk_bytes += size
+            self._trim_locked()
+
+    def _demote(self, key: str, payload: bytes, dtype: str, shape: tuple):
+        try:
+            self._spill(key, np.frombuffer(zlib.decompress(payload), dtype=np.dtype(dtype)).reshape(shape))
+        except Exception as e:
+            Logger.warning(f"[EvictedStore] Could not spill channel data: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _remove_file_locked(self, path: str):
+        """Removes a spill file, or defers it while a restored channel still maps it."""
+        ref = self._mapped.get(path)
+        if ref is not None and ref() is not None:
+            self._deferred.add(path)
+            return
+        self._mapped.pop(path, None)
+        try:
+            os.remove(path)
+            self._deferred.discard(path)
+        except FileNotFoundError:
+            self._deferred.discard(path)
+        except OSError:
+            self._deferred.add(path)
+
+    def _sweep_locked(self):
+        """Retries the deferred removals and forgets released maps."""
+        for path in list(self._deferred):
+            self._remove_file_locked(path)
+        for path in [p for p, ref in self._mapped.items() if ref() is None and p not in self._deferred]:
+            del self._mapped[path]
+
+    def _trim_locked(self):
+        self._sweep_locked()
+        demote = []
+        while self._memory and self._memory_bytes > self._memory_budget:
+            key, (payload, dtype, shape) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(payload)
+            demote.append((key, payload, dtype, shape))
+
+        while self._disk and self._disk_bytes > self._disk_budget:
+            _, (path, size) = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._remove_file_locked(path)
+
+        # Entries pushed out of the memory tier move down to the disk tier
+        if self._disk_budget > 0:
+            for key, payload, dtype, shape in demote:
+                self._pending.add(key)
+                self._pool.start(_StoreTask(self._demote, key, payload, dtype, shape))
+
+    def _drop(self, key: str):
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= len(entry[0])
+            disk_entry = self._disk.pop(key, None)
+            if disk_entry is not None:
+                self._disk_bytes -= disk_entry[1]
+                self._remove_file_locked(disk_entry[0])
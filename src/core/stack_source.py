@@ -0,0 +1,235 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import tifffile
+
+from .logger import Logger
+
+
+class StackSource:
+    """
+    Lazy handle on a multi-plane TIFF series (Z-stack, time-series or both).
+    Planes are decoded one page at a time through tifffile page indexing and kept
+    in a small LRU, so scrubbing through Z only decodes the plane being viewed.
+    Projections (max, mean, sum, min) are streamed plane by plane and cached per
+    range, so switching projection mode never re-reads the file twice.
+    """
+
+    PROJECTION_MODES = ("max", "mean", "sum", "min")
+
+    # Axes that index planes within a series (tifffile axis codes).
+    # 'C' is deliberately excluded: multi-channel files keep the eager
+    # channel extraction path in ImageLoader.
+    PLANE_AXES = "TZQIRLVEHAPMO"
+
+    def __init__(self, file_path: str, tif: tifffile.TiffFile, series_index: int = 0,
+                 max_cached_planes: int = 8, max_cached_projections: int = 4):
+        self.file_path = file_path
+        self._tif = tif
+        self._series_index = series_index
+        series = tif.series[series_index]
+
+        self.axes = series.axes
+        self.shape = tuple(series.shape)
+        self.dtype = np.dtype(series.dtype)
+        self.plane_count = len(series.pages)
+
+        page_axes = series.pages[0].axes if series.pages[0] is not None else ""
+        self.plane_axes = "".join(a for a in self.axes if a not in page_axes)
+        self.plane_shape = tuple(s for a, s in zip(self.axes, self.shape) if a not in self.plane_axes)
+        self._plane_dims = tuple(s for a, s in zip(self.axes, self.shape) if a in self.plane_axes)
+
+        self._lock = threading.Lock()
+        self._owners = 1
+        self._max_cached_planes = max(1, int(max_cached_planes))
+        self._max_cached_projections = max(1, int(max_cached_projections))
+        self._plane_cache: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._projection_cache: "OrderedDict[Tuple[str, int, int], np.ndarray]" = OrderedDict()
+
+    @classmethod
+    def open(cls, file_path: str) -> Optional["StackSource"]:
+        """
+        Opens file_path as a lazy stack.
+        Returns None if the file is not a TIFF or holds only a single plane,
+        in which case the caller should fall back to ImageLoader.load_image.
+        """
+        if not file_path or not os.path.exists(file_path):
+            return None
+        if os.path.splitext(file_path)[1].lower() not in (".tif", ".tiff"):
+            return None
+
+        tif = None
+        try:
+            tif = tifffile.TiffFile(file_path)
+            if not tif.series:
+                tif.close()
+                return None
+            series = tif.series[0]
+            n_pages = len(series.pages)
+            if n_pages <= 1 or series.pages[0] is None:
+                tif.close()
+                return None
+
+            page_axes = series.pages[0].axes
+            plane_axes = [(a, s) for a, s in zip(series.axes, series.shape) if a not in page_axes and s > 1]
+            axis_codes = "".join(a for a, _ in plane_axes)
+
+            # Only Z/T-like axes are navigable planes. Channel axes are handled eagerly.
+            if not axis_codes or any(a not in cls.PLANE_AXES for a in axis_codes):
+                tif.close()
+                return None
+
+            # Ambiguous unlabelled 3/4-plane files are treated as channels-first RGB(A)
+            # by ImageLoader.extract_channel_data; keep that behaviour.
+            if axis_codes == "Q" and n_pages in (3, 4):
+                tif.close()
+                return None
+
+            source = cls(file_path, tif)
+            Logger.info(f"[StackSource] Opened {os.path.basename(file_path)} lazily: axes={source.axes}, planes={source.plane_count}")
+            return source
+        except Exception as e:
+            Logger.debug(f"[StackSource] Lazy open failed for {file_path}: {e}")
+            if tif is not None:
+                try:
+                    tif.close()
+                except Exception:
+                    pass
+            return None
+
+    def plane_coords(self, index: int) -> Dict[str, int]:
+        """Maps a flat plane index to per-axis coordinates, e.g. {'T': 2, 'Z': 5}."""
+        index = self._clamp_index(index)
+        dims = [s for s in self._plane_dims]
+        coords = np.unravel_index(index, dims) if dims else ()
+        return {a: int(c) for a, c in zip(self.plane_axes, coords)}
+
+    def read_plane(self, index: int) -> np.ndarray:
+        """Returns a single decoded plane, served from the LRU if available."""
+        index = self._clamp_index(index)
+        with self._lock:
+            cached = self._plane_cache.get(index)
+            if cached is not None:
+                self._plane_cache.move_to_end(index)
+                return cached
+
+            plane = self._decode_plane(index)
+            self._plane_cache[index] = plane
+            while len(self._plane_cache) > self._max_cached_planes:
+                self._plane_cache.popitem(last=False)
+            return plane
+
+    def projection(self, mode: str = "max", start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the projection of planes [start, stop) using mode (max, mean, sum, min).
+        Results are cached per (mode, start, stop).
+        """
+        mode = (mode or "max").lower()
+        if mode not in self.PROJECTION_MODES:
+            raise ValueError(f"Unknown projection mode: {mode}")
+
+        start, stop = self._normalize_range(start, stop)
+        key = (mode, start, stop)
+        with self._lock:
+            cached = self._projection_cache.get(key)
+            if cached is not None:
+                self._projection_cache.move_to_end(key)
+                return cached
+
+            result = self._compute_projection(mode, start, stop)
+            self._projection_cache[key] = result
+            while len(self._projection_cache) > self._max_cached_projections:
+                self._projection_cache.popitem(last=False)
+            return result
+
+    def cached_arrays(self) -> List[np.ndarray]:
+        """Decoded planes and projections currently held in memory (for cache accounting)."""
+        with self._lock:
+            return list(self._plane_cache.values()) + list(self._projection_cache.values())
+
+    def clear_cache(self):
+        """Drops decoded planes and cached projections."""
+        with self._lock:
+            self._plane_cache.clear()
+            self._projection_cache.clear()
+
+    def acquire(self) -> "StackSource":
+        """Registers another owner of the handle (e.g. a cloned channel); each owner calls close() once."""
+        with self._lock:
+            self._owners += 1
+        return self
+
+    def close(self):
+        """Releases one owner; the last one releases the file handle and all cached arrays."""
+        with self._lock:
+            self._owners -= 1
+            if self._owners > 0:
+                return
+            self._plane_cache.clear()
+            self._projection_cache.clear()
+            if self._tif is not None:
+                try:
+                    self._tif.close()
+                except Exception:
+                    pass
+                self._tif = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._tif is not None
+
+    def _clamp_index(self, index: int) -> int:
+        return int(min(max(0, int(index)), self.plane_count - 1))
+
+    def _normalize_range(self, start: Optional[int], stop: Optional[int]) -> Tuple[int, int]:
+        start = 0 if start is None else self._clamp_index(start)
+        stop = self.plane_count if stop is None else int(min(max(start + 1, int(stop)), self.plane_count))
+        return start, stop
+
+    def _decode_plane(self, index: int) -> np.ndarray:
+        if self._tif is None:
+            # Released by its last owner: reopening would leak a handle nobody closes
+            raise ValueError(f"Stack {os.path.basename(self.file_path)} is closed")
+        plane = self._tif.asarray(key=index, series=self._series_index)
+        return np.squeeze(plane) if plane.ndim > 2 else plane
+
+    def _compute_projection(self, mode: str, start: int, stop: int) -> np.ndarray:
+        # Stream planes so only one decoded plane and one accumulator live at a time.
+        # Planes already in the LRU are reused instead of decoded again.
+        acc = None
+        for i in range(start, stop):
+            plane = self._plane_cache.get(i)
+            if plane is None:
+                plane = self._decode_plane(i)
+
+            if acc is None:
+                if mode in ("sum", "mean"):
+                    if np.issubdtype(plane.dtype, np.signedinteger):
+                        acc_dtype = np.int64
+                    elif np.issubdtype(plane.dtype, np.unsignedinteger):
+                        acc_dtype = np.uint64
+                    else:
+                        acc_dtype = np.float64
+                    acc = plane.astype(acc_dtype)
+                else:
+                    acc = plane.copy()
+            elif mode == "max":
+                np.maximum(acc, plane, out=acc)
+            elif mode == "min":
+                np.minimum(acc, plane, out=acc)
+            else:
+                acc += plane
+
+        count = stop - start
+        if mode == "mean":
+            result = acc / float(count)
+            if np.issubdtype(self.dtype, np.integer):
+                return np.rint(result).astype(self.dtype)
+            return result.astype(self.dtype)
+        if mode == "sum":
+            # Sums overflow the source bit depth; keep them as float32 like ImageJ does.
+            return acc.astype(np.float32)
+        return acc
@@ -0,0 +1,204 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import cv2
+import numpy as np
+import tifffile
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QStandardPaths, Signal
+from PySide6.QtGui import QImage
+
+from src.core.logger import Logger
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, service: "ThumbnailService", path: str):
+        super().__init__()
+        self.service = service
+        self.path = path
+        self.setAutoDelete(True)
+
+    def run(self):
+        self.service._generate(self.path)
+
+
+class ThumbnailService(QObject):
+    """
+    Shared thumbnail provider for the file pool hover preview and the canvas quicklook.
+    Thumbnails are generated on a QThreadPool, persisted as PNG in a cache directory
+    (keyed by path + size + mtime) and kept in a bounded in-memory LRU.
+    request() never decodes on the calling thread: it returns a cached QImage or None
+    and emits thumbnail_ready(path, image) once the image is available.
+    """
+    _instance = None
+
+    thumbnail_ready = Signal(str, QImage)
+
+    THUMB_SIZE = 256
+    VALID_EXTS = ('.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp')
+
+    def __init__(self, max_items: int = 300):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, QImage]" = OrderedDict()
+        self._max_items = max(1, int(max_items))
+        self._pending = set()
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max(1, min(2, QThreadPool.globalInstance().maxThreadCount())))
+        self._cache_dir = None
+        self.set_cache_dir(None)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def set_cache_dir(self, cache_root: Optional[str]):
+        """Uses <cache_root>/thumbnails (e.g. the project .cache); falls back to the user cache location."""
+        if cache_root:
+            cache_dir = os.path.join(cache_root, "thumbnails")
+        else:
+            base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+            cache_dir = os.path.join(base, "FluoQuantPro", "thumbnails") if base else None
+        with self._lock:
+            self._cache_dir = cache_dir
+
+    def request(self, path: str) -> Optional[QImage]:
+        """Returns the thumbnail if it is in memory, otherwise schedules it and returns None."""
+        if not path or not path.lower().endswith(self.VALID_EXTS):
+            return None
+        key = self._key(path)
+        if key is None:
+            return None
+        with self._lock:
+            img = self._memory.get(key)
+            if img is not None:
+                self._memory.move_to_end(key)
+                return img
+            if path in self._pending:
+                return None
+            self._pending.add(path)
+        self._pool.start(_ThumbnailTask(self, path))
+        return None
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    def _key(self, path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = f"{os.path.normcase(os.path.abspath(path))}|{st.st_size}|{st.st_mtime_ns}|{self.THUMB_SIZE}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _generate(self, path: str):
+        img = None
+        try:
+            key = self._key(path)
+            if key is None:
+                return
+            with self._lock:
+                cache_dir = self._cache_dir
+            disk_path = os.path.join(cache_dir, key + ".png") if cache_dir else None
+
+            # 1. Disk cache
+            if disk_path and os.path.exists(disk_path):
+                loaded = QImage(disk_path)
+                if not loaded.isNull():
+                    img = loaded
+
+            # 2. Decode (worker thread only)
+            if img is None:
+                data = self.make_thumbnail_array(path, self.THUMB_SIZE)
+                if data is None:
+                    return
+                img = self._to_qimage(data)
+                if disk_path:
+                    try:
+                        os.makedirs(cache_dir, exist_ok=True)
+                        img.save(disk_path, "PNG")
+                    except Exception as e:
+                        Logger.debug(f"[Thumbnail] Could not write cache for {path}: {e}")
+
+            with self._lock:
+                self._memory[key] = img
+                self._memory.move_to_end(key)
+                while len(self._memory) > self._max_items:
+                    self._memory.popitem(last=False)
+        except Exception as e:
+            Logger.debug(f"[Thumbnail] Generation failed for {path}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+            if img is not None:
+                self.thumbnail_ready.emit(path, img)
+
+    @staticmethod
+    def make_thumbnail_array(path: str, max_size: int = 256) -> Optional[np.ndarray]:
+        """Decodes a downsampled, 8-bit normalized (RGB or grayscale) preview of path."""
+        img = None
+
+        # 1. TiffFile for TIFFs (handles scientific data better, reads a strided memmap)
+        if path.lower().endswith(('.tif', '.tiff')):
+            try:
+                with tifffile.TiffFile(path) as tif:
+                    page = tif.pages[0]
+                    shape = page.shape
+                    if len(shape) in (2, 3):
+                        arr = page.asarray(out='memmap')
+                        if arr.ndim == 3 and page.axes.startswith('S'):
+                            arr = np.moveaxis(arr, 0, -1) # Planar (S, Y, X) -> (Y, X, S)
+                        h, w = arr.shape[:2]
+                        subsample = max(1, min(h, w) // max_size)
+                        img = np.array(arr[::subsample, ::subsample])
+            except Exception:
+                # Fallback to OpenCV if tifffile fails
+                img = None
+
+        # 2. OpenCV for everything else (or failed TIFFs); np.fromfile handles Unicode paths
+        if img is None:
+            img_stream = np.fromfile(path, dtype=np.uint8)
+            img = cv2.imdecode(img_stream, cv2.IMREAD_UNCHANGED)
+            if img is None:
+                return None
+            if img.ndim == 3:
+                if img.shape[2] == 3:
+                    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                elif img.shape[2] == 4:
+                    img = cv2.cvtColor(img, cv2.COLOR_BGRA2RGBA)
+
+        # Anything that is not RGB(A) is shown as a max projection
+        if img.ndim == 3 and img.shape[2] not in (3, 4):
+            img = np.max(img, axis=2)
+
+        # Normalize (e.g. 16-bit)
+        if img.dtype != np.uint8:
+            d_min, d_max = float(img.min()), float(img.max())
+            if d_max > d_min:
+                img = ((img - d_min) / (d_max - d_min) * 255).astype(np.uint8)
+            else:
+                img = np.zeros(img.shape, dtype=np.uint8)
+
+        h, w = img.shape[:2]
+        scale = min(max_size / w, max_size / h)
+        if scale < 1.0:
+            img = cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        return np.ascontiguousarray(img)
+
+    @staticmethod
+    def _to_qimage(img: np.ndarray) -> QImage:
+        h, w = img.shape[:2]
+        ch = 1 if img.ndim == 2 else img.shape[2]
+        if ch == 3:
+            qimg = QImage(img.data, w, h, w * 3, QImage.Format.Format_RGB888)
+        elif ch == 4:
+            qimg = QImage(img.data, w, h, w * 4, QImage.Format.Format_RGBA8888)
+        else:
+            qimg = QImage(img.data, w, h, w, QImage.Format.Format_Grayscale8)
+        # Detach from the numpy buffer before it goes out of scope
+        return qimg.copy()
@@ -0,0 +1,59 @@
+from typing import Optional
+
+import numpy as np
+import tifffile
+
+
+def read_page_window(tif: tifffile.TiffFile, page, y0: int, y1: int, x0: int, x1: int,
+                     step: int = 1) -> Optional[np.ndarray]:
+    """
+    Pixels [y0:y1:step, x0:x1:step] of a TIFF page, channels last (a planar sample axis is
+    moved last), without decoding the whole page: uncompressed contiguous pages are
+    memory-mapped and only the window is copied, others decode only the strips/tiles
+    holding rows of the window.
+    Returns None for layouts this does not cover (volumetric pages, irregular segment
+    tables); callers then fall back to page.asarray().
+    """
+    if isinstance(page, tifffile.TiffFrame):
+        page = page.aspage() # Frames of a series share tags with its first page
+    # (separate sample planes, depth, Y, X, contiguous samples); sample planes are segments too
+    planes, depth, h, w, spp = page.shaped
+    if depth != 1:
+        return None
+    step = max(1, int(step))
+    y0, y1 = max(0, int(y0)), min(h, int(y1))
+    x0, x1 = max(0, int(x0)), min(w, int(x1))
+
+    if page.is_memmappable:
+        data = np.memmap(tif.filehandle.path, dtype=page.dtype.newbyteorder(tif.byteorder), mode="r",
+                         offset=page.dataoffsets[0], shape=page.shaped)
+        # Copy of the window only, in native byte order (planes, Y, X, samples)
+        data = data[:, 0, y0:y1:step, x0:x1:step, :].astype(page.dtype)
+    else:
+        chunk_h = page.tilelength if page.is_tiled else min(h, page.rowsperstrip or h)
+        chunk_w = page.tilewidth if page.is_tiled else w
+        down, across = -(-h // chunk_h), -(-w // chunk_w)
+        if len(page.dataoffsets) != planes * down * across:
+            return None
+
+        rows = range(y0, y1, step)
+        data = np.zeros((planes, len(rows), max(0, x1 - x0), spp), dtype=page.dtype)
+        if data.size:
+            indices = [(plane * down + ty) * across + tx for plane in range(planes)
+                       for ty in sorted({r // chunk_h for r in rows})
+                       for tx in range(x0 // chunk_w, (x1 - 1) // chunk_w + 1)]
+            segments = tif.filehandle.read_segments([page.dataoffsets[i] for i in indices],
+                                                    [page.databytecounts[i] for i in indices], indices=indices)
+            for raw, index in segments:
+                segment, (plane, _, sy, sx, _), _ = page.decode(raw, index, jpegtables=page.jpegtables)
+                if segment is None:
+                    continue # Sparse segment: stays zero
+                cx0, cx1 = max(x0, sx), min(x1, sx + segment.shape[2])
+                first = y0 + -(-(max(sy, y0) - y0) // step) * step
+                for r in range(first, min(y1, sy + segment.shape[1]), step):
+                    data[plane, (r - y0) // step, cx0 - x0:cx1 - x0] = segment[0, r - sy, cx0 - sx:cx1 - sx]
+        data = data[:, :, ::step]
+
+    # Channels last, 2D for single-sample pages
+    data = np.moveaxis(data[..., 0], 0, -1) if planes > 1 else data[0]
+    return np.ascontiguousarray(data[..., 0] if data.shape[-1] == 1 else data)
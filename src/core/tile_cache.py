@@ -0,0 +1,286 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .logger import Logger
+from .pyramid_source import PyramidLevels
+
+
+class TilePyramid(PyramidLevels):
+    """
+    On-disk multiscale tile cache for large flat (non-pyramidal) images.
+    Each level is stored as tile_size x tile_size .npy tiles under
+    <cache_root>/tiles/<key>/L<level>/<ty>_<tx>.npy, where key hashes the source
+    path, size and mtime. Tiles are memory-mapped on read, so only the tiles
+    covering the requested region are touched.
+    After each build the cache is pruned (see prune): entries of changed or deleted
+    sources are removed, then the least recently opened ones beyond MAX_CACHE_MB.
+    """
+
+    # Flat images with a long side at or above this are worth caching
+    MIN_BUILD_DIM = 8192
+    TILE_SIZE = 512
+    MANIFEST = "manifest.json"
+    VERSION = 1
+    MAX_CACHE_MB = 4096
+    # A directory without manifest younger than this may be a build in progress
+    INCOMPLETE_GRACE_S = 3600
+
+    def __init__(self, file_path: str, cache_dir: str, manifest: dict, max_cached_levels: int = 2):
+        self.file_path = file_path
+        self.cache_dir = cache_dir
+        self.tile_size = int(manifest["tile_size"])
+        self.dtype = np.dtype(manifest["dtype"])
+        self.level_shapes: List[Tuple[int, int]] = [tuple(s) for s in manifest["levels"]]
+        self.base_shape = self.level_shapes[0]
+        self._samples = int(manifest.get("samples", 0))
+
+        self._lock = threading.Lock()
+        self._max_cached_levels = max(1, int(max_cached_levels))
+        self._level_cache: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    @staticmethod
+    def cache_key(file_path: str) -> Optional[str]:
+        """Key derived from the normalized path, file size and mtime (None if the file is missing)."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        raw = f"{os.path.normcase(os.path.abspath(file_path))}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _dir_for(cls, file_path: str, cache_root: str) -> Optional[str]:
+        key = cls.cache_key(file_path)
+        if not key or not cache_root:
+            return None
+        return os.path.join(cache_root, "tiles", key)
+
+    @classmethod
+    def open(cls, file_path: str, cache_root: str) -> Optional["TilePyramid"]:
+        """Returns the cached pyramid for file_path, or None if no complete, current cache exists."""
+        cache_dir = cls._dir_for(file_path, cache_root)
+        if not cache_dir:
+            return None
+        manifest_path = os.path.join(cache_dir, cls.MANIFEST)
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != cls.VERSION:
+                return None
+            pyramid = cls(file_path, cache_dir, manifest)
+            try:
+                os.utime(manifest_path) # Last use, for pruning
+            except OSError:
+                pass
+            Logger.info(f"[TilePyramid] Using tile cache for {os.path.basename(file_path)}: levels={pyramid.level_shapes}")
+            return pyramid
+        except Exception as e:
+            Logger.debug(f"[TilePyramid] Ignoring unreadable tile cache for {file_path}: {e}")
+            return None
+
+    @classmethod
+    def should_build(cls, data: Optional[np.ndarray]) -> bool:
+        return data is not None and data.ndim in (2, 3) and max(data.shape[:2]) >= cls.MIN_BUILD_DIM
+
+    @classmethod
+    def build(cls, file_path: str, data: np.ndarray, cache_root: str,
+              should_continue: Optional[Callable[[], bool]] = None) -> Optional["TilePyramid"]:
+        """
+        Writes the tile pyramid for data (the image as returned by ImageLoader.load_image).
+        The manifest is written last, so an interrupted build is never picked up by open().
+        Returns None if cancelled via should_continue or on error.
+        """
+        cache_dir = cls._dir_for(file_path, cache_root)
+        if not cache_dir:
+            return None
+
+        tile = cls.TILE_SIZE
+        try:
+            if os.path.exists(cache_dir):
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            os.makedirs(cache_dir, exist_ok=True)
+
+            level_shapes = []
+            level_data = data
+            level = 0
+            while True:
+                h, w = level_data.shape[:2]
+                level_shapes.append((int(h), int(w)))
+                level_dir = os.path.join(cache_dir, f"L{level}")
+                os.makedirs(level_dir, exist_ok=True)
+                for ty in range(0, h, tile):
+                    if should_continue is not None and not should_continue():
+                        shutil.rmtree(cache_dir, ignore_errors=True)
+                        Logger.info(f"[TilePyramid] Build cancelled for {os.path.basename(file_path)}")
+                        return None
+                    for tx in range(0, w, tile):
+                        np.save(os.path.join(level_dir, f"{ty // tile}_{tx // tile}.npy"),
+                                np.ascontiguousarray(level_data[ty:ty + tile, tx:tx + tile]))
+
+                if max(h, w) <= tile:
+                    break
+                level_data = cls._halve(level_data)
+                level += 1
+
+            manifest = {
+                "version": cls.VERSION,
+                "source": os.path.abspath(file_path),
+                "tile_size": tile,
+                "dtype": str(data.dtype),
+                "samples": int(data.shape[2]) if data.ndim == 3 else 0,
+                "levels": level_shapes,
+            }
+            tmp_path = os.path.join(cache_dir, cls.MANIFEST + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, os.path.join(cache_dir, cls.MANIFEST))
+            Logger.info(f"[TilePyramid] Built tile cache for {os.path.basename(file_path)}: levels={level_shapes}")
+            cls.prune(cache_root, keep=cache_dir)
+            return cls(file_path, cache_dir, manifest)
+        except Exception as e:
+            Logger.error(f"[TilePyramid] Failed to build tile cache for {file_path}: {e}")
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            return None
+
+    @classmethod
+    def prune(cls, cache_root: str, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """
+        Removes stale tile caches (source changed or deleted, abandoned builds), then the least
+        recently opened ones until the rest fit in max_bytes (default MAX_CACHE_MB).
+        keep (a cache directory) is never removed. Returns the number of caches removed.
+        """
+        tiles_root = os.path.join(cache_root, "tiles") if cache_root else None
+        if not tiles_root or not os.path.isdir(tiles_root):
+            return 0
+        if max_bytes is None:
+            max_bytes = cls.MAX_CACHE_MB * 1024 * 1024
+        keep = os.path.normcase(os.path.abspath(keep)) if keep else None
+
+        removed = 0
+        entries = [] # (last used, bytes, path)
+        now = time.time()
+        for entry in os.scandir(tiles_root):
+            if not entry.is_dir() or os.path.normcase(os.path.abspath(entry.path)) == keep:
+                continue
+            manifest_path = os.path.join(entry.path, cls.MANIFEST)
+            try:
+                if os.path.exists(manifest_path):
+                    with open(manifest_path, "r", encoding="utf-8") as f:
+                        source = json.load(f).get("source")
+                    stale = not source or cls.cache_key(source) != entry.name
+                    last_used = os.path.getmtime(manifest_path)
+                else:
+                    last_used = entry.stat().st_mtime
+                    stale = now - last_used > cls.INCOMPLETE_GRACE_S
+            except (OSError, ValueError):
+                stale, last_used = True, 0.0
+            if stale:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+                continue
+            if os.path.exists(manifest_path):
+                entries.append((last_used, cls._dir_bytes(entry.path), entry.path))
+
+        total = sum(size for _, size, _ in entries) + (cls._dir_bytes(keep) if keep and os.path.isdir(keep) else 0)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        if removed:
+            Logger.info(f"[TilePyramid] Pruned {removed} tile cache(s) in {tiles_root}")
+        return removed
+
+    @staticmethod
+    def _dir_bytes(path: str) -> int:
+        total = 0
+        for dir_path, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(dir_path, name))
+                except OSError:
+                    pass
+        return total
+
+    @staticmethod
+    def _halve(data: np.ndarray) -> np.ndarray:
+        h, w = data.shape[:2]
+        new_size = (max(1, w // 2), max(1, h // 2))
+        try:
+            return cv2.resize(data, new_size, interpolation=cv2.INTER_AREA)
+        except cv2.error:
+            # Dtypes OpenCV cannot resize (e.g. uint32): plain decimation
+            return np.ascontiguousarray(data[::2, ::2])
+
+    def read_region(self, level: int, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """Assembles [y0:y1, x0:x1] of a level (level coordinates) from the tiles it overlaps."""
+        level = int(min(max(0, level), self.level_count - 1))
+        lh, lw = self.level_shapes[level]
+        y0, y1 = max(0, int(y0)), min(lh, int(y1))
+        x0, x1 = max(0, int(x0)), min(lw, int(x1))
+        shape = (max(0, y1 - y0), max(0, x1 - x0)) + ((self._samples,) if self._samples else ())
+        out = np.empty(shape, dtype=self.dtype)
+        if out.size == 0:
+            return out
+
+        tile = self.tile_size
+        level_dir = os.path.join(self.cache_dir, f"L{level}")
+        for ty in range(y0 // tile, (y1 - 1) // tile + 1):
+            for tx in range(x0 // tile, (x1 - 1) // tile + 1):
+                block = np.load(os.path.join(level_dir, f"{ty}_{tx}.npy"), mmap_mode="r")
+                by, bx = ty * tile, tx * tile
+                sy0, sy1 = max(y0, by), min(y1, by + block.shape[0])
+                sx0, sx1 = max(x0, bx), min(x1, bx + block.shape[1])
+                out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = block[sy0 - by:sy1 - by, sx0 - bx:sx1 - bx]
+        return out
+
+    def read_level(self, level: int) -> np.ndarray:
+        """Assembles a whole level, served from the LRU if available."""
+        level = int(min(max(0, level), self.level_count - 1))
+        with self._lock:
+            cached = self._level_cache.get(level)
+            if cached is not None:
+                self._level_cache.move_to_end(level)
+                return cached
+
+            lh, lw = self.level_shapes[level]
+            data = self.read_region(level, 0, lh, 0, lw)
+            # The base level is owned by the channel once assembled; do not keep a second copy.
+            if level != 0:
+                self._level_cache[level] = data
+                while len(self._level_cache) > self._max_cached_levels:
+                    self._level_cache.popitem(last=False)
+            return data
+
+    def cached_arrays(self) -> List[np.ndarray]:
+        """Assembled levels currently held in memory (for cache accounting)."""
+        with self._lock:
+            return list(self._level_cache.values())
+
+    def clear_cache(self):
+        """Drops assembled levels (tiles stay on disk)."""
+        with self._lock:
+            self._level_cache.clear()
+
+    def acquire(self) -> "TilePyramid":
+        """Shares the pyramid with another owner (tiles are opened per read: no handle to count)."""
+        return self
+
+    def close(self):
+        self.clear_cache()
+
+    @property
+    def is_open(self) -> bool:
+        return os.path.isdir(self.cache_dir)
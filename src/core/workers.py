@@ -1,22 +1,32 @@
 import os
+import threading
+from collections import deque
+
 import numpy as np
 from PySide6.QtCore import QThread, Signal
 from src.core.logger import Logger
 from src.core.data_model import ImageChannel
 from src.core.image_loader import ImageLoader
+from src.core.tile_cache import TilePyramid
+from src.core.file_index import iter_image_files
+from src.core.file_probe import FileProbeCache, probe_file
+from src.core.spill_cache import EvictedChannelStore
 
 class SceneLoaderWorker(QThread):
     # scene_id, index, data (numpy array or None), channel_def (object)
     channel_loaded = Signal(str, int, object, object) 
     finished_loading = Signal(str)
 
-    def __init__(self, scene_id, channel_defs):
+    def __init__(self, scene_id, channel_defs, cache_dir=None):
         super().__init__()
         self.scene_id = scene_id
         self.channel_defs = channel_defs
+        # Project .cache directory for tile pyramids of large flat images (None = disabled)
+        self.cache_dir = cache_dir
         self._is_running = True
         
-    def preprocess_data(self, data):
+    @staticmethod
+    def preprocess_data(data):
         """
         Pre-process data in the worker thread to save main thread CPU time.
         Handles Max Projection for Z-stacks/Multichannel images.
@@ -46,41 +56,215 @@ class SceneLoaderWorker(QThread):
 
     def run(self):
         Logger.info("[Worker] Started")
+        pending_tile_builds = []
         for i, ch_def in enumerate(self.channel_defs):
             if not self._is_running: return
             
             data = None
-            if ch_def.path and os.path.exists(ch_def.path):
+            stack = None
+            pyramid = None
+            # Recently evicted flat channels come back from the second cache tier without decoding
+            if ch_def.path:
+                data = EvictedChannelStore.instance().get(ch_def.path, ch_def.channel_type)
+            if data is None and ch_def.path and os.path.exists(ch_def.path):
                 try:
                     Logger.info(f"[Worker] Reading {os.path.basename(ch_def.path)}...")
-                    # Use the robust ImageLoader instead of raw tifffile
-                    data, is_rgb = ImageLoader.load_image(ch_def.path)
+                    # Pyramidal slides (and large flat images with a tile pyramid from a previous
+                    # open) decode only the overview level; Z-stacks / time-series only the projection,
+                    # individual planes are read on demand when the user scrubs through them.
+                    data, stack, pyramid = ImageLoader.open_source(ch_def.path, self.cache_dir, ImageChannel.OVERVIEW_DIM)
                     
                     # ImageLoader already handles 4D+ and basic dimension normalization
                     # We still call preprocess_data for any extra user-defined logic (like Max Projection for 3D Z-stacks)
-                    if data is not None:
+                    if data is not None and stack is None and pyramid is None:
                         data = self.preprocess_data(data)
+                        if self.cache_dir and TilePyramid.should_build(data):
+                            pending_tile_builds.append(ch_def.path)
                         
                 except Exception as e:
                     Logger.error(f"Error loading {ch_def.path}: {e}")
             
-            if not self._is_running: return
+            if not self._is_running:
+                # Cancelled (e.g. an abandoned prefetch): nobody will own the opened handles
+                self._close_sources(stack, pyramid)
+                return
             
             # Create ImageChannel object in worker thread (performs stats calculation)
             try:
                     Logger.info(f"[Worker] Creating ImageChannel {i}...")
                     # Note: ImageChannel is a data class, safe to create here if no Qt parents involved
                     ch_obj = ImageChannel(ch_def.path, ch_def.color, ch_def.channel_type, data=data, auto_contrast=False)
+                    if stack is not None:
+                        ch_obj.attach_stack(stack)
+                    if pyramid is not None:
+                        ch_obj.attach_pyramid(pyramid)
                     Logger.info(f"[Worker] Emitting channel_loaded {i}")
                     self.channel_loaded.emit(self.scene_id, i, ch_obj, ch_def)
             except Exception as e:
                 Logger.error(f"Error creating ImageChannel in worker: {e}")
+                self._close_sources(stack, pyramid)
                 # Fallback to passing data if object creation fails (should not happen)
                 self.channel_loaded.emit(self.scene_id, i, data, ch_def)
 
+        # Tile pyramids are built by their own worker, which outlives this loader (a scene
+        # switch stops the loader as soon as the scene is shown)
+        for path in pending_tile_builds:
+            TileBuildWorker.instance().enqueue(path, self.cache_dir)
+
         Logger.info("[Worker] Finished")
         self.finished_loading.emit(self.scene_id)
 
+    @staticmethod
+    def _close_sources(stack, pyramid):
+        for source in (stack, pyramid):
+            if source is not None:
+                source.close()
+
+    def cancel(self):
+        """Requests the worker to stop at its next checkpoint without blocking."""
+        self._is_running = False
+
+    def stop(self):
+        self.cancel()
+        self.wait()
+
+
+class TileBuildWorker(QThread):
+    """
+    Builds tile pyramids (TilePyramid.build) for large flat images one after another,
+    so the next open of these files reads only the levels/tiles it needs instead of
+    decoding the full image. Scene loaders queue the paths of the images they decoded;
+    each file is read again just before its build, so queued builds hold no pixel data.
+    The worker runs while the queue is non-empty and is stopped by the main window on close.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._queue = deque() # (path, cache_dir)
+        self._queued_paths = set()
+        self._is_running = True
+        self._active = False # run() is (about to be) processing the queue
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def enqueue(self, path, cache_dir):
+        """Queues a build (ignored if the path is already queued or being built, or after stop())."""
+        if not path or not cache_dir:
+            return
+        with self._lock:
+            if not self._is_running or path in self._queued_paths:
+                return
+            self._queue.append((path, cache_dir))
+            self._queued_paths.add(path)
+            start = not self._active
+            self._active = True
+        if start:
+            self.wait() # A run() that just found the queue empty may still be exiting
+            self.start(QThread.Priority.LowPriority)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def run(self):
+        while True:
+            with self._lock:
+                if not self._is_running or not self._queue:
+                    self._active = False
+                    return
+                path, cache_dir = self._queue[0]
+            Logger.info(f"[TileBuild] Building tile pyramid for {os.path.basename(path)}...")
+            try:
+                # Same data the scene loader displayed (load_image + preprocess_data)
+                data = SceneLoaderWorker.preprocess_data(ImageLoader.load_image(path)[0])
+                if data is not None and self._is_running:
+                    TilePyramid.build(path, data, cache_dir, should_continue=lambda: self._is_running)
+            except Exception as e:
+                Logger.error(f"[TileBuild] Failed for {path}: {e}")
+            data = None # Release this image before reading the next one
+            with self._lock:
+                if self._queue and self._queue[0][0] == path:
+                    self._queue.popleft()
+                self._queued_paths.discard(path)
+
+    def stop(self):
+        """Cancels the build in progress and drops the queue (blocking until the thread exits)."""
+        with self._lock:
+            self._is_running = False
+            self._queue.clear()
+            self._queued_paths.clear()
+        self.wait()
+
+
+class FolderScanWorker(QThread):
+    """
+    Scans a folder with os.scandir in the background and streams batches of image paths.
+    With a FileIndex, files whose size/mtime are unchanged since they were imported are
+    skipped unless they are missing from known_paths (e.g. removed from the pool since).
+    The index is read only here: the receiver records the files it actually adds.
+    """
+    # paths, {path: (size, mtime_ns)} of the paths that could be stat'ed
+    batch_found = Signal(list, dict)
+    # reported files, scanned files
+    finished_scan = Signal(int, int)
+
+    BATCH_SIZE = 500
+
+    def __init__(self, folder_path, extensions, recursive=False, file_index=None, known_paths=None):
+        super().__init__()
+        self.folder_path = folder_path
+        self.extensions = tuple(extensions)
+        self.recursive = recursive
+        self.file_index = file_index
+        self.known_paths = set(known_paths or ())
+        self._is_running = True
+
+    def run(self):
+        Logger.info(f"[ScanWorker] Scanning {self.folder_path} (recursive={self.recursive})")
+        batch, stamps = [], {}
+        reported = 0
+        scanned = 0
+        # Probes past the cache's capacity would evict the ones warmed for earlier batches
+        warm_limit = FileProbeCache.instance().max_items
+        for entry in iter_image_files(self.folder_path, self.extensions, self.recursive):
+            if not self._is_running:
+                break
+            scanned += 1
+            path = entry.path
+            try:
+                st = entry.stat()
+                stamps[path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass
+            if (self.file_index is not None and path in stamps
+                    and self.file_index.is_current(path, *stamps[path])
+                    and os.path.normpath(path) in self.known_paths):
+                del stamps[path]
+                continue
+            
+            # Warm the header probe cache so validation on the GUI thread is a cache hit
+            if reported + len(batch) < warm_limit:
+                probe_file(path)
+            batch.append(path)
+            if len(batch) >= self.BATCH_SIZE:
+                reported += len(batch)
+                self.batch_found.emit(batch, stamps)
+                batch, stamps = [], {}
+
+        if batch and self._is_running:
+            reported += len(batch)
+            self.batch_found.emit(batch, stamps)
+        Logger.info(f"[ScanWorker] Finished: {reported} new/changed of {scanned} files")
+        self.finished_scan.emit(reported, scanned)
+
     def stop(self):
         self._is_running = False
         self.wait()
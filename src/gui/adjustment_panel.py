@@ -1,5 +1,6 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                               QSlider, QGroupBox, QDoubleSpinBox, QToolButton, QSizePolicy)
+                               QSlider, QGroupBox, QDoubleSpinBox, QToolButton, QSizePolicy,
+                               QComboBox, QSpinBox)
 from PySide6.QtCore import Qt, Signal, QTimer, QSize
 from src.gui.icon_manager import get_icon
 from src.core.data_model import Session
@@ -16,6 +17,15 @@ class AdjustmentPanel(QWidget):
     settings_changed = Signal() # Emitted when any slider moves (debounced)
     channel_activated = Signal(int) # Forward signal from embedded histogram
 
+    # Z/T display modes: (key, label). "plane" shows a single plane, others are projections.
+    PLANE_MODES = [
+        ("max", "Max Projection"),
+        ("mean", "Mean Projection"),
+        ("sum", "Sum Projection"),
+        ("min", "Min Projection"),
+        ("plane", "Single Plane"),
+    ]
+
     def __init__(self, session: Session, parent=None):
         super().__init__(parent)
         self.session = session
@@ -28,6 +38,12 @@ class AdjustmentPanel(QWidget):
         self.debounce_timer.setInterval(100) # 100ms debounce
         self.debounce_timer.timeout.connect(self._apply_display_settings)
         
+        # Histogram refresh after Z/T scrubbing (kept off the scrub path)
+        self.plane_hist_timer = QTimer()
+        self.plane_hist_timer.setSingleShot(True)
+        self.plane_hist_timer.setInterval(200)
+        self.plane_hist_timer.timeout.connect(self.histogram_panel_refresh)
+        
         # Connect to global session changes (for Undo/Redo support)
         self.session.data_changed.connect(self.update_controls_from_channel)
         
@@ -78,6 +94,47 @@ class AdjustmentPanel(QWidget):
         self.grp_controls.setLayout(vbox)
         adjustment_vbox.addWidget(self.grp_controls)
         
+        # Z/T Planes (only visible for lazily loaded stacks)
+        self.grp_planes = QGroupBox(tr("Z/T Planes"))
+        planes_vbox = QVBoxLayout()
+        
+        h_mode = QHBoxLayout()
+        self.lbl_plane_mode = QLabel(tr("Display"))
+        self.lbl_plane_mode.setProperty("role", "subtitle")
+        h_mode.addWidget(self.lbl_plane_mode)
+        self.combo_plane_mode = QComboBox()
+        for key, label in self.PLANE_MODES:
+            self.combo_plane_mode.addItem(tr(label), key)
+        self.combo_plane_mode.currentIndexChanged.connect(self.on_plane_mode_changed)
+        h_mode.addWidget(self.combo_plane_mode)
+        planes_vbox.addLayout(h_mode)
+        
+        self.lbl_plane = QLabel()
+        self.lbl_plane.setProperty("role", "subtitle")
+        planes_vbox.addWidget(self.lbl_plane)
+        self.slider_plane = QSlider(Qt.Orientation.Horizontal)
+        self.slider_plane.setMinimumWidth(0)
+        self.slider_plane.valueChanged.connect(self.on_plane_changed)
+        planes_vbox.addWidget(self.slider_plane)
+        
+        h_range = QHBoxLayout()
+        self.lbl_plane_range = QLabel(tr("Range"))
+        self.lbl_plane_range.setProperty("role", "subtitle")
+        h_range.addWidget(self.lbl_plane_range)
+        self.spin_plane_start = QSpinBox()
+        self.spin_plane_start.setMinimumWidth(0)
+        self.spin_plane_start.valueChanged.connect(self.on_plane_range_changed)
+        h_range.addWidget(self.spin_plane_start)
+        self.spin_plane_stop = QSpinBox()
+        self.spin_plane_stop.setMinimumWidth(0)
+        self.spin_plane_stop.valueChanged.connect(self.on_plane_range_changed)
+        h_range.addWidget(self.spin_plane_stop)
+        planes_vbox.addLayout(h_range)
+        
+        self.grp_planes.setLayout(planes_vbox)
+        adjustment_vbox.addWidget(self.grp_planes)
+        self.grp_planes.hide()
+        
         # Reset Button
         self.btn_reset = QToolButton()
         self.btn_reset.setIcon(get_icon("refresh", "view-refresh"))
@@ -109,6 +166,12 @@ class AdjustmentPanel(QWidget):
         self.lbl_max.setText(tr("Max (White Point)"))
         self.lbl_gamma.setText(tr("Gamma"))
         self.btn_reset.setToolTip(tr("Reset brightness/contrast to default"))
+        self.grp_planes.setTitle(tr("Z/T Planes"))
+        self.lbl_plane_mode.setText(tr("Display"))
+        self.lbl_plane_range.setText(tr("Range"))
+        for i, (key, label) in enumerate(self.PLANE_MODES):
+            self.combo_plane_mode.setItemText(i, tr(label))
+        self._update_plane_label()
         
         # Sync with HistogramPanel
         if hasattr(self, 'histogram_panel'):
@@ -213,6 +276,7 @@ class AdjustmentPanel(QWidget):
         self.update_controls_from_channel()
 
     def update_controls_from_channel(self):
+        self.update_plane_controls()
         ch = self.session.get_channel(self.active_channel_index)
         if not ch:
             self.grp_controls.setEnabled(False)
@@ -288,6 +352,97 @@ class AdjustmentPanel(QWidget):
     def on_gamma_changed(self, val):
         self.debounce_timer.start()
         
+    # --- Z/T Plane Navigation ---
+    def _stack_channels(self):
+        """Channels of the current scene backed by a lazy Z/T stack."""
+        return [ch for ch in self.session.channels if getattr(ch, 'stack', None) is not None]
+
+    def update_plane_controls(self):
+        """Shows/hides the Z/T group and syncs it with the active (or first) stack channel."""
+        stack_channels = self._stack_channels()
+        if not stack_channels:
+            self.grp_planes.hide()
+            return
+        
+        ch = self.session.get_channel(self.active_channel_index)
+        if ch is None or getattr(ch, 'stack', None) is None:
+            ch = stack_channels[0]
+        n = ch.plane_count
+        
+        widgets = [self.combo_plane_mode, self.slider_plane, self.spin_plane_start, self.spin_plane_stop]
+        for w in widgets:
+            w.blockSignals(True)
+        
+        mode = "plane" if ch.plane_index is not None else ch.projection_mode
+        idx = self.combo_plane_mode.findData(mode)
+        self.combo_plane_mode.setCurrentIndex(max(0, idx))
+        
+        self.slider_plane.setRange(0, n - 1)
+        self.slider_plane.setValue(ch.plane_index if ch.plane_index is not None else 0)
+        
+        start, stop = ch.projection_range if ch.projection_range else (0, n)
+        self.spin_plane_start.setRange(1, n)
+        self.spin_plane_stop.setRange(1, n)
+        self.spin_plane_start.setValue(start + 1)
+        self.spin_plane_stop.setValue(stop)
+        
+        for w in widgets:
+            w.blockSignals(False)
+        
+        self._update_plane_widgets_enabled()
+        self._update_plane_label()
+        self.grp_planes.show()
+
+    def _update_plane_widgets_enabled(self):
+        is_plane = self.combo_plane_mode.currentData() == "plane"
+        self.slider_plane.setEnabled(is_plane)
+        self.spin_plane_start.setEnabled(not is_plane)
+        self.spin_plane_stop.setEnabled(not is_plane)
+
+    def _update_plane_label(self):
+        stack_channels = self._stack_channels()
+        if not stack_channels:
+            self.lbl_plane.setText("")
+            return
+        stack = stack_channels[0].stack
+        index = self.slider_plane.value()
+        coords = ", ".join(f"{axis}={c + 1}" for axis, c in stack.plane_coords(index).items())
+        self.lbl_plane.setText(tr("Plane {0}/{1}").format(index + 1, stack.plane_count) + (f" ({coords})" if coords else ""))
+
+    def on_plane_mode_changed(self, _index):
+        self._update_plane_widgets_enabled()
+        self._apply_plane_selection()
+
+    def on_plane_changed(self, _value):
+        self._update_plane_label()
+        self._apply_plane_selection()
+
+    def on_plane_range_changed(self, _value):
+        self._apply_plane_selection()
+
+    def _apply_plane_selection(self):
+        """Applies the selected plane/projection to every stack channel of the scene."""
+        stack_channels = self._stack_channels()
+        if not stack_channels:
+            return
+        
+        mode = self.combo_plane_mode.currentData()
+        start = self.spin_plane_start.value() - 1
+        stop = max(start + 1, self.spin_plane_stop.value())
+        
+        for ch in stack_channels:
+            if mode == "plane":
+                ch.set_plane(self.slider_plane.value())
+            else:
+                ch.set_projection(mode, start, stop)
+        
+        self.plane_hist_timer.start()
+        self.settings_changed.emit()
+
+    def histogram_panel_refresh(self):
+        """Recomputes the histogram for the currently displayed plane/projection."""
+        self.histogram_panel.update_from_channel()
+
     def reset_current_channel(self):
         ch = self.session.get_channel(self.active_channel_index)
         if not ch: return
@@ -8,12 +8,14 @@ import time
 from src.core.language_manager import tr
 from src.core.logger import Logger
 from src.core.performance_monitor import PerformanceMonitor
+from src.core.thumbnail_service import ThumbnailService
 from src.core.roi_model import ROI, create_smooth_path_from_points
 from src.gui.tools import PolygonTool, LineScanTool, DrawToolFactory, BaseDrawTool
 from src.gui.rendering.qt_engine import QtRenderEngine
 from src.gui.rendering.engine import StyleConfigCenter
 from src.utils.physical_style import PhysicalRenderStyle
 from src.gui.graphics_items import UnifiedGraphicsItem, RoiHandleItem, ScaleBarItem, LineScanGraphicsItem
+from src.gui.tiled_image_item import TiledImageItem
 from src.gui.interaction_utils import (
     find_item_at_position, 
     resolve_unified_item, 
@@ -97,6 +99,7 @@ class CanvasView(QGraphicsView):
         self.preview_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
         self.preview_label.setProperty("role", "preview")
         self.preview_label.hide()
+        ThumbnailService.instance().thumbnail_ready.connect(self._on_thumbnail_ready)
 
         # Drop Hint Overlay (Centered)
         self.drop_hint = QLabel(tr("Drop to Load Image"), self)
@@ -130,6 +133,11 @@ class CanvasView(QGraphicsView):
         self.image_border_item.setZValue(0.1)
         self.image_border_item.hide()
         
+        # Full-resolution tiles over the downsampled pixmap when zoomed in past its resolution
+        self.tiled_item = TiledImageItem(self._tile_channels)
+        self.tiled_item.setZValue(0.05)
+        self.scene().addItem(self.tiled_item)
+        
         # Label Overlay
         self.label_text = None
         self.is_selected = False
@@ -177,12 +185,15 @@ class CanvasView(QGraphicsView):
         self._wheel_enabled = True # USER REQUEST: Ability to disable wheel for thumbnails
         
         # Performance: Pixmap Proxies (Multi-level Resolution)
-        self.pixmap_l0 = None  # Original (100%)
-        self.pixmap_l1 = None  # Level 1 (e.g. 2048px)
-        self.pixmap_l2 = None  # Level 2 (e.g. 512px)
+        self.pixmap_l0 = None  # Original (100%), built on every image update
+        self._pixmap_levels = {} # Level 1 / 2 pixmaps, built on demand (see pixmap_l1 / pixmap_l2)
         self.full_res_pixmap = None # Legacy reference
-        self.low_res_pixmap = None  # Legacy reference
         self._base_pixmap_transform = QTransform()
+        # Indexed8 images of a single-channel image: {level: (index array, QImage)}
+        self._indexed_levels = {}
+        self._indexed_table = None
+        self._indexed_source = None # Index array Level 0 was built from
+        self._indexed_scene_rect = None
         
         # Map ROI ID -> GraphicsItem
         self._roi_items = {}
@@ -1014,110 +1025,68 @@ class CanvasView(QGraphicsView):
         self._disable_low_res_proxy()
         self.viewport().update()
 
-    def update_image(self, image: np.ndarray, scene_rect: QRectF = None):
+    # Downsampled display levels: level -> (long edge, scaling mode)
+    PIXMAP_LEVELS = {
+        1: (2048, Qt.TransformationMode.SmoothTransformation),
+        2: (512, Qt.TransformationMode.FastTransformation),
+    }
+
+    def update_image(self, image: np.ndarray, scene_rect: QRectF = None, indexed=None):
         """
-        Updates the displayed image with multi-level resolution pre-generation.
+        Updates the displayed image.
         USER REQUEST: Level 0 (100%), Level 1 (2048px), Level 2 (512px).
+        Only Level 0 is built here; Levels 1 and 2 are built when a zoom level or the
+        pan/zoom proxy first asks for them (pixmap_l1 / pixmap_l2) and reused until the next update.
+        
+        indexed: optional (indices, palette) of a single-channel image (image == palette[indices]).
+        The levels are then kept as Format_Indexed8 images, and a later update with the same
+        index array only swaps their 256-entry colour table (colour/gamma changes).
         """
         if image is None:
             self.pixmap_item.setPixmap(QPixmap())
             self.image_border_item.hide()
-            self.pixmap_l0 = self.pixmap_l1 = self.pixmap_l2 = None
-            self.full_res_pixmap = self.low_res_pixmap = None
+            self.pixmap_l0 = self.full_res_pixmap = None
+            self._pixmap_levels = {}
             self.last_display_array = None
+            self._indexed_source = None
+            self._indexed_levels = {}
             self.display_scale = 1.0
+            self.tiled_item.set_image_geometry(0, 0, 1.0)
             self.scene().update()
             self.viewport().update()
             return
 
+        if (indexed is not None and indexed[0] is self._indexed_source and self._indexed_levels
+                and scene_rect == self._indexed_scene_rect):
+            self._set_indexed_palette(indexed[1])
+            self.last_display_array = image
+            return
+
         h, w = image.shape[:2]
         self._is_using_low_res = False # Reset state for new image
         self.pixmap_l0 = None # Initialize to avoid AttributeError if generation fails
+        self._pixmap_levels = {}
+        self._indexed_source = None
+        self._indexed_levels = {}
         
-        # 1. Generate Multi-level Pixmaps
+        # 1. Generate Level 0 (Levels 1 and 2 are built when first needed)
         try:
             # USER REQUEST: Level 0 should respect quality settings
             # If performance mode is set, Level 0 might be capped
             settings = QSettings("FluoQuantPro", "Settings")
             quality_key = settings.value("display/quality_key", "balanced")
-            
-            # USER REQUEST: FIX Red-Blue Channel Reversal
-            # Explicitly convert to uint8 RGB and create QImage with Format_RGB888.
-            # This avoids ambiguity in qimage2ndarray or platform-specific BGR defaults.
-            if image.dtype != np.uint8:
-                img_u8 = (np.clip(image, 0, 1) * 255).astype(np.uint8)
+            max_dim = self._level0_max_dim(quality_key)
+            if max_dim is not None and (w > max_dim or h > max_dim):
+                Logger.info(f"CanvasView({self.view_id}): Rendering Quality is '{quality_key}'. Level 0 capped at {max_dim}px.")
+
+            if indexed is not None:
+                self._build_indexed_level0(indexed[0], indexed[1], max_dim)
+                self._indexed_source = indexed[0]
+                self._indexed_scene_rect = scene_rect
             else:
-                img_u8 = image
-                
-            if not img_u8.flags['C_CONTIGUOUS']:
-                img_u8 = np.ascontiguousarray(img_u8)
-                
-            h_img, w_img = img_u8.shape[:2]
-            channels = 1 if img_u8.ndim == 2 else img_u8.shape[2]
-            
-            if channels == 3:
-                qimg = QImage(img_u8.data, w_img, h_img, w_img * 3, QImage.Format.Format_RGB888)
-            elif channels == 4:
-                qimg = QImage(img_u8.data, w_img, h_img, w_img * 4, QImage.Format.Format_RGBA8888)
-            else:
-                # Grayscale
-                qimg = QImage(img_u8.data, w_img, h_img, w_img, QImage.Format.Format_Grayscale8)
-
-            full_pixmap = QPixmap.fromImage(qimg)
-            
-            # Default: Level 0 is full resolution
-            self.pixmap_l0 = full_pixmap
-            
-            # Performance Optimization: Respect "Rendering Quality" setting
-            if quality_key == "performance":
-                # USER REQUEST: Performance mode: Cap at 1024px
-                max_dim = 1024
-                if w > max_dim or h > max_dim:
-                    self.pixmap_l0 = full_pixmap.scaled(max_dim, max_dim, 
-                                                       Qt.AspectRatioMode.KeepAspectRatio, 
-                                                       Qt.TransformationMode.SmoothTransformation)
-                    Logger.info(f"CanvasView({self.view_id}): Rendering Quality is 'Performance'. Level 0 capped at {max_dim}px.")
-            elif quality_key == "balanced":
-                # USER REQUEST: Balanced mode: Cap at 2560px (2.5K)
-                max_dim = 2560
-                if w > max_dim or h > max_dim:
-                    self.pixmap_l0 = full_pixmap.scaled(max_dim, max_dim, 
-                                                       Qt.AspectRatioMode.KeepAspectRatio, 
-                                                       Qt.TransformationMode.SmoothTransformation)
-                    Logger.info(f"CanvasView({self.view_id}): Rendering Quality is 'Balanced'. Level 0 capped at {max_dim}px.")
-            elif quality_key == "4k":
-                # USER REQUEST: 4K mode: Cap at 3840px
-                max_dim = 3840
-                if w > max_dim or h > max_dim:
-                    self.pixmap_l0 = full_pixmap.scaled(max_dim, max_dim, 
-                                                       Qt.AspectRatioMode.KeepAspectRatio, 
-                                                       Qt.TransformationMode.SmoothTransformation)
-                    Logger.info(f"CanvasView({self.view_id}): Rendering Quality is '4K'. Level 0 capped at {max_dim}px.")
-            else: # "high" or other
-                # High Quality: Use original resolution
-                Logger.info(f"CanvasView({self.view_id}): Rendering Quality is 'High'. Using full resolution for Level 0.")
+                self._build_rgb_level0(image, max_dim)
             
             self.full_res_pixmap = self.pixmap_l0 # Sync legacy
-            
-            # Level 1: Long edge 2048px (Always generated for fast zoom)
-            l1_size = 2048
-            if w > l1_size or h > l1_size:
-                self.pixmap_l1 = self.pixmap_l0.scaled(l1_size, l1_size, 
-                                                    Qt.AspectRatioMode.KeepAspectRatio, 
-                                                    Qt.TransformationMode.SmoothTransformation)
-            else:
-                self.pixmap_l1 = self.pixmap_l0
-            
-            # Level 2: Long edge 512px (Used for fast scaling/panning)
-            l2_size = 512
-            if w > l2_size or h > l2_size:
-                self.pixmap_l2 = self.pixmap_l0.scaled(l2_size, l2_size, 
-                                                    Qt.AspectRatioMode.KeepAspectRatio, 
-                                                    Qt.TransformationMode.FastTransformation)
-                self.low_res_pixmap = self.pixmap_l2 # Sync legacy
-            else:
-                self.pixmap_l2 = self.pixmap_l0
-                self.low_res_pixmap = None
 
             # Initial display uses Level 0
             self.pixmap_item.setPixmap(self.pixmap_l0)
@@ -1131,7 +1100,7 @@ class CanvasView(QGraphicsView):
                 self.image_border_item.hide()
             
         except Exception as e:
-            Logger.error(f"CanvasView({self.view_id}): Multi-level Pixmap generation failed: {e}", exc_info=True)
+            Logger.error(f"CanvasView({self.view_id}): Level 0 Pixmap generation failed: {e}", exc_info=True)
 
         self.last_display_array = image # Store for tool access
         
@@ -1176,6 +1145,9 @@ class CanvasView(QGraphicsView):
             
             self.pixmap_item.setPos(0, 0)
             
+        scene = self.scene().sceneRect()
+        self.tiled_item.set_image_geometry(scene.width(), scene.height(), self.display_scale)
+            
         # 3. Update ROIs appearance based on new scale
         if self.roi_manager:
             self._sync_rois()
@@ -1187,6 +1159,150 @@ class CanvasView(QGraphicsView):
         self.scene().update()
         self.viewport().update()
 
+    @staticmethod
+    def _level0_max_dim(quality_key):
+        """Level 0 size cap (long edge) for the rendering quality setting; None for full resolution."""
+        # USER REQUEST: Performance 1024px, Balanced 2560px (2.5K), 4K 3840px, High: original resolution
+        return {"performance": 1024, "balanced": 2560, "4k": 3840}.get(quality_key)
+
+    @staticmethod
+    def _fit_size(w, h, max_dim):
+        """(w, h) scaled to fit max_dim x max_dim keeping the aspect ratio (as QPixmap.scaled does)."""
+        if w <= max_dim and h <= max_dim:
+            return w, h
+        scale = max_dim / max(w, h)
+        return max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+
+    @property
+    def pixmap_l1(self):
+        """Level 1 (long edge 2048px), built from Level 0 on first use."""
+        return self._pixmap_level(1)
+
+    @property
+    def pixmap_l2(self):
+        """Level 2 (long edge 512px, used for fast scaling/panning), built from Level 0 on first use."""
+        return self._pixmap_level(2)
+
+    @property
+    def low_res_pixmap(self):
+        """Legacy reference: Level 2 if it is smaller than Level 0."""
+        pixmap = self.pixmap_l2
+        return pixmap if pixmap is not self.pixmap_l0 else None
+
+    def detail_layer_active(self) -> bool:
+        """True while the tile layer draws the visible image at full resolution (zoomed in past the pixmap)."""
+        return self.tiled_item.covers_view(self.transform().m11())
+
+    def _tile_channels(self):
+        """Channels drawn by the tile layer: this view's channel, or the visible channels for a merge view."""
+        if self.session is None or not self.session.channels:
+            return []
+        scene = self.scene().sceneRect()
+        shape = (int(scene.height()), int(scene.width()))
+        index = self.active_channel_index
+        if index is not None and index >= 0:
+            candidates = self.session.channels[index:index + 1]
+        else:
+            candidates = [ch for ch in self.session.channels if ch.display_settings.visible]
+        return [ch for ch in candidates
+                if not getattr(ch, 'is_placeholder', False) and ch.has_data and tuple(ch.shape) == shape]
+
+    def _pixmap_level(self, level):
+        """
+        Pixmap of a downsampled level, built on first use and reused until the image changes.
+        Level 0 itself is returned when it already fits the level size.
+        """
+        if self.pixmap_l0 is None:
+            return None
+        pixmap = self._pixmap_levels.get(level)
+        if pixmap is not None:
+            return pixmap
+
+        size, mode = self.PIXMAP_LEVELS[level]
+        w0, h0 = self.pixmap_l0.width(), self.pixmap_l0.height()
+        if w0 <= size and h0 <= size:
+            pixmap = self.pixmap_l0
+        elif self._indexed_levels:
+            entry = self._indexed_levels.get(level)
+            if entry is None:
+                # Downsampled in index space (area average / nearest like Smooth / Fast scaling)
+                interpolation = cv2.INTER_AREA if mode == Qt.TransformationMode.SmoothTransformation else cv2.INTER_NEAREST
+                arr = cv2.resize(self._indexed_levels[0][0], self._fit_size(w0, h0, size), interpolation=interpolation)
+                entry = self._indexed_levels[level] = (arr, self._indexed_qimage(arr))
+            pixmap = QPixmap.fromImage(entry[1])
+        else:
+            pixmap = self.pixmap_l0.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, mode)
+        self._pixmap_levels[level] = pixmap
+        return pixmap
+
+    def _build_rgb_level0(self, image, max_dim):
+        h, w = image.shape[:2]
+        # USER REQUEST: FIX Red-Blue Channel Reversal
+        # Explicitly convert to uint8 RGB and create QImage with Format_RGB888.
+        # This avoids ambiguity in qimage2ndarray or platform-specific BGR defaults.
+        if image.dtype != np.uint8:
+            img_u8 = (np.clip(image, 0, 1) * 255).astype(np.uint8)
+        else:
+            img_u8 = image
+            
+        if not img_u8.flags['C_CONTIGUOUS']:
+            img_u8 = np.ascontiguousarray(img_u8)
+            
+        h_img, w_img = img_u8.shape[:2]
+        channels = 1 if img_u8.ndim == 2 else img_u8.shape[2]
+        
+        if channels == 3:
+            qimg = QImage(img_u8.data, w_img, h_img, w_img * 3, QImage.Format.Format_RGB888)
+        elif channels == 4:
+            qimg = QImage(img_u8.data, w_img, h_img, w_img * 4, QImage.Format.Format_RGBA8888)
+        else:
+            # Grayscale
+            qimg = QImage(img_u8.data, w_img, h_img, w_img, QImage.Format.Format_Grayscale8)
+
+        full_pixmap = QPixmap.fromImage(qimg)
+        
+        # Default: Level 0 is full resolution
+        self.pixmap_l0 = full_pixmap
+        if max_dim is not None and (w > max_dim or h > max_dim):
+            self.pixmap_l0 = full_pixmap.scaled(max_dim, max_dim, 
+                                               Qt.AspectRatioMode.KeepAspectRatio, 
+                                               Qt.TransformationMode.SmoothTransformation)
+
+    def _build_indexed_level0(self, indices, palette, max_dim):
+        """Level 0 from a uint8 index image, kept as an Indexed8 QImage for colour table swaps."""
+        h, w = indices.shape[:2]
+        l0 = indices
+        if max_dim is not None:
+            size = self._fit_size(w, h, max_dim)
+            if size != (w, h):
+                l0 = cv2.resize(indices, size, interpolation=cv2.INTER_AREA)
+        l0 = np.ascontiguousarray(l0)
+        self._indexed_table = self._color_table(palette)
+        # The array is kept alongside its QImage, which references the buffer
+        self._indexed_levels = {0: (l0, self._indexed_qimage(l0))}
+        self.pixmap_l0 = QPixmap.fromImage(self._indexed_levels[0][1])
+
+    def _indexed_qimage(self, arr):
+        lh, lw = arr.shape
+        qimg = QImage(arr.data, lw, lh, lw, QImage.Format.Format_Indexed8)
+        qimg.setColorTable(self._indexed_table)
+        return qimg
+
+    @staticmethod
+    def _color_table(palette):
+        p = palette.astype(np.uint32)
+        return (0xFF000000 | (p[:, 0] << 16) | (p[:, 1] << 8) | p[:, 2]).tolist()
+
+    def _set_indexed_palette(self, palette):
+        """Applies a (256, 3) uint8 palette to the indexed images; only Level 0 is converted right away."""
+        self._indexed_table = self._color_table(palette)
+        for _, qimg in self._indexed_levels.values():
+            qimg.setColorTable(self._indexed_table)
+        self.pixmap_l0 = self.full_res_pixmap = QPixmap.fromImage(self._indexed_levels[0][1])
+        self._pixmap_levels = {}
+        self.pixmap_item.setPixmap(self.pixmap_l2 if self._is_using_low_res else self.pixmap_l0)
+        self.viewport().update()
+
     def _enable_low_res_proxy(self):
         """
         Optimizes rendering during interaction using pre-generated Level 2 pixmap.
@@ -1196,6 +1312,7 @@ class CanvasView(QGraphicsView):
             return
 
         Logger.debug(f"[CanvasView:{self.view_id}] Enabling low-res proxy")
+        self.tiled_item.set_interactive(True)
         # Disable smoothing for better performance during movement
         self.pixmap_item.setTransformationMode(Qt.TransformationMode.FastTransformation)
         
@@ -1216,6 +1333,7 @@ class CanvasView(QGraphicsView):
 
     def _disable_low_res_proxy(self):
         """Restores high-resolution (Level 0) pixmap after interaction."""
+        self.tiled_item.set_interactive(False)
         if not self._is_using_low_res:
             # Ensure SmoothTransformation is restored
             if self.pixmap_item.transformationMode() != Qt.TransformationMode.SmoothTransformation:
@@ -1405,44 +1523,29 @@ class CanvasView(QGraphicsView):
         pos = event.position().toPoint()
         
         if self.preview_label.isHidden() or getattr(self, '_current_preview_path', None) != file_path:
-             self._load_quicklook_image(file_path)
              self._current_preview_path = file_path
+             self._load_quicklook_image(file_path)
         
         global_pos = self.mapToGlobal(pos)
         self.preview_label.move(global_pos + QPoint(20, 20))
         self.preview_label.show()
 
     def _load_quicklook_image(self, path):
+        # Decoding happens on the thumbnail service's thread pool; cached thumbnails show immediately
+        if not path.lower().endswith(('.tif', '.tiff', '.png', '.jpg', '.jpeg')): return
+        img = ThumbnailService.instance().request(path)
+        if img is not None:
+            self._set_quicklook_pixmap(img)
+        else:
+            self.preview_label.clear()
+
+    def _on_thumbnail_ready(self, path, img):
+        if path == getattr(self, '_current_preview_path', None):
+            self._set_quicklook_pixmap(img)
+
+    def _set_quicklook_pixmap(self, img):
         try:
-            if not path.lower().endswith(('.tif', '.tiff', '.png', '.jpg', '.jpeg')): return
-            img_stream = np.fromfile(path, dtype=np.uint8)
-            img = cv2.imdecode(img_stream, cv2.IMREAD_UNCHANGED)
-            if img is None: return
-            if img.ndim == 3 and img.shape[2] > 4: img = np.max(img, axis=2)
-            if img.dtype != np.uint8:
-                min_val, max_val = np.min(img), np.max(img)
-                if max_val > min_val: img = ((img - min_val) / (max_val - min_val) * 255).astype(np.uint8)
-                else: img = np.zeros_like(img, dtype=np.uint8)
-            h, w = img.shape[:2]
-            scale = min(200/w, 200/h)
-            new_w, new_h = int(w*scale), int(h*scale)
-            img_small = cv2.resize(img, (new_w, new_h))
-            
-            # Explicit QImage creation to avoid qimage2ndarray dependency
-            if not img_small.flags['C_CONTIGUOUS']:
-                img_small = np.ascontiguousarray(img_small)
-            
-            h_s, w_s = img_small.shape[:2]
-            ch_s = 1 if img_small.ndim == 2 else img_small.shape[2]
-            
-            if ch_s == 3:
-                qimg = QImage(img_small.data, w_s, h_s, w_s * 3, QImage.Format.Format_RGB888)
-            elif ch_s == 4:
-                qimg = QImage(img_small.data, w_s, h_s, w_s * 4, QImage.Format.Format_RGBA8888)
-            else:
-                qimg = QImage(img_small.data, w_s, h_s, w_s, QImage.Format.Format_Grayscale8)
-                
-            pixmap = QPixmap.fromImage(qimg)
+            pixmap = QPixmap.fromImage(img).scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
             self.preview_label.setPixmap(pixmap)
             self.preview_label.resize(pixmap.size())
         except Exception as e:
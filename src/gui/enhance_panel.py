@@ -394,15 +394,22 @@ class EnhancePanel(QWidget):
         # Check visibility logic is handled by parent TabWidget mostly
         pass
         
+    @staticmethod
+    def _estimate_auto_params(ch) -> dict:
+        """Auto enhancement parameters of the channel, memoized on its ChannelStats (per data version)."""
+        if not ch.has_data:
+            return {}
+        stats = ch.get_stats()
+        if stats.auto_params is None:
+            stats.auto_params = EnhanceProcessor.estimate_auto_params(ch.overview_data)
+        return dict(stats.auto_params)
+
     def update_controls_from_channel(self):
         ch = self.session.get_channel(self.active_channel_index)
         if not ch: return
         
         # Estimate auto params for this image.
-        if ch.raw_data is not None:
-            auto_p = EnhanceProcessor.estimate_auto_params(ch.raw_data)
-        else:
-            auto_p = {}
+        auto_p = self._estimate_auto_params(ch)
                 
         # Store auto_p in display_settings to be used by calculate_raw_params
         ch.display_settings.auto_params = auto_p
@@ -490,10 +497,7 @@ class EnhancePanel(QWidget):
         
         # Get Auto Params
         if not hasattr(ch.display_settings, 'auto_params'):
-             if ch.raw_data is not None:
-                 ch.display_settings.auto_params = EnhanceProcessor.estimate_auto_params(ch.raw_data)
-             else:
-                 ch.display_settings.auto_params = {}
+             ch.display_settings.auto_params = self._estimate_auto_params(ch)
                  
         auto = ch.display_settings.auto_params
         if not auto: return
@@ -547,10 +551,14 @@ class EnhancePanel(QWidget):
         print(f"DEBUG: [EnhancePanel] Final Calculated Params: {raw_p}")
         
         # --- Update Histogram with Preview ---
-        if ch.raw_data is not None:
+        if ch.has_data:
             # Use low scale factor during active dragging for extreme speed
             scale = 0.1 if fast_preview else 0.25
-            preview_img = EnhanceProcessor.process_scientific_pipeline(ch.raw_data, raw_p, scale_factor=scale)
+            preview_src = ch.raw_data if ch.pyramid is None else ch.overview_data
+            if ch.pyramid is not None:
+                # Pyramids preview on the overview level; scale kernels to its resolution
+                scale = ch.overview_scale
+            preview_img = EnhanceProcessor.process_scientific_pipeline(preview_src, raw_p, scale_factor=scale)
             # FORCE update the histogram panel with BOTH raw and enhanced data
             self.histogram_panel.update_from_channel(enhanced_data=preview_img)
         
@@ -1,12 +1,15 @@
 import time
 from PySide6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QScrollArea, 
                                 QLabel, QFrame, QSizePolicy, QSplitter)
-from PySide6.QtCore import Qt, Signal, QRectF, QPointF
+from PySide6.QtCore import Qt, Signal, QRectF, QPointF, QTimer
 import numpy as np
 from typing import Dict, List
 
 from src.core.data_model import Session
 from src.core.renderer import Renderer
+from src.core.merge_accumulator import MergeAccumulator
+from src.core.render_cache import RenderCache, fit_target_shape, render_signature
+from src.core.render_scheduler import RenderScheduler
 from src.gui.canvas_view import CanvasView
 from src.gui.sync_manager import SyncManager
 from src.gui.empty_state import EmptyStateWidget
@@ -31,6 +34,11 @@ class FilmstripWidget(QWidget):
     open_recent_requested = Signal(str)
     import_folder_requested = Signal()
     import_merge_requested = Signal()
+    
+    # Idle time after the last adjustment before the main view preview is refined to full quality
+    REFINE_DELAY_MS = 300
+    MAIN_MAX_DIM = 2048
+    THUMB_TARGET_SHAPE = (256, 256) # Small enough for thumbnails
 
     def __init__(self, session: Session, parent=None):
         super().__init__(parent)
@@ -39,11 +47,29 @@ class FilmstripWidget(QWidget):
         self.main_view = None
         self.sync_manager = SyncManager()
         self._channel_images_cache = {}
+        self._thumb_images_cache = {}
+        # ("thumb"|"main", channel index) -> render signature of the cached image
+        self._rendered_signatures = {}
+        # Running sums of visible channel images for the merge (main view and thumbnail)
+        self._merge_accumulator = MergeAccumulator()
+        self._thumb_merge_accumulator = MergeAccumulator()
         self._last_original_shape = None
         self._last_target_shape = None
         self.active_channel_id = "Merge" # Default view in main view
         self.current_tool = None
         self.annotation_mode = 'none'
+        
+        # Preview renders (adjustment sliders) run off the GUI thread; only the latest frame is shown
+        self.render_scheduler = RenderScheduler(self)
+        self.render_scheduler.frame_ready.connect(self._on_preview_frame_ready)
+        
+        # Progressive refinement of the main view once adjustments pause
+        self._refine_target_shape = None
+        self._refine_generation = None
+        self._refine_timer = QTimer(self)
+        self._refine_timer.setSingleShot(True)
+        self._refine_timer.setInterval(self.REFINE_DELAY_MS)
+        self._refine_timer.timeout.connect(self._refine_preview)
 
         self.init_ui()
 
@@ -362,15 +388,23 @@ class FilmstripWidget(QWidget):
             self.scroll_area.ensureWidgetVisible(thumb)
 
     def render_all(self, preview=False):
-        """Renders all thumbnails and the main view."""
+        """
+        Renders all thumbnails and the main view.
+        With preview=True the renders run asynchronously on the render scheduler, only
+        channels whose render signature changed are re-rendered, and the main view starts at
+        the preview resolution and is refined once the adjustments pause.
+        """
+        self._refine_timer.stop()
+        if not preview:
+            self.render_scheduler.cancel()
         if not self.session.channels:
             return
 
         # Get target shape from the first valid channel
         h, w = 0, 0
         for ch in self.session.channels:
-            if ch.raw_data is not None:
-                h, w = ch.raw_data.shape[:2]
+            if ch.has_data:
+                h, w = ch.shape[:2]
                 break
         
         if h == 0 or w == 0:
@@ -379,50 +413,138 @@ class FilmstripWidget(QWidget):
         self._last_original_shape = (h, w)
         
         # Determine render quality for thumbnails (small)
-        thumb_target_shape = (256, 256) # Small enough for thumbnails
+        thumb_target_shape = self.THUMB_TARGET_SHAPE
         
         # Determine render quality for main view (large)
-        max_dim = 2048 
-        long_side = max(h, w)
-        if long_side > max_dim:
-            scale = float(max_dim) / long_side
-            main_target_shape = (int(h * scale), int(w * scale))
-        else:
-            main_target_shape = (h, w)
+        full_main_shape = fit_target_shape(h, w, self.MAIN_MAX_DIM)
+        main_target_shape = full_main_shape
+        skip_stages = ()
+        if preview:
+            from src.core.performance_monitor import PerformanceMonitor
+            monitor = PerformanceMonitor.instance()
+            main_target_shape = fit_target_shape(h, w, monitor.get_preview_limit(1024, max_limit=self.MAIN_MAX_DIM))
+            skip_stages = monitor.get_preview_skip_stages()
         
         self._last_target_shape = main_target_shape
-        self._channel_images_cache.clear()
 
-        # 1. Render thumbnails and cache images
+        shapes = {"thumb": thumb_target_shape, "main": main_target_shape}
+        if preview:
+            jobs, signatures = {}, {}
+            for i, ch in enumerate(self.session.channels):
+                if not ch.has_data:
+                    continue
+                for kind, shape in shapes.items():
+                    signature = render_signature(ch, shape, skip_stages)
+                    if self._rendered_signatures.get((kind, i)) == signature:
+                        continue # Cached image is still valid
+                    jobs[(kind, i)] = (ch, shape)
+                    signatures[(kind, i)] = signature
+            if jobs:
+                self.render_scheduler.submit(jobs, context=(w, h, thumb_target_shape, main_target_shape, signatures),
+                                             skip_stages=skip_stages)
+            else:
+                self.render_scheduler.cancel()
+            if full_main_shape != main_target_shape or skip_stages:
+                # Lower resolution or left-out stages: refine to the full render once idle
+                self._refine_target_shape = full_main_shape
+                self._refine_timer.start()
+            return
+
+        # 1. Render thumbnails (small) and main view images (higher res, cached for merge)
+        images, signatures = {}, {}
         for i, ch in enumerate(self.session.channels):
-            if ch.raw_data is not None:
-                # Render for thumbnail
-                thumb_img = Renderer.render_channel(ch, target_shape=thumb_target_shape)
-                
-                view_id = f"Ch{i+1}"
-                if view_id in self.views:
-                    display_img = thumb_img
-                    if thumb_img.dtype == np.float32 and thumb_img.max() <= 1.0:
-                        display_img = (thumb_img * 255).astype(np.uint8)
-                    view = self.views[view_id]
-                    view.update_image(display_img, scene_rect=QRectF(0.0, 0.0, float(w), float(h)))
-                    # Ensure thumbnail shows full image
-                    self.sync_manager.set_enabled(False)
-                    try:
-                        view.fitInView(view.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
-                    finally:
-                        self.sync_manager.set_enabled(True)
-                
-                # Render for main view (higher res) and cache for merge
-                main_img = Renderer.render_channel(ch, target_shape=main_target_shape)
-                self._channel_images_cache[i] = main_img
+            if ch.has_data:
+                for kind, shape in shapes.items():
+                    signatures[(kind, i)] = render_signature(ch, shape)
+                    images[(kind, i)] = RenderCache.instance().render(ch, shape)
+
+        self._apply_channel_images(images, w, h, thumb_target_shape, signatures, replace=True)
+
+    def _refine_preview(self):
+        """
+        Renders the main view images at full display resolution, and the thumbnails rendered
+        without some enhancement stages with all of them, in the background once the
+        adjustments have paused; a new adjustment supersedes it and restarts the idle timer.
+        """
+        if not self._last_original_shape:
+            return
+        if self.render_scheduler.is_pending():
+            # The low-resolution frame is not on screen yet: wait for it first
+            self._refine_timer.start()
+            return
+        h, w = self._last_original_shape
+        target_shape = self._refine_target_shape
+        jobs, signatures = {}, {}
+        for i, ch in enumerate(self.session.channels):
+            if not ch.has_data:
+                continue
+            for kind, shape in (("main", target_shape), ("thumb", self.THUMB_TARGET_SHAPE)):
+                signature = render_signature(ch, shape)
+                if kind == "thumb" and self._rendered_signatures.get((kind, i)) == signature:
+                    continue # Thumbnail is already the full render
+                jobs[(kind, i)] = (ch, shape)
+                signatures[(kind, i)] = signature
+        if jobs:
+            self._refine_generation = self.render_scheduler.submit(
+                jobs, context=(w, h, self.THUMB_TARGET_SHAPE, target_shape, signatures))
+
+    def _on_preview_frame_ready(self, generation, images, context):
+        """Shows the latest preview (or refined) frame finished by the render scheduler."""
+        w, h, thumb_target_shape, main_target_shape, signatures = context
+        self._last_target_shape = main_target_shape
+        t_upload = time.perf_counter()
+        try:
+            self._apply_channel_images(images, w, h, thumb_target_shape, signatures)
+        except Exception as e:
+            print(f"Error applying preview frame {generation}: {e}")
+        # Frame latency feeds the adaptive preview resolution (refined frames only its cost model)
+        from src.core.performance_monitor import PerformanceMonitor
+        timing = self.render_scheduler.last_frame_timing
+        PerformanceMonitor.instance().report_preview_frame(
+            main_target_shape or (h, w), timing['render_ms'], timing['stages'], (time.perf_counter() - t_upload) * 1000,
+            refined=generation == self._refine_generation)
+
+    def _apply_channel_images(self, images, w, h, thumb_target_shape, signatures, replace=False):
+        """
+        Stores rendered {("thumb"|"main", index): image} entries (all channels if replace=True,
+        otherwise only re-rendered ones), updates their thumbnails, the merge thumbnail and the main view.
+        """
+        if replace:
+            self._channel_images_cache.clear()
+            self._thumb_images_cache.clear()
+            self._rendered_signatures.clear()
+        self._rendered_signatures.update(signatures)
+        for (kind, i), img in images.items():
+            if kind == "main":
+                self._channel_images_cache[i] = img
+                continue
+            
+            self._thumb_images_cache[i] = img
+            view_id = f"Ch{i+1}"
+            if img is not None and view_id in self.views:
+                display_img = img
+                if img.dtype == np.float32 and img.max() <= 1.0:
+                    display_img = (img * 255).astype(np.uint8)
+                view = self.views[view_id]
+                view.update_image(display_img, scene_rect=QRectF(0.0, 0.0, float(w), float(h)))
+                # Ensure thumbnail shows full image
+                self.sync_manager.set_enabled(False)
+                try:
+                    view.fitInView(view.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+                finally:
+                    self.sync_manager.set_enabled(True)
 
         # 2. Update Merge Thumbnail
-        self._update_merge_thumbnail(w, h, thumb_target_shape)
+        self._update_merge_thumbnail(w, h, thumb_target_shape, self._thumb_images_cache)
         
         # 3. Update Main View
         self.render_main_view()
 
+    def _visible_layers(self, images):
+        """{index: image} of visible channels that have a rendered image."""
+        return {i: images[i] for i, ch in enumerate(self.session.channels)
+                if getattr(ch.display_settings, 'visible', True) and images.get(i) is not None}
+
     def render_main_view(self):
         """Updates the image in the main view based on current active_channel_id."""
         if not self.main_view or not self._last_original_shape:
@@ -431,19 +553,9 @@ class FilmstripWidget(QWidget):
         h, w = self._last_original_shape
         
         if self.active_channel_id == "Merge":
-            # Composite from cache
-            composite = None
-            for i, ch in enumerate(self.session.channels):
-                if getattr(ch.display_settings, 'visible', True) and i in self._channel_images_cache:
-                    img = self._channel_images_cache[i]
-                    if composite is None:
-                        composite = img.astype(np.float32)
-                    else:
-                        composite += img.astype(np.float32)
-            
-            if composite is not None:
-                np.clip(composite, 0.0, 1.0, out=composite)
-                composite = (composite * 255).astype(np.uint8)
+            # Composite from cache (incrementally, only changed layers are subtracted/added)
+            if self._merge_accumulator.update(self._visible_layers(self._channel_images_cache)) is not None:
+                composite = self._merge_accumulator.to_uint8()
                 self.main_view.update_image(composite, scene_rect=QRectF(0, 0, w, h))
             else:
                 th, tw = self._last_target_shape if self._last_target_shape else (h, w)
@@ -458,7 +570,13 @@ class FilmstripWidget(QWidget):
                     display_img = img
                     if img.dtype == np.float32 and img.max() <= 1.0:
                         display_img = (img * 255).astype(np.uint8)
-                    self.main_view.update_image(display_img, scene_rect=QRectF(0, 0, w, h))
+                    # Indexed single-channel image: colour/gamma changes only swap the view's colour table
+                    indexed = None
+                    ch = self.session.channels[ch_idx]
+                    signature = self._rendered_signatures.get(("main", ch_idx))
+                    if signature is not None and signature == render_signature(ch, self._last_target_shape):
+                        indexed = Renderer.indexed_display(ch, self._last_target_shape)
+                    self.main_view.update_image(display_img, scene_rect=QRectF(0, 0, w, h), indexed=indexed)
             except (ValueError, IndexError):
                 pass
 
@@ -580,24 +698,13 @@ class FilmstripWidget(QWidget):
         for thumb in self.views.values():
             thumb._on_roi_updated(roi_or_id)
 
-    def _update_merge_thumbnail(self, w, h, target_shape):
+    def _update_merge_thumbnail(self, w, h, target_shape, thumbs):
         if "Merge" not in self.views:
             return
 
-        # Simple merge for thumbnail (could be optimized)
-        composite = None
-        for i, ch in enumerate(self.session.channels):
-            if getattr(ch.display_settings, 'visible', True) and ch.raw_data is not None:
-                # Re-render at thumbnail size for the merge thumb
-                img = Renderer.render_channel(ch, target_shape=target_shape)
-                if composite is None:
-                    composite = img.astype(np.float32)
-                else:
-                    composite += img.astype(np.float32)
-        
-        if composite is not None:
-            np.clip(composite, 0.0, 1.0, out=composite)
-            composite = (composite * 255).astype(np.uint8)
+        # Merge of the already rendered channel thumbnails
+        if self._thumb_merge_accumulator.update(self._visible_layers(thumbs)) is not None:
+            composite = self._thumb_merge_accumulator.to_uint8()
             view = self.views["Merge"]
             view.update_image(composite, scene_rect=QRectF(0.0, 0.0, float(w), float(h)))
             
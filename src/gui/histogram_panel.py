@@ -188,16 +188,22 @@ class HistogramPanel(QWidget):
         self.histogram.blockSignals(False)
 
     def calculate_histogram(self, channel: ImageChannel, enhanced_data: np.ndarray = None):
-        if not channel or channel.raw_data is None:
+        if not channel or not channel.has_data:
             self.histogram.set_data(None)
             return
         
-        raw_data = channel.raw_data
-        effective_max = max(int(raw_data.max()), 255)
+        # Overview level for pyramids (identical to raw_data for flat images)
+        raw_data = channel.overview_data
+        stats = channel.get_stats()
+        effective_max = max(int(stats.max), 255)
         self.histogram.set_range_max(effective_max)
         
-        # 1. Process Raw Data for Histogram (Use mapping-aware extraction)
-        raw_hist = self._get_hist_for_data(raw_data, effective_max, channel_name=channel.name)
+        # 1. Raw histogram: rebinned from the cached exact histogram for single-channel integer data,
+        #    otherwise computed with mapping-aware extraction
+        if stats.is_exact and raw_data.ndim == 2:
+            raw_hist = stats.histogram(256, effective_max)
+        else:
+            raw_hist = self._get_hist_for_data(raw_data, effective_max, channel_name=channel.name)
         
         # 2. Process Enhanced Data if provided
         enhanced_hist = None
@@ -248,20 +254,25 @@ class HistogramPanel(QWidget):
     def apply_auto_contrast(self):
         ch = self.session.get_channel(self.active_channel_index)
         if not ch: return
-        data = ch.cached_processed_data if hasattr(ch, 'cached_processed_data') and ch.cached_processed_data is not None else ch.raw_data
-        if data is None: return
-            
-        if data.size > 1000000:
-            step = int(data.size / 1000000)
-            sample = data.ravel()[::step]
+        processed = getattr(ch, 'cached_processed_data', None)
+        if processed is None:
+            if not ch.has_data: return
+            stats = ch.get_stats()
+            low = stats.percentile(0.1)
+            high = stats.percentile(99.9)
         else:
-            sample = data
-        try:
-            low = np.percentile(sample, 0.1)
-            high = np.percentile(sample, 99.9)
-        except:
-            low = np.min(sample)
-            high = np.max(sample)
+            data = processed
+            if data.size > 1000000:
+                step = int(data.size / 1000000)
+                sample = data.ravel()[::step]
+            else:
+                sample = data
+            try:
+                low = np.percentile(sample, 0.1)
+                high = np.percentile(sample, 99.9)
+            except:
+                low = np.min(sample)
+                high = np.max(sample)
             
         if high <= low: high = low + 1
         
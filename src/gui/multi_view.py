@@ -10,6 +10,9 @@ from typing import Dict
 
 from src.core.data_model import Session
 from src.core.renderer import Renderer
+from src.core.merge_accumulator import MergeAccumulator
+from src.core.render_cache import RenderCache, fit_target_shape, render_signature
+from src.core.render_scheduler import RenderScheduler
 from src.core.logger import Logger
 from src.gui.canvas_view import CanvasView
 from src.gui.sync_manager import SyncManager
@@ -35,6 +38,9 @@ class MultiViewWidget(QWidget):
     open_recent_requested = Signal(str)
     import_folder_requested = Signal()
     import_merge_requested = Signal()
+    
+    # Idle time after the last adjustment before the preview is refined to full quality
+    REFINE_DELAY_MS = 300
 
     def __init__(self, session: Session, parent=None):
         super().__init__(parent)
@@ -44,9 +50,28 @@ class MultiViewWidget(QWidget):
         
         # Cache for rendered channel images to speed up compositing and targeted updates
         self._channel_images_cache = {}
+        # channel index -> render_signature() of the cached image
+        self._rendered_signatures = {}
+        # Running sum of visible channel images for the Merge view
+        self._merge_accumulator = MergeAccumulator()
         self._last_target_shape = None
         self._last_original_shape = None
         
+        # Preview renders (adjustment sliders) run off the GUI thread; only the latest frame is shown
+        self.render_scheduler = RenderScheduler(self)
+        self.render_scheduler.frame_ready.connect(self._on_preview_frame_ready)
+        
+        # Progressive refinement: once adjustments pause, the low-resolution preview is
+        # re-rendered in the background at the resolution of the display quality setting
+        self._refine_target_shape = None
+        self._refine_generation = None
+        # Refinement put off while every view shows full-resolution tiles (see _refine_preview)
+        self._refine_deferred = False
+        self._refine_timer = QTimer(self)
+        self._refine_timer.setSingleShot(True)
+        self._refine_timer.setInterval(self.REFINE_DELAY_MS)
+        self._refine_timer.timeout.connect(self._refine_preview)
+        
         # Store views: "Merge", "Ch1", "Ch2", ...
         self.views: Dict[str, CanvasView] = {}
         self.active_channel_id = "Merge" 
@@ -241,6 +266,10 @@ class MultiViewWidget(QWidget):
         """Relay zoom change from a view."""
         # Assuming uniform scaling, use scale_x
         self.zoom_changed.emit(scale_x)
+        if self._refine_deferred and not self._detail_layers_cover_views():
+            # Zoomed out to where the overview pixmap shows: its full-frame refinement is due now
+            self._refine_deferred = False
+            self._refine_timer.start()
 
     def on_scale_bar_moved(self, pos: QPointF):
         """Sync scale bar position across all views."""
@@ -306,9 +335,19 @@ class MultiViewWidget(QWidget):
             Logger.debug(f"[MultiView] fit_views finished, sync re-enabled")
 
     def render_all(self, preview=False):
-        """Renders content for all views. If preview=True, downsamples for performance."""
+        """
+        Renders content for all views. If preview=True, downsamples for performance and
+        renders asynchronously on the render scheduler (superseding any preview in flight);
+        only channels whose render signature changed are re-rendered, then the Merge view.
+        """
         Logger.debug(f"[MultiView] render_all(preview={preview}) started")
         t_render_start = time.time()
+        # Every render restarts the idle period before refinement (or makes it unnecessary)
+        self._refine_timer.stop()
+        self._refine_deferred = False
+        if not preview:
+            # A synchronous render supersedes any preview frame (or refinement) still in flight
+            self.render_scheduler.cancel()
         
         # Disable sync during bulk update to prevent coordinate jumping
         self.sync_manager.set_enabled(False)
@@ -317,15 +356,17 @@ class MultiViewWidget(QWidget):
             # 1. Determine Original Shape (for Scene Rect)
             original_shape = None
             for ch in self.session.channels:
-                 if not getattr(ch, 'is_placeholder', False) and ch.raw_data is not None:
+                 if not getattr(ch, 'is_placeholder', False) and ch.has_data:
                       original_shape = ch.shape # (H, W)
                       break
             
             if original_shape is None:
                  # No valid data to render
+                 self.render_scheduler.cancel()
                  for view in self.views.values():
                       view.update_image(None)
                  self._channel_images_cache.clear()
+                 self._rendered_signatures.clear()
                  return
 
             self._last_original_shape = original_shape
@@ -350,40 +391,50 @@ class MultiViewWidget(QWidget):
                  else:
                      max_dim = 2560
                  
+            full_target_shape = fit_target_shape(h, w, max_dim)
+            skip_stages = ()
             if preview:
-                 # Force smaller preview regardless of setting
+                 # Force smaller preview regardless of setting (adaptive in auto mode, up to the display resolution)
                  from src.core.performance_monitor import PerformanceMonitor
-                 max_dim = PerformanceMonitor.instance().get_preview_limit(min(max_dim, 1024))
+                 monitor = PerformanceMonitor.instance()
+                 max_dim = monitor.get_preview_limit(min(max_dim, 1024), max_limit=max_dim)
+                 skip_stages = monitor.get_preview_skip_stages()
                  
-            long_side = max(h, w)
-            if long_side > max_dim:
-                 scale = float(max_dim) / long_side
-                 new_h = int(h * scale)
-                 new_w = int(w * scale)
-                 target_shape = (new_h, new_w)
+            target_shape = fit_target_shape(h, w, max_dim)
             
             self._last_target_shape = target_shape
             
             # 2. Render each channel's display image (Raw -> RGB)
-            self._channel_images_cache.clear()
+            if preview:
+                jobs, signatures = {}, {}
+                for i, ch in enumerate(self.session.channels):
+                    if not ch.has_data:
+                        continue
+                    signature = render_signature(ch, target_shape, skip_stages)
+                    if i in self._channel_images_cache and self._rendered_signatures.get(i) == signature:
+                        continue # Cached image is still valid
+                    jobs[i] = (ch, target_shape)
+                    signatures[i] = signature
+                if jobs:
+                    self.render_scheduler.submit(jobs, context=(w, h, target_shape, signatures), skip_stages=skip_stages)
+                else:
+                    # Settings are back to what is on screen: drop any frame in flight
+                    self.render_scheduler.cancel()
+                if full_target_shape != target_shape or skip_stages:
+                    # Lower resolution or left-out stages: refine to the full render once idle
+                    self._refine_target_shape = full_target_shape
+                    self._refine_timer.start()
+                return
+            
+            images, signatures = {}, {}
             for i, ch in enumerate(self.session.channels):
                 # Always render if we have data, even if hidden (for Merge)
-                if ch.raw_data is not None:
-                    img = Renderer.render_channel(ch, target_shape=target_shape)
-                    self._channel_images_cache[i] = img
+                if ch.has_data:
+                    signatures[i] = render_signature(ch, target_shape)
+                    images[i] = RenderCache.instance().render(ch, target_shape)
             
-            # 3. Update Channel Views
-            for i, img in self._channel_images_cache.items():
-                view_id = f"Ch{i+1}"
-                if view_id in self.views:
-                    display_img = img
-                    if img.dtype == np.float32 and img.max() <= 1.0:
-                         display_img = (img * 255).astype(np.uint8)
-                    
-                    self.views[view_id].update_image(display_img, scene_rect=QRectF(0.0, 0.0, float(w), float(h)))
-
-            # 4. Update Merge View
-            self._update_merge_view(w, h, target_shape)
+            # 3. Update Channel and Merge Views
+            self._apply_channel_images(images, w, h, target_shape, signatures, replace=True)
 
         except Exception as e:
             print(f"Error in render_all: {e}")
@@ -394,6 +445,91 @@ class MultiViewWidget(QWidget):
             self.sync_manager.set_enabled(True)
             print(f"[MultiView] render_all finished ({time.time() - t_render_start:.4f}s)")
 
+    def _refine_preview(self):
+        """
+        Renders the channels at the display quality resolution, with all enhancement stages,
+        in the background once the adjustments have paused. A new adjustment supersedes it (render scheduler generation)
+        and restarts the idle timer.
+        """
+        if self._last_original_shape is None or not self.session.channels:
+            return
+        if self.render_scheduler.is_pending():
+            # The low-resolution frame is not on screen yet: wait for it first
+            self._refine_timer.start()
+            return
+        if self._detail_layers_cover_views():
+            # Zoomed in: the views draw the enhanced viewport from full-resolution tiles, so the
+            # full frame is only rendered once a view zooms out (exports render their own)
+            self._refine_deferred = True
+            return
+        h, w = self._last_original_shape
+        target_shape = self._refine_target_shape
+        jobs, signatures = {}, {}
+        for i, ch in enumerate(self.session.channels):
+            if ch.has_data:
+                jobs[i] = (ch, target_shape)
+                signatures[i] = render_signature(ch, target_shape)
+        if jobs:
+            Logger.debug(f"[MultiView] Refining preview to {target_shape}")
+            self._refine_generation = self.render_scheduler.submit(jobs, context=(w, h, target_shape, signatures))
+
+    def _detail_layers_cover_views(self) -> bool:
+        views = [view for view in self.views.values() if view.isVisible()]
+        return bool(views) and all(view.detail_layer_active() for view in views)
+
+    def _on_preview_frame_ready(self, generation, images, context):
+        """Shows the latest preview (or refined) frame finished by the render scheduler."""
+        w, h, target_shape, signatures = context
+        self._last_target_shape = target_shape
+        self.sync_manager.set_enabled(False)
+        t_upload = time.perf_counter()
+        try:
+            self._apply_channel_images(images, w, h, target_shape, signatures)
+        except Exception as e:
+            print(f"Error applying preview frame {generation}: {e}")
+        finally:
+            self.sync_manager.set_enabled(True)
+        # Frame latency feeds the adaptive preview resolution (refined frames only its cost model)
+        from src.core.performance_monitor import PerformanceMonitor
+        timing = self.render_scheduler.last_frame_timing
+        PerformanceMonitor.instance().report_preview_frame(
+            target_shape or (h, w), timing['render_ms'], timing['stages'], (time.perf_counter() - t_upload) * 1000,
+            refined=generation == self._refine_generation)
+
+    def _apply_channel_images(self, images, w, h, target_shape, signatures, replace=False):
+        """
+        Stores rendered channel images (all channels if replace=True, otherwise only the
+        re-rendered ones), updates their views and re-composites the Merge view.
+        """
+        if replace:
+            self._channel_images_cache.clear()
+            self._rendered_signatures.clear()
+        self._channel_images_cache.update(images)
+        self._rendered_signatures.update(signatures)
+        for i, img in images.items():
+            view_id = f"Ch{i+1}"
+            if img is not None and view_id in self.views:
+                display_img = img
+                if img.dtype == np.float32 and img.max() <= 1.0:
+                     display_img = (img * 255).astype(np.uint8)
+                
+                self.views[view_id].update_image(display_img, scene_rect=QRectF(0.0, 0.0, float(w), float(h)),
+                                                 indexed=self._indexed_display(i, target_shape, signatures.get(i)))
+
+        self._update_merge_view(w, h, target_shape)
+
+    def _indexed_display(self, channel_index, target_shape, signature):
+        """
+        (indices, palette) behind a channel image rendered with `signature`, if it went through
+        the indexed path and the channel has not changed since; lets the view swap only its colour table.
+        """
+        if channel_index >= len(self.session.channels):
+            return None
+        ch = self.session.channels[channel_index]
+        if signature != render_signature(ch, target_shape):
+            return None
+        return Renderer.indexed_display(ch, target_shape)
+
     def render_single_channel(self, channel_index, preview=False):
         """
         Optimized: Renders only one channel and updates Merge view.
@@ -405,8 +541,9 @@ class MultiViewWidget(QWidget):
         t_start = time.time()
         ch = self.session.channels[channel_index]
         
-        # If we don't have baseline info, do a full render
-        if self._last_original_shape is None:
+        # If we don't have baseline info, do a full render.
+        # Same while a preview frame is in flight: the cached images of the other channels are outdated.
+        if self._last_original_shape is None or self.render_scheduler.is_pending():
             self.render_all(preview=preview)
             return
 
@@ -418,8 +555,9 @@ class MultiViewWidget(QWidget):
         
         try:
             # 1. Render just this channel
-            if ch.raw_data is not None:
-                img = Renderer.render_channel(ch, target_shape=target_shape)
+            if ch.has_data:
+                self._rendered_signatures[channel_index] = render_signature(ch, target_shape)
+                img = RenderCache.instance().render(ch, target_shape)
                 self._channel_images_cache[channel_index] = img
                 
                 # 2. Update specific view
@@ -428,7 +566,8 @@ class MultiViewWidget(QWidget):
                     display_img = img
                     if img.dtype == np.float32 and img.max() <= 1.0:
                          display_img = (img * 255).astype(np.uint8)
-                    self.views[view_id].update_image(display_img, scene_rect=QRectF(0.0, 0.0, float(w), float(h)))
+                    self.views[view_id].update_image(display_img, scene_rect=QRectF(0.0, 0.0, float(w), float(h)),
+                                                     indexed=Renderer.indexed_display(ch, target_shape))
 
             # 3. Update Merge View
             self._update_merge_view(w, h, target_shape)
@@ -446,23 +585,20 @@ class MultiViewWidget(QWidget):
             return
 
         if not self._channel_images_cache:
+            self._merge_accumulator.reset()
             self.views["Merge"].update_image(None)
             return
 
-        composite = None
+        # Only layers that changed since the last update are subtracted/added
+        layers = {}
         for i, ch in enumerate(self.session.channels):
             is_visible = getattr(ch.display_settings, 'visible', True)
-            
-            if is_visible and i in self._channel_images_cache:
-                img = self._channel_images_cache[i]
-                if composite is None:
-                    composite = img.astype(np.float32)
-                else:
-                    composite += img.astype(np.float32)
+            img = self._channel_images_cache.get(i)
+            if is_visible and img is not None:
+                layers[i] = img
         
-        if composite is not None:
-            np.clip(composite, 0.0, 1.0, out=composite)
-            composite = (composite * 255).astype(np.uint8)
+        if self._merge_accumulator.update(layers) is not None:
+            composite = self._merge_accumulator.to_uint8()
             self.views["Merge"].update_image(composite, scene_rect=QRectF(0.0, 0.0, float(w), float(h)))
         else:
             # Black if all hidden
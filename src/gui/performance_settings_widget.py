@@ -1,9 +1,13 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QDoubleSpinBox, 
-                               QGroupBox, QSizePolicy)
+                               QSpinBox, QGroupBox, QSizePolicy)
 from PySide6.QtCore import QSettings
 from src.gui.toggle_switch import ToggleSwitch
 from src.core.language_manager import tr, LanguageManager
 from src.gui.theme_manager import ThemeManager
+from src.core.cache_manager import SceneCacheManager
+from src.core.spill_cache import EvictedChannelStore
+from src.core.render_cache import EnhanceStageCache, RenderCache
+from src.core.performance_monitor import PerformanceMonitor
 
 class PerformanceSettingsWidget(QWidget):
     """
@@ -60,8 +64,114 @@ class PerformanceSettingsWidget(QWidget):
         
         layout.addWidget(self.memory_group)
         
-        # 2. Cache Info (Optional future enhancement)
-        # We could add a "Clear Cache Now" button here
+        # 2. Scene Cache Budget
+        self.cache_group = QGroupBox(tr("Sample Cache"))
+        cache_layout = QVBoxLayout(self.cache_group)
+        
+        h_budget = QHBoxLayout()
+        self.lbl_cache_budget = QLabel(tr("Cache Budget (MB):"))
+        h_budget.addWidget(self.lbl_cache_budget)
+        self.spin_cache_budget = QSpinBox()
+        self.spin_cache_budget.setRange(SceneCacheManager.MIN_BUDGET_MB, 256 * 1024)
+        self.spin_cache_budget.setSingleStep(256)
+        self.spin_cache_budget.setSuffix(" MB")
+        h_budget.addWidget(self.spin_cache_budget)
+        cache_layout.addLayout(h_budget)
+        
+        self.lbl_cache_info = QLabel(tr("Least recently viewed samples are released when cached images exceed this size (Aggressive Pre-cache keeps all samples until memory runs low)."))
+        self.lbl_cache_info.setWordWrap(True)
+        self.lbl_cache_info.setStyleSheet("font-style: italic; color: gray; font-size: 10px;")
+        cache_layout.addWidget(self.lbl_cache_info)
+        
+        self.lbl_cache_usage = QLabel()
+        cache_layout.addWidget(self.lbl_cache_usage)
+        
+        h_render_budget = QHBoxLayout()
+        self.lbl_render_cache = QLabel(tr("Rendered Image Cache (MB):"))
+        h_render_budget.addWidget(self.lbl_render_cache)
+        self.spin_render_cache = QSpinBox()
+        self.spin_render_cache.setRange(0, 16 * 1024)
+        self.spin_render_cache.setSingleStep(64)
+        self.spin_render_cache.setSuffix(" MB")
+        h_render_budget.addWidget(self.spin_render_cache)
+        cache_layout.addLayout(h_render_budget)
+        
+        self.lbl_render_cache_info = QLabel(tr("Display renders shared by all view modes, so switching views or settings back does not render again. 0 disables it."))
+        self.lbl_render_cache_info.setWordWrap(True)
+        self.lbl_render_cache_info.setStyleSheet("font-style: italic; color: gray; font-size: 10px;")
+        cache_layout.addWidget(self.lbl_render_cache_info)
+        
+        h_enhance_budget = QHBoxLayout()
+        self.lbl_enhance_cache = QLabel(tr("Enhancement Step Cache (MB):"))
+        h_enhance_budget.addWidget(self.lbl_enhance_cache)
+        self.spin_enhance_cache = QSpinBox()
+        self.spin_enhance_cache.setRange(0, 16 * 1024)
+        self.spin_enhance_cache.setSingleStep(64)
+        self.spin_enhance_cache.setSuffix(" MB")
+        h_enhance_budget.addWidget(self.spin_enhance_cache)
+        cache_layout.addLayout(h_enhance_budget)
+        
+        self.lbl_enhance_cache_info = QLabel(tr("Results of each enhancement step, so changing a later step (stretch, gamma) does not repeat the earlier ones. 0 disables it."))
+        self.lbl_enhance_cache_info.setWordWrap(True)
+        self.lbl_enhance_cache_info.setStyleSheet("font-style: italic; color: gray; font-size: 10px;")
+        cache_layout.addWidget(self.lbl_enhance_cache_info)
+        
+        layout.addWidget(self.cache_group)
+        
+        # 3. Evicted Sample Storage (second cache tier)
+        self.spill_group = QGroupBox(tr("Evicted Sample Storage"))
+        spill_layout = QVBoxLayout(self.spill_group)
+        
+        h_spill_mem = QHBoxLayout()
+        self.lbl_spill_memory = QLabel(tr("Compressed in Memory (MB):"))
+        h_spill_mem.addWidget(self.lbl_spill_memory)
+        self.spin_spill_memory = QSpinBox()
+        self.spin_spill_memory.setRange(0, 64 * 1024)
+        self.spin_spill_memory.setSingleStep(128)
+        self.spin_spill_memory.setSuffix(" MB")
+        h_spill_mem.addWidget(self.spin_spill_memory)
+        spill_layout.addLayout(h_spill_mem)
+        
+        h_spill_disk = QHBoxLayout()
+        self.lbl_spill_disk = QLabel(tr("Temporary Disk Space (MB):"))
+        h_spill_disk.addWidget(self.lbl_spill_disk)
+        self.spin_spill_disk = QSpinBox()
+        self.spin_spill_disk.setRange(0, 1024 * 1024)
+        self.spin_spill_disk.setSingleStep(1024)
+        self.spin_spill_disk.setSuffix(" MB")
+        h_spill_disk.addWidget(self.spin_spill_disk)
+        spill_layout.addLayout(h_spill_disk)
+        
+        self.lbl_spill_info = QLabel(tr("Samples released from the cache are kept compressed or in temporary files so they reopen without decoding. 0 disables a tier."))
+        self.lbl_spill_info.setWordWrap(True)
+        self.lbl_spill_info.setStyleSheet("font-style: italic; color: gray; font-size: 10px;")
+        spill_layout.addWidget(self.lbl_spill_info)
+        
+        layout.addWidget(self.spill_group)
+        
+        # 4. Adaptive Preview (adjustment previews in auto interaction mode)
+        self.preview_group = QGroupBox(tr("Adjustment Preview"))
+        preview_layout = QVBoxLayout(self.preview_group)
+        
+        h_frame_budget = QHBoxLayout()
+        self.lbl_frame_budget = QLabel(tr("Target Frame Time (ms):"))
+        h_frame_budget.addWidget(self.lbl_frame_budget)
+        self.spin_frame_budget = QSpinBox()
+        self.spin_frame_budget.setRange(8, 500)
+        self.spin_frame_budget.setSingleStep(5)
+        self.spin_frame_budget.setSuffix(" ms")
+        h_frame_budget.addWidget(self.spin_frame_budget)
+        preview_layout.addLayout(h_frame_budget)
+        
+        self.lbl_frame_budget_info = QLabel(tr("Preview resolution follows the measured render time so slider previews stay within this time; costly enhancement steps are left out of previews only if needed."))
+        self.lbl_frame_budget_info.setWordWrap(True)
+        self.lbl_frame_budget_info.setStyleSheet("font-style: italic; color: gray; font-size: 10px;")
+        preview_layout.addWidget(self.lbl_frame_budget_info)
+        
+        self.lbl_preview_status = QLabel()
+        preview_layout.addWidget(self.lbl_preview_status)
+        
+        layout.addWidget(self.preview_group)
         
         layout.addStretch()
 
@@ -71,6 +181,38 @@ class PerformanceSettingsWidget(QWidget):
         self.lbl_auto_info.setText(tr("Automatically clears image caches when memory usage is high."))
         self.lbl_threshold.setText(tr("Memory Threshold (GB):"))
         self.lbl_thresh_info.setText(tr("Cleanup will trigger when application memory exceeds this value."))
+        self.cache_group.setTitle(tr("Sample Cache"))
+        self.lbl_cache_budget.setText(tr("Cache Budget (MB):"))
+        self.lbl_cache_info.setText(tr("Least recently viewed samples are released when cached images exceed this size (Aggressive Pre-cache keeps all samples until memory runs low)."))
+        self.lbl_render_cache.setText(tr("Rendered Image Cache (MB):"))
+        self.lbl_render_cache_info.setText(tr("Display renders shared by all view modes, so switching views or settings back does not render again. 0 disables it."))
+        self.lbl_enhance_cache.setText(tr("Enhancement Step Cache (MB):"))
+        self.lbl_enhance_cache_info.setText(tr("Results of each enhancement step, so changing a later step (stretch, gamma) does not repeat the earlier ones. 0 disables it."))
+        self.spill_group.setTitle(tr("Evicted Sample Storage"))
+        self.lbl_spill_memory.setText(tr("Compressed in Memory (MB):"))
+        self.lbl_spill_disk.setText(tr("Temporary Disk Space (MB):"))
+        self.lbl_spill_info.setText(tr("Samples released from the cache are kept compressed or in temporary files so they reopen without decoding. 0 disables a tier."))
+        self.preview_group.setTitle(tr("Adjustment Preview"))
+        self.lbl_frame_budget.setText(tr("Target Frame Time (ms):"))
+        self.lbl_frame_budget_info.setText(tr("Preview resolution follows the measured render time so slider previews stay within this time; costly enhancement steps are left out of previews only if needed."))
+        self._update_cache_usage()
+        self._update_preview_status()
+
+    def _update_cache_usage(self):
+        stats = SceneCacheManager.instance().get_stats()
+        self.lbl_cache_usage.setText(
+            tr("In use: {0:.0f} MB in {1} samples").format(stats["bytes"] / (1024 * 1024), stats["scenes"])
+        )
+
+    def _update_preview_status(self):
+        telemetry = PerformanceMonitor.instance().get_preview_telemetry()
+        last_frame = telemetry['last_frame']
+        if last_frame is None:
+            self.lbl_preview_status.setText(tr("No preview frames measured yet."))
+            return
+        self.lbl_preview_status.setText(
+            tr("Preview limit: {0} px, last frame {1:.0f} ms").format(telemetry['preview_limit'], last_frame['total_ms'])
+        )
 
     def load_settings(self):
         # Match keys used in PerformanceMonitor
@@ -86,6 +228,18 @@ class PerformanceSettingsWidget(QWidget):
         self.chk_auto_cleanup.setChecked(enabled)
         self.spin_threshold.setValue(threshold)
         self.spin_threshold.setEnabled(enabled)
+        
+        self.spin_cache_budget.setValue(SceneCacheManager.instance().get_budget_mb())
+        self.spin_render_cache.setValue(RenderCache.instance().get_budget_mb())
+        self.spin_enhance_cache.setValue(EnhanceStageCache.instance().get_budget_mb())
+        self._update_cache_usage()
+        
+        store = EvictedChannelStore.instance()
+        self.spin_spill_memory.setValue(store.get_memory_budget_mb())
+        self.spin_spill_disk.setValue(store.get_disk_budget_mb())
+        
+        self.spin_frame_budget.setValue(int(round(PerformanceMonitor.instance().get_preview_budget_ms())))
+        self._update_preview_status()
 
     def save_settings(self):
         enabled = self.chk_auto_cleanup.isChecked()
@@ -94,6 +248,13 @@ class PerformanceSettingsWidget(QWidget):
         self.settings.setValue("performance/auto_cleanup", enabled)
         self.settings.setValue("performance/memory_threshold_gb", threshold)
         
+        # The cache manager persists the budget and evicts immediately if it shrank
+        SceneCacheManager.instance().set_budget_mb(self.spin_cache_budget.value())
+        EvictedChannelStore.instance().set_budgets_mb(self.spin_spill_memory.value(), self.spin_spill_disk.value())
+        RenderCache.instance().set_budget_mb(self.spin_render_cache.value())
+        EnhanceStageCache.instance().set_budget_mb(self.spin_enhance_cache.value())
+        PerformanceMonitor.instance().set_preview_budget_ms(self.spin_frame_budget.value())
+        
         # Update PerformanceMonitor if it's running
         from PySide6.QtWidgets import QApplication
         for widget in QApplication.topLevelWidgets():
@@ -103,5 +264,11 @@ class PerformanceSettingsWidget(QWidget):
     def get_current_values(self):
         return {
             'auto_cleanup': self.chk_auto_cleanup.isChecked(),
-            'threshold_gb': self.spin_threshold.value()
+            'threshold_gb': self.spin_threshold.value(),
+            'cache_budget_mb': self.spin_cache_budget.value(),
+            'evicted_memory_mb': self.spin_spill_memory.value(),
+            'evicted_disk_mb': self.spin_spill_disk.value(),
+            'render_cache_mb': self.spin_render_cache.value(),
+            'enhance_cache_mb': self.spin_enhance_cache.value(),
+            'preview_frame_budget_ms': self.spin_frame_budget.value()
         }
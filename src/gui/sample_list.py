@@ -18,6 +18,9 @@ import numpy as np
 import uuid
 from src.core.project_model import ProjectModel, SceneData, ChannelDef
 from src.core.channel_config import get_rgb_mapping
+from src.core.thumbnail_service import ThumbnailService
+from src.core.file_probe import probe_file
+from src.core.workers import FolderScanWorker
 from PySide6.QtGui import QUndoCommand
 import cv2
 
@@ -103,10 +106,7 @@ class ConvertFileToSampleCommand(QUndoCommand):
         # We should probably stick to that convention or use UUID if we want.
         # But wait, _add_manual_scene_internal: new_scene = SceneData(id=name, name=name)
         
-        self.model.scenes.append(self.added_scene)
-        self.model._scene_map[self.added_scene.id] = self.added_scene
-        self.model.is_dirty = True
-        self.model.project_changed.emit()
+        self.model._insert_scene_internal(len(self.model.scenes), self.added_scene)
 
     def undo(self):
         if self.added_scene:
@@ -131,8 +131,11 @@ class FileListWidget(QListWidget):
         super().__init__(parent)
         self.setMouseTracking(True)
         self._preview_popup = PreviewPopup(self)
-        self._preview_cache = {} # path -> QPixmap
         self._current_hover_item = None
+        self._hover_path = None
+        self._hover_pos = None
+        # Thumbnails are decoded off the GUI thread and cached on disk/in memory by the service
+        ThumbnailService.instance().thumbnail_ready.connect(self._on_thumbnail_ready)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Delete:
@@ -164,6 +167,7 @@ class FileListWidget(QListWidget):
             else:
                 self._preview_popup.hide()
         elif item:
+            self._hover_pos = event.globalPosition().toPoint()
             # Move popup with mouse? Or keep it fixed?
             # Moving it avoids covering the list if user moves down.
             # But let's just update position if it's visible.
@@ -173,6 +177,7 @@ class FileListWidget(QListWidget):
     def leaveEvent(self, event):
         self._preview_popup.hide()
         self._current_hover_item = None
+        self._hover_path = None
         super().leaveEvent(event)
 
     def _update_popup_pos(self, global_pos):
@@ -184,134 +189,30 @@ class FileListWidget(QListWidget):
     def _show_preview(self, item, global_pos):
         path = item.data(Qt.ItemDataRole.UserRole)
         if not path or not os.path.exists(path):
+            self._hover_path = None
             self._preview_popup.hide()
             return
 
-        if path in self._preview_cache:
-            pixmap = self._preview_cache[path]
-        else:
-            pixmap = self._load_thumbnail(path)
-            if pixmap:
-                self._preview_cache[path] = pixmap
-        
-        if pixmap:
-            self._preview_popup.setPixmap(pixmap)
-            self._update_popup_pos(global_pos)
-            self._preview_popup.show()
+        self._hover_path = path
+        self._hover_pos = global_pos
+        img = ThumbnailService.instance().request(path)
+        if img is not None:
+            self._show_pixmap(QPixmap.fromImage(img), global_pos)
         else:
+            # Shown by _on_thumbnail_ready once generated in the background
             self._preview_popup.hide()
 
-    def _load_thumbnail(self, path):
-        try:
-            valid_exts = ('.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp')
-            if not path.lower().endswith(valid_exts):
-                return None
-                
-            import cv2
-            
-            # 1. Try TiffFile for TIFFs (handles scientific data better)
-            if path.lower().endswith(('.tif', '.tiff')):
-                try:
-                    with tifffile.TiffFile(path) as tif:
-                        page = tif.pages[0]
-                        shape = page.shape
-                        
-                        # Handle dimensions
-                        if len(shape) == 2:
-                            h, w = shape
-                            is_rgb = False
-                        elif len(shape) == 3:
-                            h, w, c = shape
-                            is_rgb = True
-                        else:
-                            return None
-                            
-                        # Subsample
-                        subsample = max(1, min(h, w) // 256)
-                        data = page.asarray(out='memmap')[::subsample, ::subsample]
-                        
-                        # RGB handling
-                        if is_rgb:
-                            if data.shape[-1] > 4:
-                                data = np.max(data, axis=2)
-                        
-                        # Normalize
-                        if data.dtype != np.uint8:
-                            d_min, d_max = data.min(), data.max()
-                            if d_max > d_min:
-                                data = ((data - d_min) / (d_max - d_min) * 255).astype(np.uint8)
-                            else:
-                                data = np.zeros_like(data, dtype=np.uint8)
-                                
-                        # Explicit QImage creation to avoid qimage2ndarray dependency
-                        if not data.flags['C_CONTIGUOUS']:
-                            data = np.ascontiguousarray(data)
-                            
-                        h_d, w_d = data.shape[:2]
-                        ch_d = 1 if data.ndim == 2 else data.shape[2]
-                        
-                        if ch_d == 3:
-                            qimg = QImage(data.data, w_d, h_d, w_d * 3, QImage.Format.Format_RGB888)
-                        elif ch_d == 4:
-                            qimg = QImage(data.data, w_d, h_d, w_d * 4, QImage.Format.Format_RGBA8888)
-                        else:
-                            qimg = QImage(data.data, w_d, h_d, w_d, QImage.Format.Format_Grayscale8)
-
-                        return QPixmap.fromImage(qimg)
-                except Exception:
-                    # Fallback to OpenCV if tifffile fails
-                    pass
+    def _on_thumbnail_ready(self, path, img):
+        if path == self._hover_path and self._current_hover_item is not None:
+            self._show_pixmap(QPixmap.fromImage(img), self._hover_pos)
 
-            # 2. Use OpenCV for everything else (or failed TIFFs)
-            # img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
-            # Fix for Unicode paths:
-            img_stream = np.fromfile(path, dtype=np.uint8)
-            img = cv2.imdecode(img_stream, cv2.IMREAD_UNCHANGED)
-            
-            if img is None:
-                return None
-                
-            # Handle dimensions
-            if img.ndim == 3:
-                # Check for RGB (OpenCV is BGR)
-                if img.shape[2] == 3:
-                    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                elif img.shape[2] == 4:
-                    img = cv2.cvtColor(img, cv2.COLOR_BGRA2RGBA)
-            
-            # Normalize if needed (e.g. 16-bit PNG)
-            if img.dtype != np.uint8:
-                d_min, d_max = img.min(), img.max()
-                if d_max > d_min:
-                    img = ((img - d_min) / (d_max - d_min) * 255).astype(np.uint8)
-                else:
-                    img = np.zeros_like(img, dtype=np.uint8)
-
-            # Resize for thumbnail
-            h, w = img.shape[:2]
-            scale = min(256/w, 256/h)
-            if scale < 1.0:
-                new_w, new_h = int(w*scale), int(h*scale)
-                img = cv2.resize(img, (new_w, new_h))
-            
-            # Explicit conversion to QImage (RGB888)
-            if not img.flags['C_CONTIGUOUS']: img = np.ascontiguousarray(img)
-            h_t, w_t = img.shape[:2]
-            ch_t = 1 if img.ndim == 2 else img.shape[2]
-            
-            if ch_t == 3:
-                qimg = QImage(img.data, w_t, h_t, w_t * 3, QImage.Format.Format_RGB888)
-            elif ch_t == 4:
-                 qimg = QImage(img.data, w_t, h_t, w_t * 4, QImage.Format.Format_RGBA8888)
-            else:
-                 qimg = QImage(img.data, w_t, h_t, w_t, QImage.Format.Format_Grayscale8)
-
-            return QPixmap.fromImage(qimg)
-
-        except Exception as e:
-            # Silence errors for preview to avoid console spam
-            # print(f"Error loading preview for {path}: {e}") 
-            return None
+    def _show_pixmap(self, pixmap, global_pos):
+        if pixmap.isNull():
+            self._preview_popup.hide()
+            return
+        self._preview_popup.setPixmap(pixmap)
+        self._update_popup_pos(global_pos)
+        self._preview_popup.show()
 
 class SampleTreeWidget(QTreeWidget):
     """Subclass to handle key events for deletion."""
@@ -338,6 +239,7 @@ class SampleListWidget(QWidget):
     channel_cleared = Signal(str, int) # scene_id, channel_index
     channel_removed = Signal(str, int) # scene_id, channel_index
     scene_structure_changed = Signal(str) # scene_id
+    scene_hovered = Signal(str) # scene_id under the mouse (prefetch hint)
 
     def __init__(self, project_model: ProjectModel, parent=None):
         super().__init__(parent)
@@ -359,6 +261,12 @@ class SampleListWidget(QWidget):
         self._pool_refresh_timer.setSingleShot(True)
         self._pool_refresh_timer.setInterval(200) # 200ms debounce
         self._pool_refresh_timer.timeout.connect(self.refresh_pool_list_actual)
+        
+        # Background folder scanning (load_images_to_pool)
+        self._scan_worker = None
+        self._scan_index = None
+        self._scan_stats = {"valid": 0, "invalid": 0}
+        self._scan_merge_key = None
         self.project_model.project_changed.connect(self.request_pool_refresh)
         
         # Connect Language Change
@@ -463,6 +371,8 @@ class SampleListWidget(QWidget):
         print("DEBUG: [SampleList] Enabled stretch header and shrinkable tree widget")
         
         self.tree_widget.itemClicked.connect(self.on_item_clicked)
+        self.tree_widget.setMouseTracking(True)
+        self.tree_widget.itemEntered.connect(self._on_tree_item_entered)
         self.tree_widget.itemChanged.connect(self.on_item_changed)
         self.tree_widget.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.tree_widget.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.EditKeyPressed)
@@ -751,19 +661,16 @@ class SampleListWidget(QWidget):
     def auto_group_from_pool(self):
         """Groups selected files from pool into samples. If none selected, groups all unassigned."""
         selected_items = self.pool_list.selectedItems()
-        assigned_set = self.project_model.get_assigned_files()
         
         files_to_group = []
         if selected_items:
             for item in selected_items:
                 fpath = item.data(Qt.ItemDataRole.UserRole)
-                if fpath not in assigned_set:
+                if not self.project_model.is_assigned(fpath):
                     files_to_group.append(fpath)
         else:
             # Group all unassigned
-            for fpath in self.project_model.pool_files:
-                if fpath not in assigned_set:
-                    files_to_group.append(fpath)
+            files_to_group = self.project_model.unassigned_files
                     
         if not files_to_group:
             QMessageBox.information(self, tr("Auto Group"), tr("No unassigned files to group."))
@@ -833,6 +740,8 @@ class SampleListWidget(QWidget):
         """
         Loads images into the unassigned pool.
         Checks 'Import Settings' for recursive behavior.
+        The folder is scanned in the background and results are added in batches;
+        re-scans only report files that are new or changed (project file index).
         """
         folder_path = QFileDialog.getExistingDirectory(self, tr("Select Folder with Images"))
         if not folder_path:
@@ -842,19 +751,59 @@ class SampleListWidget(QWidget):
         recursive = settings.value("import/recursive", False, type=bool)
         
         valid_exts = ('.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp', '.gif')
-        files = self.project_model.scan_folder(folder_path, valid_exts, recursive=recursive)
         
-        if not files:
-            QMessageBox.information(self, tr("Import"), tr("No images found in folder."))
-            return
+        if self._scan_worker is not None and self._scan_worker.isRunning():
+            self._scan_worker.stop()
+        
+        known = set(self.project_model.pool_files) | self.project_model.get_assigned_files()
+        self._scan_stats = {"valid": 0, "invalid": 0}
+        self._scan_merge_key = f"scan:{folder_path}:{time.time()}"
+        self._scan_index = self.project_model.get_file_index()
+        
+        worker = FolderScanWorker(folder_path, valid_exts, recursive=recursive,
+                                  file_index=self._scan_index, known_paths=known)
+        worker.batch_found.connect(self._on_scan_batch)
+        worker.finished_scan.connect(self._on_scan_finished)
+        self._scan_worker = worker
+        worker.start()
 
+    def _on_scan_batch(self, files, stamps):
         valid_files, logs = self._validate_import_files(files, "load_pool")
-        invalid_count = sum(1 for e in logs if not e.get("ok"))
-
-        if not valid_files:
+        self._scan_stats["valid"] += len(valid_files)
+        self._scan_stats["invalid"] += sum(1 for e in logs if not e.get("ok"))
+        if valid_files:
+            # All batches of one scan merge into a single undo step
+            self.project_model.add_to_pool(valid_files, merge_key=self._scan_merge_key)
+            self.request_pool_refresh()
+            # Only files that made it into the pool are skipped by later scans
+            if self._scan_index is not None:
+                for path in valid_files:
+                    if path in stamps:
+                        self._scan_index.update(path, *stamps[path])
+
+    def shutdown_scan(self):
+        """Stops a running folder scan and saves the file index (called when the main window closes)."""
+        worker, self._scan_worker = self._scan_worker, None
+        if worker is not None and worker.isRunning():
+            worker.blockSignals(True) # No batches or report for a closing window
+            worker.stop()
+        if self._scan_index is not None:
+            self._scan_index.save()
+
+    def _on_scan_finished(self, reported, scanned):
+        if self._scan_index is not None:
+            self._scan_index.save()
+        if scanned == 0:
+            QMessageBox.information(self, tr("Import"), tr("No images found in folder."))
+            return
+        if reported == 0:
+            QMessageBox.information(self, tr("Import"), tr("No new or changed images found in folder."))
+            return
+        if not self._scan_stats["valid"]:
             QMessageBox.warning(self, tr("Import"), tr("No valid images found."))
             return
 
+        invalid_count = self._scan_stats["invalid"]
         if invalid_count:
             log_path = self._import_log_path()
             if log_path:
@@ -864,9 +813,6 @@ class SampleListWidget(QWidget):
                     tr("Skipped {0} invalid files.\nDetails saved to:\n{1}").format(invalid_count, log_path)
                 )
 
-        self.project_model.add_to_pool(valid_files)
-        self.refresh_pool_list()
-
     def sort_samples(self):
         """Sorts the samples in the project model alphabetically by name."""
         self.project_model.scenes.sort(key=lambda s: s.name)
@@ -902,16 +848,10 @@ class SampleListWidget(QWidget):
         
         try:
             self.pool_list.clear()
-            files = self.project_model.pool_files 
-            
-            assigned_set = {os.path.normpath(p) for p in self.project_model.get_assigned_files()}
 
             # User Request: Hide assigned images completely instead of graying them out
-            # Only show files that are NOT in the assigned set
-            unassigned_files = []
-            for f in files:
-                if os.path.normpath(f) not in assigned_set:
-                    unassigned_files.append(f)
+            # Only show files that are NOT assigned (maintained by the model's index)
+            unassigned_files = self.project_model.unassigned_files
 
             # Sort alphabetically
             unassigned_files.sort(key=lambda x: os.path.basename(x).lower())
@@ -947,6 +887,20 @@ class SampleListWidget(QWidget):
         """Requests a debounced refresh of the sample tree."""
         self._tree_refresh_timer.start()
 
+    def get_scene_order(self) -> List[str]:
+        """Scene ids in the order shown in the sample tree."""
+        order = []
+        for i in range(self.tree_widget.topLevelItemCount()):
+            scene_id = self.tree_widget.topLevelItem(i).data(0, Qt.ItemDataRole.UserRole)
+            if scene_id:
+                order.append(scene_id)
+        return order
+
+    def _on_tree_item_entered(self, item, column):
+        scene_id = item.data(0, Qt.ItemDataRole.UserRole) if item else None
+        if scene_id:
+            self.scene_hovered.emit(scene_id)
+
     def refresh_list(self):
         """Compatibility method. Use request_tree_refresh instead."""
         self.request_tree_refresh()
@@ -1221,19 +1175,13 @@ class SampleListWidget(QWidget):
             if channel_name and get_rgb_mapping(channel_name) is not None:
                 return True
 
-            import numpy as np
-            ext = os.path.splitext(file_path)[1].lower()
-            if ext in (".tif", ".tiff"):
-                data = tifffile.imread(file_path)
-            else:
-                import cv2
-                # data = cv2.imread(file_path, cv2.IMREAD_UNCHANGED)
-                # Fix for Unicode paths:
-                data_stream = np.fromfile(file_path, dtype=np.uint8)
-                data = cv2.imdecode(data_stream, cv2.IMREAD_UNCHANGED)
-                
-                if data is None:
-                    return True
+            # Shared header probe + strided sample (no full decode)
+            probe = probe_file(file_path)
+            if probe.shape is not None and len(probe.shape) == 2 and not probe.series_axes.strip("YX"):
+                return True
+            data = probe.get_sample()
+            if data is None:
+                return True
             
             if data.ndim == 2:
                 return True
@@ -1242,15 +1190,10 @@ class SampleListWidget(QWidget):
                 # Check for pseudo-RGB
                 # 1. Check active channels (only one channel has data)
                 active_channels = []
-                is_chw = data.shape[0] < data.shape[2]
-                
-                num_channels = data.shape[0] if is_chw else data.shape[2]
+                num_channels = data.shape[2]
                 
                 for i in range(num_channels):
-                    if is_chw:
-                        ch_data = data[i, :, :]
-                    else:
-                        ch_data = data[:, :, i]
+                    ch_data = data[:, :, i]
                         
                     # Use max > threshold instead of > 0 to ignore noise
                     # Threshold: 5 (assuming 8-bit/16-bit low-level noise)
@@ -1401,40 +1344,9 @@ class SampleListWidget(QWidget):
             pass
 
     def _validate_import_file(self, file_path: str):
-        try:
-            if not file_path or not os.path.isfile(file_path):
-                return False, "not_a_file", {}
-            if os.path.getsize(file_path) <= 0:
-                return False, "empty_file", {}
-
-            ext = os.path.splitext(file_path)[1].lower()
-            if ext in (".tif", ".tiff"):
-                with tifffile.TiffFile(file_path) as tif:
-                    page = tif.pages[0]
-                    shape = tuple(page.shape) if page.shape is not None else None
-                    dtype = str(page.dtype) if page.dtype is not None else None
-                if not shape or len(shape) not in (2, 3):
-                    return False, "unsupported_shape", {"shape": shape, "dtype": dtype}
-                return True, "ok", {"shape": shape, "dtype": dtype}
-
-            if ext in (".png", ".jpg", ".jpeg", ".bmp"):
-                import cv2
-                # img = cv2.imread(file_path, cv2.IMREAD_UNCHANGED)
-                # Fix for Unicode paths:
-                img_stream = np.fromfile(file_path, dtype=np.uint8)
-                img = cv2.imdecode(img_stream, cv2.IMREAD_UNCHANGED)
-                
-                if img is None:
-                    return False, "decode_failed", {}
-                shape = tuple(img.shape)
-                dtype = str(img.dtype)
-                if img.ndim not in (2, 3):
-                    return False, "unsupported_shape", {"shape": shape, "dtype": dtype}
-                return True, "ok", {"shape": shape, "dtype": dtype}
-
-            return False, "unsupported_extension", {"ext": ext}
-        except Exception as e:
-            return False, "exception", {"error": str(e)}
+        # Header-only probe, cached per path + mtime and shared with the channel checks
+        probe = probe_file(file_path)
+        return probe.ok, probe.reason, dict(probe.meta)
 
     def _validate_import_files(self, files: list, action: str):
         t = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -1603,36 +1515,16 @@ class SampleListWidget(QWidget):
 
     def _detect_rgb_color(self, file_path: str) -> str:
         try:
-            # 1. Read Image
-            data = None
-            if file_path.lower().endswith(('.tif', '.tiff')):
-                try:
-                    data = tifffile.imread(file_path)
-                except:
-                    pass
-            
-            if data is None:
-                # Use cv2 for other formats, handle unicode paths
-                stream = np.fromfile(file_path, dtype=np.uint8)
-                data = cv2.imdecode(stream, cv2.IMREAD_UNCHANGED)
-                if data is not None and data.ndim == 3 and data.shape[2] == 3:
-                     data = cv2.cvtColor(data, cv2.COLOR_BGR2RGB)
+            # 1. Strided sample from the shared probe (HWC, RGB order)
+            data = probe_file(file_path).get_sample()
             
             if data is None:
                 return "#FFFFFF"
 
             # 2. Analyze Dimensions
             if data.ndim == 3:
-                # Heuristic: if dim0 is small (3 or 4), it's likely channels.
-                if data.shape[0] < data.shape[2] and data.shape[0] <= 4:
-                     data = np.transpose(data, (1, 2, 0)) # Convert to HWC
-                
-                # Subsample for speed
-                step = max(1, min(data.shape[0], data.shape[1]) // 100)
-                small_data = data[::step, ::step, :]
-                
                 # Calculate means per channel
-                means = np.mean(small_data, axis=(0, 1))
+                means = np.mean(data, axis=(0, 1))
                 if len(means) >= 3:
                     r, g, b = means[0], means[1], means[2]
                     
@@ -1658,59 +1550,45 @@ class SampleListWidget(QWidget):
     def _check_multichannel(self, file_path: str) -> tuple[bool, int]:
         """Checks if file has multiple channels and returns count."""
         try:
-            # 1. Check TIF/TIFF metadata
-            if file_path.lower().endswith(('.tif', '.tiff')):
-                try:
-                    with tifffile.TiffFile(file_path) as tif:
-                        # Check series
-                        if len(tif.series) > 0:
-                            series = tif.series[0]
-                            shape = series.shape
-                            ndim = len(shape)
-                            
-                            # Heuristic for Dimensions
-                            # Common: (C, Y, X), (Z, C, Y, X), (T, Z, C, Y, X)
-                            # Or (Y, X, C) for RGB
-                            
-                            # If axes known
-                            if hasattr(series, 'axes'):
-                                axes = series.axes
-                                if 'C' in axes:
-                                    idx = axes.find('C')
-                                    c = shape[idx]
-                                    if c > 1: return True, c
-                                if 'S' in axes: # Samples/Channels
-                                    idx = axes.find('S')
-                                    c = shape[idx]
-                                    if c > 1: return True, c
-
-                            # Shape heuristics
-                            if ndim == 3:
-                                # (C, Y, X) or (Y, X, C) or (Z, Y, X)
-                                # Usually Channels are small number (<10)
-                                if shape[0] < 10 and shape[0] > 1: return True, shape[0] # C, Y, X
-                                if shape[2] < 10 and shape[2] > 1: return True, shape[2] # Y, X, C
-                            elif ndim > 3:
-                                # Likely 4D/5D
-                                return True, 0 # >1 definitely
-                except:
-                    pass
-
-            # 2. Check content (slow but accurate for RGB png/jpg)
-            stream = np.fromfile(file_path, dtype=np.uint8)
-            data = cv2.imdecode(stream, cv2.IMREAD_UNCHANGED)
-            if data is not None and data.ndim == 3:
-                h, w, c = data.shape
-                if c > 1:
-                    # Check if channels are identical (Grayscale saved as RGB)
-                    ch0 = data[:,:,0]
-                    is_diff = False
-                    for i in range(1, c):
-                        if not np.array_equal(ch0, data[:,:,i]):
-                            is_diff = True
-                            break
-                    if is_diff:
-                        return True, c
+            probe = probe_file(file_path)
+            
+            # 1. Check TIF/TIFF metadata (series shape/axes from the header probe)
+            if probe.is_tiff and probe.series_shape:
+                shape = probe.series_shape
+                ndim = len(shape)
+                axes = probe.series_axes
+                
+                # Heuristic for Dimensions
+                # Common: (C, Y, X), (Z, C, Y, X), (T, Z, C, Y, X)
+                # Or (Y, X, C) for RGB
+                if 'C' in axes:
+                    c = shape[axes.find('C')]
+                    if c > 1: return True, c
+                if 'S' in axes: # Samples/Channels
+                    c = shape[axes.find('S')]
+                    if c > 1: return True, c
+
+                # Shape heuristics
+                if ndim == 3:
+                    # (C, Y, X) or (Y, X, C) or (Z, Y, X)
+                    # Usually Channels are small number (<10)
+                    if shape[0] < 10 and shape[0] > 1: return True, shape[0] # C, Y, X
+                    if shape[2] < 10 and shape[2] > 1: return True, shape[2] # Y, X, C
+                elif ndim > 3:
+                    # Likely 4D/5D
+                    return True, 0 # >1 definitely
+
+            # 2. Check content on the strided sample (RGB png/jpg saved with identical channels)
+            if probe.shape is not None and len(probe.shape) == 3:
+                data = probe.get_sample()
+                if data is not None and data.ndim == 3:
+                    c = data.shape[2]
+                    if c > 1:
+                        # Check if channels are identical (Grayscale saved as RGB)
+                        ch0 = data[:,:,0]
+                        for i in range(1, c):
+                            if not np.array_equal(ch0, data[:,:,i]):
+                                return True, c
             
             return False, 1
         except Exception:
@@ -0,0 +1,235 @@
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Dict
+
+import numpy as np
+from PySide6.QtCore import Qt, QObject, QRectF, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+
+from src.core.image_renderer import ImageRenderer
+from src.core.logger import Logger
+from src.core.render_cache import channel_render_lock, render_signature
+
+
+class _RegionJob(QRunnable):
+    """Renders one region of a TiledImageItem on the tile pool (reads and decodes happen here)."""
+
+    def __init__(self, renderer: "_TileRenderer", request: dict, channels):
+        super().__init__()
+        self.renderer = renderer
+        self.request = request
+        self.channels = channels
+        self.setAutoDelete(True)
+
+    def run(self):
+        if not self.renderer.is_current(self.request['epoch']):
+            return
+        rgb = None
+        try:
+            # Same per-channel locks as the render scheduler (lazy decodes, enhancement caches);
+            # taken in a fixed order since a merge holds several
+            with ExitStack() as stack:
+                for channel in sorted(self.channels, key=id):
+                    stack.enter_context(channel_render_lock(channel))
+                if not self.renderer.is_current(self.request['epoch']):
+                    return
+                y0, y1, x0, x1 = self.request['region']
+                rgb = ImageRenderer.render_tile(self.channels, y0, y1, x0, x1, self.request['downsample'])
+        except Exception as e:
+            Logger.error(f"[TiledImageItem] Region {self.request['region']} at 1/{self.request['downsample']} failed: {e}")
+        self.renderer.region_ready.emit(self.request, rgb)
+
+
+class _TileRenderer(QObject):
+    """Signal relay of a TiledImageItem (not a QObject): region results arrive on the GUI thread."""
+    # request, uint8 RGB of the region or None
+    region_ready = Signal(object, object)
+
+    _pool = None
+
+    def __init__(self):
+        super().__init__()
+        self.epoch = 0
+
+    @classmethod
+    def pool(cls) -> QThreadPool:
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(2)
+        return cls._pool
+
+    def is_current(self, epoch: int) -> bool:
+        return epoch == self.epoch
+
+    def submit(self, request: dict, channels):
+        self.pool().start(_RegionJob(self, request, channels))
+
+
+class TiledImageItem(QGraphicsItem):
+    """
+    Full-resolution detail layer drawn over a view's (downsampled) overview pixmap.
+    Zoomed in beyond the overview's resolution, the exposed part of the image is drawn from
+    TILE_SIZE x TILE_SIZE tiles rendered on demand straight from the channel data at the
+    matching resolution (power-of-two downsample); zoomed out it draws nothing.
+    Tiles are rendered on a thread pool, never in paint(): the missing tiles of an exposed
+    area are requested as one region (enhanced channels pay their stages' margin once) and
+    split into tiles when it arrives; until then the overview shows through.
+    Tiles are kept in an LRU that is dropped when the channels' display settings or data
+    change (their render signatures), so pan, zoom and contrast changes cost only the visible tiles.
+    Dropped tiles stay on screen until their replacements arrive, so adjusting settings
+    (e.g. enhancement sliders while zoomed in) does not fall back to the overview each step.
+    """
+
+    TILE_SIZE = 256
+    MAX_TILES = 256 # ~64 MB of 256x256 RGB32 pixmaps
+
+    def __init__(self, channels_provider, parent=None):
+        """channels_provider: callable returning the channels to draw (one, or several for a merge)."""
+        super().__init__(parent)
+        self._channels_provider = channels_provider
+        self._rect = QRectF()
+        self._overview_scale = 1.0
+        self._tiles: "OrderedDict[tuple, QPixmap]" = OrderedDict()
+        # Tiles of the previous settings, drawn where current ones are still rendering
+        self._stale_tiles: "Dict[tuple, QPixmap]" = {}
+        self._pending = set() # (downsample, tx, ty) of tiles in requested regions
+        self._version = None
+        self._interactive = False
+        # Results of requests made before the last reset (epoch) are dropped
+        self._renderer = _TileRenderer()
+        self._renderer.region_ready.connect(self._on_region_ready)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption, True)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+
+    def set_image_geometry(self, width: float, height: float, overview_scale: float):
+        """Full-resolution image size (scene units) and the overview pixmap's scale (display_scale)."""
+        rect = QRectF(0.0, 0.0, float(width), float(height))
+        if rect != self._rect:
+            self.prepareGeometryChange()
+            self._rect = rect
+            self._reset_tiles()
+        self._overview_scale = overview_scale
+        self.update()
+
+    def set_interactive(self, interactive: bool):
+        """While panning/zooming only cached tiles are drawn; missing ones are requested afterwards."""
+        if interactive != self._interactive:
+            self._interactive = interactive
+            if not interactive:
+                self.update()
+
+    def invalidate(self):
+        self._reset_tiles()
+        self._version = None
+        self.update()
+
+    def _reset_tiles(self, keep_stale: bool = False):
+        """Drops the tiles and in-flight requests; keep_stale keeps drawing them until replaced."""
+        if keep_stale:
+            self._stale_tiles.update(self._tiles)
+            while len(self._stale_tiles) > self.MAX_TILES:
+                del self._stale_tiles[next(iter(self._stale_tiles))]
+        else:
+            self._stale_tiles.clear()
+        self._tiles.clear()
+        self._pending.clear()
+        self._renderer.epoch += 1
+
+    def covers_view(self, lod: float) -> bool:
+        """True if at this view scale the layer draws the visible image (over the overview) from tiles."""
+        if self._rect.isEmpty() or self._overview_scale >= 1.0 or lod <= self._overview_scale:
+            return False
+        channels = self._channels_provider()
+        return bool(channels) and all(ImageRenderer.is_tileable(ch) for ch in channels)
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter: QPainter, option, widget=None):
+        if self._rect.isEmpty() or self._overview_scale >= 1.0:
+            return
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if lod <= self._overview_scale:
+            return # The overview pixmap already has enough pixels
+        channels = self._channels_provider()
+        if not channels:
+            return
+        if not all(ImageRenderer.is_tileable(ch) for ch in channels if ch.display_settings.visible):
+            return # Not tileable (e.g. RGB channel): the overview stays visible
+
+        version = tuple(render_signature(ch, None) for ch in channels)
+        if version != self._version:
+            # Same geometry, new settings or data: old tiles bridge the wait for new ones
+            self._reset_tiles(keep_stale=self._version is not None)
+            self._version = version
+
+        # Coarsest power-of-two level that still gives at least one tile pixel per screen pixel
+        downsample = 1
+        while downsample * 2 <= 1.0 / lod:
+            downsample *= 2
+        extent = self.TILE_SIZE * downsample # Full-resolution pixels per tile side
+
+        exposed = option.exposedRect.intersected(self._rect)
+        if exposed.isEmpty():
+            return
+        width, height = int(self._rect.width()), int(self._rect.height())
+        tx0, tx1 = int(exposed.left()) // extent, min(width - 1, int(np.ceil(exposed.right())) - 1) // extent
+        ty0, ty1 = int(exposed.top()) // extent, min(height - 1, int(np.ceil(exposed.bottom())) - 1) // extent
+
+        tiles = [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+        missing = [tile for tile in tiles
+                   if (downsample, *tile) not in self._tiles and (downsample, *tile) not in self._pending]
+        if missing and not self._interactive:
+            self._request_tiles(channels, downsample, missing, extent, width, height)
+
+        for tx, ty in tiles:
+            key = (downsample, tx, ty)
+            pixmap = self._tiles.get(key)
+            if pixmap is not None:
+                self._tiles.move_to_end(key)
+            else:
+                pixmap = self._stale_tiles.get(key)
+                if pixmap is None:
+                    continue # Rendering (or interactive): the overview shows through
+            x0, y0 = tx * extent, ty * extent
+            target = QRectF(x0, y0, min(extent, width - x0), min(extent, height - y0))
+            painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+
+    def _request_tiles(self, channels, downsample, tiles, extent, width, height):
+        """Requests the bounding region of the given tiles from the tile pool."""
+        bx0, bx1 = min(tx for tx, _ in tiles), max(tx for tx, _ in tiles)
+        by0, by1 = min(ty for _, ty in tiles), max(ty for _, ty in tiles)
+        request = {
+            'epoch': self._renderer.epoch,
+            'downsample': downsample,
+            'origin': (bx0, by0),
+            'tiles': list(tiles),
+            'region': (by0 * extent, min(height, (by1 + 1) * extent), bx0 * extent, min(width, (bx1 + 1) * extent)),
+        }
+        self._pending.update((downsample, tx, ty) for tx, ty in tiles)
+        self._renderer.submit(request, list(channels))
+
+    def _on_region_ready(self, request, rgb):
+        if not self._renderer.is_current(request['epoch']):
+            return # Settings, data or geometry changed since the request
+        downsample = request['downsample']
+        self._pending.difference_update((downsample, tx, ty) for tx, ty in request['tiles'])
+        if rgb is None or rgb.size == 0:
+            return
+
+        size = self.TILE_SIZE
+        bx0, by0 = request['origin']
+        for tx, ty in request['tiles']:
+            block = np.ascontiguousarray(rgb[(ty - by0) * size:(ty - by0 + 1) * size, (tx - bx0) * size:(tx - bx0 + 1) * size])
+            if block.size == 0:
+                continue
+            h, w = block.shape[:2]
+            self._stale_tiles.pop((downsample, tx, ty), None)
+            self._tiles[(downsample, tx, ty)] = QPixmap.fromImage(QImage(block.data, w, h, w * 3, QImage.Format.Format_RGB888))
+        while len(self._tiles) > self.MAX_TILES:
+            self._tiles.popitem(last=False)
+        try:
+            self.update()
+        except RuntimeError:
+            pass # The view was destroyed while the region rendered
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.channel_matcher import ChannelMatcher
+from src.core.project_model import ProjectModel
+
+
+class TestChannelMatcher(unittest.TestCase):
+    def setUp(self):
+        self.model = ProjectModel()
+        self.matcher = ChannelMatcher(self.model.channel_patterns)
+
+    def test_keyword_priority(self):
+        # Longer keywords win; equal lengths keep the pattern order (GFP before CH1)
+        self.assertEqual(self.matcher.match("well_CH1_GFP.tif"), "GFP")
+        self.assertEqual(self.matcher.match("hoechst_dapi.tif"), "HOECHST")
+        self.assertIsNone(self.matcher.match("brightfield.tif"))
+
+    def test_group_and_base_name(self):
+        groups = self.matcher.group(["/d/A1_DAPI.tif", "/d/A1_gfp.tif", "/d/B2-Cy5.tif", "/d/plain.tif"])
+        self.assertEqual(list(groups), ["A1", "B2", "plain"])
+        self.assertEqual([t for _, t, _ in groups["A1"]], ["DAPI", "GFP"])
+        self.assertEqual(groups["plain"][0][1], "Other")
+
+    def test_bulk_add_single_update(self):
+        emitted = []
+        self.model.project_changed.connect(lambda: emitted.append(1))
+        paths = [f"/data/well_{i:05d}_{ch}.tif" for i in range(5000) for ch in ("DAPI", "GFP")]
+        start = time.perf_counter()
+        self.model._add_files_internal(paths)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(emitted), 1)
+        self.assertEqual(self.model.get_scene_count(), 5000)
+        self.assertEqual(self.model.get_pool_count(), 10000)
+        self.assertEqual([c.channel_type for c in self.model.get_scene("well_00042").channels], ["DAPI", "GFP"])
+        self.assertLessEqual(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.channel_stats import ChannelStats
+from src.core.data_model import ImageChannel
+
+
+class TestChannelStats(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.data = rng.gamma(2.0, 300.0, (200, 300)).clip(5, 4000).astype(np.uint16)
+
+    def test_exact_statistics_match_numpy(self):
+        stats = ChannelStats(self.data)
+        self.assertTrue(stats.is_exact)
+        self.assertEqual(stats.min, float(self.data.min()))
+        self.assertEqual(stats.max, float(self.data.max()))
+        self.assertAlmostEqual(stats.mean, float(self.data.mean()), places=6)
+        self.assertAlmostEqual(stats.std, float(self.data.std()), places=6)
+        for q in (0.1, 50.0, 99.9):
+            self.assertEqual(stats.percentile(q),
+                             float(np.percentile(self.data, q, method='inverted_cdf')))
+
+    def test_histogram_matches_numpy(self):
+        stats = ChannelStats(self.data)
+        for range_max in (4000, 255, 1000.5):
+            expected, _ = np.histogram(self.data, bins=256, range=(0, range_max))
+            np.testing.assert_array_equal(stats.histogram(256, range_max), expected)
+
+    def test_float_data_falls_back_to_reductions(self):
+        data = self.data.astype(np.float32) / 4000.0
+        stats = ChannelStats(data)
+        self.assertFalse(stats.is_exact)
+        self.assertIsNone(stats.histogram())
+        self.assertAlmostEqual(stats.max, float(data.max()), places=6)
+
+    def test_channel_cache_follows_data_version(self):
+        channel = ImageChannel("", color="#FF0000", data=self.data)
+        stats = channel.get_stats()
+        self.assertIs(channel.get_stats(), stats)
+        self.assertEqual(channel.data_max(), int(self.data.max()))
+
+        channel.update_data(self.data // 2)
+        self.assertIsNot(channel.get_stats(), stats)
+        self.assertEqual(channel.stats['max'], float((self.data // 2).max()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.file_index import FileIndex, iter_image_files
+from src.core.workers import FolderScanWorker
+
+
+class TestFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmp_dir, "sub"))
+        os.makedirs(os.path.join(self.tmp_dir, ".cache"))
+        for rel in ("a.tif", "b.png", "notes.txt", os.path.join("sub", "c.tif"), os.path.join(".cache", "d.tif")):
+            with open(os.path.join(self.tmp_dir, rel), "wb") as f:
+                f.write(b"x")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_iter_image_files(self):
+        exts = ('.tif', '.png')
+        flat = sorted(e.name for e in iter_image_files(self.tmp_dir, exts))
+        self.assertEqual(flat, ["a.tif", "b.png"])
+        deep = sorted(e.name for e in iter_image_files(self.tmp_dir, exts, recursive=True))
+        self.assertEqual(deep, ["a.tif", "b.png", "c.tif"])
+
+    def test_update_and_persist(self):
+        index_path = os.path.join(self.tmp_dir, ".cache", "file_index.json")
+        index = FileIndex(index_path)
+        self.assertTrue(index.update("/x/a.tif", 10, 100))
+        self.assertFalse(index.update("/x/a.tif", 10, 100))
+        self.assertTrue(index.update("/x/a.tif", 11, 100))
+        index.save()
+
+        reloaded = FileIndex(index_path)
+        self.assertEqual(len(reloaded), 1)
+        self.assertFalse(reloaded.update("/x/a.tif", 11, 100))
+
+    def test_scan_leaves_index_to_the_importer(self):
+        index = FileIndex(os.path.join(self.tmp_dir, ".cache", "file_index.json"))
+        batches = []
+
+        def scan(known=()):
+            worker = FolderScanWorker(self.tmp_dir, ('.tif', '.png'), file_index=index, known_paths=known)
+            worker.batch_found.connect(lambda files, stamps: batches.append((files, stamps)))
+            worker.run()
+            return batches.pop() if batches else ([], {})
+
+        files, stamps = scan()
+        self.assertEqual(sorted(os.path.basename(p) for p in files), ["a.tif", "b.png"])
+        self.assertEqual(len(index), 0) # Nothing recorded before the files are imported
+
+        imported = [p for p in files if p.endswith("a.tif")]
+        for path in imported:
+            index.update(path, *stamps[path])
+        files, _ = scan(known={os.path.normpath(p) for p in imported})
+        self.assertEqual([os.path.basename(p) for p in files], ["b.png"])
+
+
+if __name__ == '__main__':
+    unittest.main()
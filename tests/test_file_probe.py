@@ -0,0 +1,69 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+import tifffile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.file_probe import FileProbe, FileProbeCache, probe_file
+
+
+class TestFileProbe(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        FileProbeCache.instance().invalidate()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_header_fields_and_reasons(self):
+        gray = os.path.join(self.tmp_dir, "gray.png")
+        cv2.imwrite(gray, np.full((40, 30), 1000, dtype=np.uint16))
+        probe = probe_file(gray)
+        self.assertTrue(probe.ok)
+        self.assertEqual(probe.shape, (40, 30))
+        self.assertEqual(probe.dtype, "uint16")
+
+        empty = os.path.join(self.tmp_dir, "empty.tif")
+        open(empty, "wb").close()
+        self.assertEqual(probe_file(empty).reason, "empty_file")
+        self.assertEqual(probe_file(os.path.join(self.tmp_dir, "missing.tif")).reason, "not_a_file")
+
+    def test_sample_decodes_only_sampled_rows(self):
+        gray = (np.arange(1100 * 1300, dtype=np.uint32) % 60000).astype(np.uint16).reshape(1100, 1300)
+        rgb = np.dstack([gray, gray // 2, gray // 3])
+        cases = {
+            "strips.tif": (gray, gray, dict(rowsperstrip=4, compression='zlib')),
+            "tiles.tif": (rgb, rgb, dict(tile=(256, 256), compression='zlib')),
+            "planar.tif": (np.moveaxis(rgb, -1, 0), rgb, dict(photometric='rgb', planarconfig='separate', compression='zlib')),
+            "raw.tif": (rgb, rgb, dict(photometric='rgb')),
+        }
+        for name, (data, expected, kwargs) in cases.items():
+            path = os.path.join(self.tmp_dir, name)
+            tifffile.imwrite(path, data, **kwargs)
+            with mock.patch.object(tifffile.TiffPage, 'asarray', side_effect=AssertionError("full decode")):
+                sample = FileProbe(path).get_sample()
+            np.testing.assert_array_equal(sample, expected[::4, ::4], err_msg=name)
+
+    def test_multipage_channel_sample_and_cache(self):
+        path = os.path.join(self.tmp_dir, "cyx.tif")
+        data = np.zeros((3, 64, 48), dtype=np.uint16)
+        data[1] = 500
+        tifffile.imwrite(path, data, photometric='minisblack')
+
+        probe = probe_file(path)
+        self.assertEqual(probe.series_shape, (3, 64, 48))
+        sample = probe.get_sample()
+        self.assertEqual(sample.shape, (64, 48, 3))
+        self.assertEqual(sample[..., 1].max(), 500)
+        self.assertIs(probe_file(path), probe)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.data_model import ImageChannel
+from src.core.image_renderer import ImageRenderer
+
+
+class TestIntegerRender(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.channels = []
+        for color, gamma in (("#FF0000", 1.0), ("#00FF00", 0.7), ("#FFFF00", 1.0)):
+            ch = ImageChannel("", color=color, data=rng.integers(0, 4096, (64, 80), dtype=np.uint16))
+            ch.display_settings.min_val = 100
+            ch.display_settings.max_val = 3000
+            ch.display_settings.gamma = gamma
+            self.channels.append(ch)
+
+    def test_integer_channel_matches_float_render(self):
+        for depth, dtype, scale in ((8, np.uint8, 255), (16, np.uint16, 65535)):
+            ch = self.channels[1]
+            as_float = ImageRenderer.render_channel(ch, out_depth=depth)
+            as_int = ImageRenderer.render_channel(ch, out_depth=depth, integer_output=True)
+            self.assertEqual(as_int.dtype, dtype)
+            np.testing.assert_allclose(as_int.astype(np.int64), np.round(as_float * scale).astype(np.int64), atol=1)
+
+    def test_composite_matches_float_sum(self):
+        layers = [ImageRenderer.render_channel(ch) for ch in self.channels]
+        expected = np.clip(sum(layers), 0.0, 1.0)
+        result = ImageRenderer.composite(self.channels)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, expected, atol=1.0 / 255 + 1e-6)
+
+    def test_indexed_display_swaps_palette_only(self):
+        ch = self.channels[0]
+        rgb = ImageRenderer.render_channel(ch, integer_output=True, indexed=True)
+        indices, palette = ImageRenderer.indexed_display(ch)
+        np.testing.assert_array_equal(rgb, palette[indices])
+        lut_rgb = ImageRenderer.generate_rgb_lut(100, 3000, 1.0, "#FF0000", lut_size=4096)[ch.raw_data]
+        np.testing.assert_allclose(rgb.astype(int), lut_rgb.astype(int), atol=1)
+
+        # Colour change: same index image, new palette
+        ch.display_settings.color = "#00FFFF"
+        ImageRenderer.render_channel(ch, integer_output=True, indexed=True)
+        self.assertIs(ImageRenderer.indexed_display(ch)[0], indices)
+
+        # Window change requantizes; enhancement disables the indexed path
+        ch.display_settings.max_val = 2000
+        self.assertIsNone(ImageRenderer.indexed_display(ch))
+        ImageRenderer.render_channel(ch, integer_output=True, indexed=True)
+        self.assertIsNot(ImageRenderer.indexed_display(ch)[0], indices)
+        ch.display_settings.enhance_params = {'bg_enabled': True}
+        self.assertIsNone(ImageRenderer.indexed_display(ch))
+
+    def test_lut_is_memoized_and_data_max_cached(self):
+        ImageRenderer.clear_cache()
+        lut = ImageRenderer.generate_rgb_lut(0, 1000, 1.0, "#00FF00", lut_size=4096)
+        self.assertIs(lut, ImageRenderer.generate_rgb_lut(0, 1000, 1.0, "#00FF00", lut_size=4096))
+        self.assertFalse(lut.flags.writeable)
+        self.assertIsNot(lut, ImageRenderer.generate_rgb_lut(0, 1001, 1.0, "#00FF00", lut_size=4096))
+
+        ch = self.channels[0]
+        self.assertEqual(ch.data_max(), int(ch.raw_data.max()))
+        ch.update_data(ch.raw_data // 2)
+        self.assertEqual(ch.data_max(), int(ch.raw_data.max()))
+
+
+if __name__ == '__main__':
+    unittest.main()
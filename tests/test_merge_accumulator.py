@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.merge_accumulator import MergeAccumulator
+
+
+class TestMergeAccumulator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.layers = {i: rng.random((32, 48, 3), dtype=np.float32) * 0.3 for i in range(5)}
+        self.acc = MergeAccumulator()
+
+    def expected(self, layers):
+        return np.clip(sum(layers.values()), 0.0, 1.0)
+
+    def test_single_layer_change_is_incremental(self):
+        base = self.acc.update(dict(self.layers))
+        layers = dict(self.layers)
+        layers[2] = layers[2] * 0.5
+
+        result = self.acc.update(layers)
+        self.assertIs(result, base)  # Updated in place, not rebuilt
+        self.assertEqual(self.acc._ops_since_rebuild, 2)
+        np.testing.assert_allclose(np.clip(result, 0, 1), self.expected(layers), atol=1e-5)
+
+    def test_visibility_toggle_and_uint8_output(self):
+        self.acc.update(dict(self.layers))
+        hidden = {k: v for k, v in self.layers.items() if k != 3}
+        self.acc.update(hidden)
+        self.assertEqual(self.acc._ops_since_rebuild, 1)
+        np.testing.assert_allclose(self.acc._sum, sum(hidden.values()), atol=1e-5)
+
+        out = self.acc.to_uint8()
+        self.assertEqual(out.dtype, np.uint8)
+        np.testing.assert_allclose(out.astype(int), (self.expected(hidden) * 255).astype(int), atol=1)
+
+        self.assertIsNone(self.acc.update({}))
+
+    def test_uint8_layers_sum_exactly_and_saturate(self):
+        rng = np.random.default_rng(2)
+        layers = {i: rng.integers(0, 256, (16, 16, 3), dtype=np.uint8) for i in range(4)}
+        self.acc.update(dict(layers))
+        self.assertEqual(self.acc._sum.dtype, np.uint16)
+        layers[1] = rng.integers(0, 256, (16, 16, 3), dtype=np.uint8)
+        self.acc.update(layers)
+        self.assertEqual(self.acc._ops_since_rebuild, 2)
+
+        expected = np.minimum(sum(l.astype(np.int64) for l in layers.values()), 255).astype(np.uint8)
+        np.testing.assert_array_equal(self.acc.to_uint8(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.data_model import ImageChannel
+from src.core.preview_controller import PreviewController, collect_stage_times
+from src.core.render_cache import RenderCache, render_signature
+
+
+class TestPreviewController(unittest.TestCase):
+    def frame(self, controller, limit, ms_per_mpx, stages=None, decide=True):
+        """Reports a 4:3 frame at `limit` px costing ms_per_mpx (enhancement stages as ms/Mpx too)."""
+        shape = (limit * 3 // 4, limit)
+        mpx = shape[0] * shape[1] / 1e6
+        stages = {name: cost * mpx for name, cost in (stages or {}).items()}
+        render_ms = ms_per_mpx * mpx + sum(stages.values())
+        controller.report_frame(shape, render_ms, dict(stages, render=render_ms), 0.0, decide=decide)
+
+    def test_steps_up_only_after_consecutive_fast_frames(self):
+        controller = PreviewController(initial_limit=512, budget_ms=33)
+        for i in range(PreviewController.UP_FRAMES - 1):
+            self.frame(controller, 512, 5.0)
+            self.assertEqual(controller.preview_limit, 512)
+        self.frame(controller, 512, 5.0)
+        self.assertEqual(controller.preview_limit, 768)
+        self.assertEqual(controller.decisions[-1]['reason'], "under budget")
+
+    def test_slow_frame_steps_down_at_once(self):
+        controller = PreviewController(initial_limit=1024, budget_ms=33)
+        self.frame(controller, 1024, 100.0) # 79 ms at 1024 px
+        self.assertEqual(controller.preview_limit, 512)
+        self.assertLessEqual(controller.predict_ms(controller._index), 33)
+
+        # Within the hysteresis band nothing changes
+        self.frame(controller, 512, 160.0)
+        self.assertEqual(controller.preview_limit, 512)
+
+    def test_costly_stages_dropped_only_below_smallest_resolution(self):
+        controller = PreviewController(initial_limit=1024, budget_ms=33)
+        stages = {'noise': 600.0, 'bg': 100.0, 'stretch': 5.0}
+        self.frame(controller, 1024, 20.0, stages)
+        self.assertEqual(controller.preview_limit, 256)
+        self.assertEqual(controller.skipped_stages, ('noise',))
+
+        telemetry = controller.telemetry()
+        self.assertEqual(telemetry['skipped_stages'], ['noise'])
+        self.assertEqual(telemetry['decisions'][-1]['preview_limit'], 256)
+        self.assertIn('noise', telemetry['costs_ms_per_mpx'])
+
+        # Previews do not measure the dropped stage: it stays dropped while its known cost is high
+        for _ in range(PreviewController.UP_FRAMES):
+            self.frame(controller, 256, 1.0, {'bg': 1.0, 'stretch': 1.0})
+        self.assertEqual(controller.skipped_stages, ('noise',))
+
+        # Refined frames (all stages) update its cost; it is restored before the resolution is raised
+        for _ in range(2):
+            self.frame(controller, 1024, 1.0, {'noise': 1.0, 'bg': 1.0, 'stretch': 1.0}, decide=False)
+        self.assertEqual(controller.skipped_stages, ('noise',))
+        for _ in range(PreviewController.UP_FRAMES):
+            self.frame(controller, 256, 1.0, {'bg': 1.0, 'stretch': 1.0})
+        self.assertEqual(controller.skipped_stages, ())
+        self.assertEqual(controller.preview_limit, 256)
+
+    def test_cache_hit_frames_are_ignored(self):
+        controller = PreviewController(initial_limit=512)
+        controller.report_frame((384, 512), 0.5, {}, 2.0)
+        self.assertFalse(controller.has_measurements)
+
+    def test_render_jobs_collect_stage_times_and_skip_stages(self):
+        ch = ImageChannel("", color="#00FF00", data=np.random.default_rng(2).integers(0, 4000, (256, 256), dtype=np.uint16))
+        ch.display_settings.enhance_params = {'noise_enabled': True, 'noise_sigma': 2.0,
+                                              'stretch_enabled': True, 'stretch_clip': 1.0}
+        cache = RenderCache()
+        with collect_stage_times() as stages:
+            full = cache.render(ch, (128, 128))
+        self.assertEqual(set(stages), {'render', 'noise', 'stretch'})
+
+        with collect_stage_times() as stages:
+            reduced = cache.render(ch, (128, 128), skip_stages=('noise',))
+        self.assertEqual(set(stages), {'render', 'stretch'})
+        self.assertFalse(np.array_equal(full, reduced))
+        self.assertNotEqual(render_signature(ch, (128, 128)), render_signature(ch, (128, 128), ('noise',)))
+        self.assertIs(cache.render(ch, (128, 128)), full)
+
+
+if __name__ == '__main__':
+    unittest.main()
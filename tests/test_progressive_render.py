@@ -0,0 +1,137 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PySide6.QtCore import QSettings
+from PySide6.QtWidgets import QApplication
+
+from src.core.data_model import ImageChannel, Session
+from src.core.performance_monitor import PerformanceMonitor
+from src.core.render_cache import render_signature
+from src.gui.filmstrip_view import FilmstripWidget
+from src.gui.multi_view import MultiViewWidget
+
+
+class TestProgressiveRender(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    @classmethod
+    def tearDownClass(cls):
+        PerformanceMonitor.instance().stop()
+
+    def setUp(self):
+        self.session = Session()
+        rng = np.random.default_rng(7)
+        for color in ("#FF0000", "#00FF00"):
+            self.session.channels.append(
+                ImageChannel("", color=color, data=rng.integers(0, 4096, (1500, 3000), dtype=np.uint16)))
+        self.widget = MultiViewWidget(self.session)
+        # Display quality from a scratch INI, never the user's settings
+        self.settings_dir = tempfile.mkdtemp()
+        self.widget.settings = QSettings(os.path.join(self.settings_dir, "settings.ini"), QSettings.Format.IniFormat)
+        self.widget.settings.setValue("display/quality_key", "balanced")
+        self.widget.initialize_views()
+
+    def tearDown(self):
+        self.widget._refine_timer.stop()
+        self.widget.render_scheduler.cancel()
+        self.widget.render_scheduler.wait()
+        self.widget.deleteLater()
+        shutil.rmtree(self.settings_dir, ignore_errors=True)
+
+    def deliver(self):
+        self.widget.render_scheduler.wait()
+        QApplication.processEvents()
+
+    def adjust(self, max_val, preview_dim=1024, skip_stages=()):
+        """Preview of a contrast change, with the adaptive preview choosing preview_dim and skip_stages."""
+        monitor = PerformanceMonitor.instance()
+        with mock.patch.object(monitor, 'get_preview_limit', return_value=preview_dim), \
+                mock.patch.object(monitor, 'get_preview_skip_stages', return_value=skip_stages):
+            self.session.channels[0].display_settings.max_val = max_val
+            self.widget.render_all(preview=True)
+            self.deliver()
+
+    def test_preview_is_refined_when_idle(self):
+        self.adjust(1500)
+        self.assertEqual(max(self.widget._channel_images_cache[0].shape[:2]), 1024)
+        self.assertTrue(self.widget._refine_timer.isActive())
+
+        self.widget._refine_timer.stop()
+        self.widget._refine_preview() # Idle timer elapsed
+        self.deliver()
+        for img in self.widget._channel_images_cache.values():
+            self.assertEqual(img.shape[:2], (1280, 2560))
+        self.assertEqual(self.widget._last_target_shape, (1280, 2560))
+
+    def test_new_adjustment_cancels_refinement(self):
+        self.adjust(1500)
+        self.widget._refine_timer.stop()
+        self.widget._refine_preview()
+        self.adjust(1000) # Arrives while the refinement is in flight
+        self.assertEqual(max(self.widget._channel_images_cache[0].shape[:2]), 1024)
+        self.assertTrue(self.widget._refine_timer.isActive())
+
+    def test_full_size_preview_without_stages_is_refined(self):
+        ch = self.session.channels[0]
+        ch.display_settings.enhance_params = {'bg_enabled': True, 'bg_strength': 0.5, 'bg_kernel': 15}
+        self.adjust(1500, preview_dim=2560, skip_stages=('bg',))
+        self.assertEqual(self.widget._rendered_signatures[0], render_signature(ch, (1280, 2560), ('bg',)))
+        self.assertTrue(self.widget._refine_timer.isActive())
+
+        self.widget._refine_timer.stop()
+        self.widget._refine_preview()
+        self.deliver()
+        self.assertEqual(self.widget._rendered_signatures[0], render_signature(ch, (1280, 2560)))
+
+
+class TestFilmstripRefinement(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    @classmethod
+    def tearDownClass(cls):
+        PerformanceMonitor.instance().stop()
+
+    def test_thumbnails_rendered_without_stages_are_refined(self):
+        session = Session()
+        ch = ImageChannel("", color="#00FF00", data=np.random.default_rng(2).integers(0, 4096, (600, 800), dtype=np.uint16))
+        ch.display_settings.enhance_params = {'bg_enabled': True, 'bg_strength': 0.5, 'bg_kernel': 15}
+        session.channels.append(ch)
+        widget = FilmstripWidget(session)
+        monitor = PerformanceMonitor.instance()
+        try:
+            with mock.patch.object(monitor, 'get_preview_limit', return_value=2048), \
+                    mock.patch.object(monitor, 'get_preview_skip_stages', return_value=('bg',)):
+                widget.render_all(preview=True)
+                widget.render_scheduler.wait()
+                QApplication.processEvents()
+            self.assertTrue(widget._refine_timer.isActive()) # Main view is already full size
+            self.assertEqual(widget._rendered_signatures[("thumb", 0)],
+                             render_signature(ch, widget.THUMB_TARGET_SHAPE, ('bg',)))
+
+            widget._refine_timer.stop()
+            widget._refine_preview()
+            widget.render_scheduler.wait()
+            QApplication.processEvents()
+            for kind, shape in (("main", None), ("thumb", widget.THUMB_TARGET_SHAPE)):
+                self.assertEqual(widget._rendered_signatures[(kind, 0)], render_signature(ch, shape))
+        finally:
+            widget._refine_timer.stop()
+            widget.render_scheduler.cancel()
+            widget.render_scheduler.wait()
+            widget.deleteLater()
+
+
+if __name__ == '__main__':
+    unittest.main()
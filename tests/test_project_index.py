@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.project_model import ProjectModel
+
+
+class TestProjectIndex(unittest.TestCase):
+    def setUp(self):
+        self.model = ProjectModel()
+        self.files = [os.path.normpath(f"/data/s{i}_{ch}.tif") for i in range(3) for ch in ("DAPI", "GFP")]
+
+    def assert_consistent(self):
+        assigned = set()
+        for scene in self.model.scenes:
+            for ch in scene.channels:
+                if ch.path:
+                    assigned.add(os.path.normpath(ch.path))
+        self.assertEqual(self.model.get_assigned_files(), assigned)
+        self.assertEqual(self.model.unassigned_files, [p for p in self.model.pool_files if p not in assigned])
+
+    def test_mutators_and_undo(self):
+        model = self.model
+        model.add_to_pool(self.files + ["/data/extra.tif"])
+        self.assertEqual(len(model.unassigned_files), 7)
+
+        model.add_files(self.files)
+        self.assert_consistent()
+        self.assertEqual(model.unassigned_files, [os.path.normpath("/data/extra.tif")])
+        self.assertEqual(model.find_assignments(self.files[1]), [("s0", 1)])
+
+        model.update_channel_path("s0", 1, "")
+        self.assert_consistent()
+        self.assertFalse(model.is_assigned(self.files[1]))
+
+        model.rename_scene("s1", "renamed")
+        model.remove_channel("renamed", 0)
+        model.remove_scene("s2")
+        model.remove_files_from_pool([self.files[0], "/data/extra.tif"])
+        self.assert_consistent()
+
+        while model.undo_stack.canUndo():
+            model.undo_stack.undo()
+            self.assert_consistent()
+        self.assertEqual(model.get_scene_count(), 0)
+        self.assertEqual(model.get_pool_count(), 0)
+
+        while model.undo_stack.canRedo():
+            model.undo_stack.redo()
+            self.assert_consistent()
+
+    def test_pool_order_restored(self):
+        model = self.model
+        model.add_to_pool(self.files)
+        model.remove_files_from_pool(self.files[:3])
+        model.undo_stack.undo()
+        self.assertEqual(model.pool_files, self.files)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import tifffile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.pyramid_source import PyramidSource
+from src.core.tile_cache import TilePyramid
+from src.core.data_model import ImageChannel
+
+
+class TestPyramidSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.base = (np.arange(2048 * 1536, dtype=np.uint32) % 4000).astype(np.uint16).reshape(2048, 1536)
+        self.path = os.path.join(self.tmp_dir, "slide.tif")
+        with tifffile.TiffWriter(self.path) as tw:
+            tw.write(self.base, subifds=2, tile=(256, 256))
+            tw.write(self.base[::2, ::2], subfiletype=1, tile=(256, 256))
+            tw.write(self.base[::4, ::4], subfiletype=1, tile=(256, 256))
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+        os.rmdir(self.tmp_dir)
+
+    def test_level_selection(self):
+        src = PyramidSource.open(self.path)
+        self.assertIsNotNone(src)
+        try:
+            self.assertEqual(src.level_shapes, [(2048, 1536), (1024, 768), (512, 384)])
+            self.assertEqual(src.level_for_shape((400, 300)), 2)
+            self.assertEqual(src.level_for_shape((600, 450)), 1)
+            self.assertEqual(src.level_for_shape(None), 0)
+            self.assertEqual(src.level_for_scale(0.25), 2)
+            np.testing.assert_array_equal(src.read_level(1), self.base[::2, ::2])
+        finally:
+            src.close()
+
+    def test_flat_tiff_is_not_a_pyramid(self):
+        flat = os.path.join(self.tmp_dir, "flat.tif")
+        tifffile.imwrite(flat, self.base[:64, :64])
+        self.assertIsNone(PyramidSource.open(flat))
+
+    def test_channel_defers_base_level(self):
+        ch = ImageChannel(self.path, "#00FF00", "GFP")
+        self.assertEqual(tuple(ch.shape), (2048, 1536))
+        self.assertIsNone(ch._raw_data)
+        self.assertEqual(ch.get_display_data((500, 380)).shape, (512, 384))
+        self.assertIsNone(ch._raw_data)
+        self.assertEqual(ch.raw_data.shape, (2048, 1536))
+        ch.unload_raw_data()
+
+
+class TestTilePyramid(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_root = os.path.join(self.tmp_dir, ".cache")
+        self.data = (np.arange(1500 * 1100, dtype=np.uint32) % 3000).astype(np.uint16).reshape(1500, 1100)
+        self.path = os.path.join(self.tmp_dir, "flat.tif")
+        tifffile.imwrite(self.path, self.data)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_build_open_and_read_region(self):
+        self.assertIsNone(TilePyramid.open(self.path, self.cache_root))
+        built = TilePyramid.build(self.path, self.data, self.cache_root)
+        self.assertEqual(built.level_shapes, [(1500, 1100), (750, 550), (375, 275)])
+
+        cached = TilePyramid.open(self.path, self.cache_root)
+        self.assertIsNotNone(cached)
+        np.testing.assert_array_equal(cached.read_region(0, 500, 1100, 300, 1050), self.data[500:1100, 300:1050])
+        np.testing.assert_array_equal(cached.read_level(0), self.data)
+        self.assertEqual(cached.level_for_shape((700, 500)), 1)
+
+    def test_cancelled_build_leaves_no_cache(self):
+        self.assertIsNone(TilePyramid.build(self.path, self.data, self.cache_root, should_continue=lambda: False))
+        self.assertIsNone(TilePyramid.open(self.path, self.cache_root))
+
+    def test_prune_removes_stale_then_least_recently_used(self):
+        old_dir = TilePyramid.build(self.path, self.data, self.cache_root).cache_dir
+        tifffile.imwrite(self.path, self.data[:1200]) # New mtime/size: the old cache is stale
+        other = os.path.join(self.tmp_dir, "other.tif")
+        tifffile.imwrite(other, self.data)
+        other_dir = TilePyramid.build(other, self.data, self.cache_root).cache_dir
+        self.assertFalse(os.path.exists(old_dir))
+
+        current_dir = TilePyramid.build(self.path, self.data[:1200], self.cache_root).cache_dir
+        self.assertEqual(TilePyramid.prune(self.cache_root, max_bytes=1, keep=current_dir), 1)
+        self.assertFalse(os.path.exists(other_dir))
+        self.assertIsNotNone(TilePyramid.open(self.path, self.cache_root))
+
+
+    def test_build_worker_builds_queued_files_once(self):
+        from src.core.workers import TileBuildWorker
+        worker = TileBuildWorker()
+        worker.enqueue(self.path, self.cache_root)
+        worker.enqueue(self.path, self.cache_root) # Already queued
+        worker.wait()
+        self.assertIsNotNone(TilePyramid.open(self.path, self.cache_root))
+
+        other = os.path.join(self.tmp_dir, "other.tif")
+        tifffile.imwrite(other, self.data)
+        worker.enqueue(other, self.cache_root) # Restarts the finished thread
+        worker.wait()
+        self.assertIsNotNone(TilePyramid.open(other, self.cache_root))
+        worker.stop()
+        worker.enqueue(self.path, self.cache_root) # Ignored after stop
+        self.assertEqual(worker.pending_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
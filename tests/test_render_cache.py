@@ -0,0 +1,110 @@
+import gc
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.data_model import ImageChannel
+from src.core.enhance import EnhanceProcessor
+from src.core.preview_controller import collect_stage_times
+from src.core.render_cache import EnhanceStageCache, RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = RenderCache()
+        self.cache._budget = 64 * 1024 * 1024
+        rng = np.random.default_rng(11)
+        self.channel = ImageChannel("", color="#00FF00", data=rng.integers(0, 4096, (120, 160), dtype=np.uint16))
+        self.channel.display_settings.max_val = 3000
+
+    def test_hit_returns_shared_read_only_render(self):
+        first = self.cache.render(self.channel, (60, 80))
+        self.assertEqual(first.shape, (60, 80, 3))
+        self.assertFalse(first.flags.writeable)
+        self.assertIs(self.cache.render(self.channel, (60, 80)), first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_display_settings_change_misses(self):
+        first = self.cache.render(self.channel, None)
+        self.channel.display_settings.max_val = 1500
+        second = self.cache.render(self.channel, None)
+        self.assertIsNot(second, first)
+        self.channel.display_settings.max_val = 3000
+        self.assertIs(self.cache.render(self.channel, None), first) # Returning to earlier settings hits
+
+    def test_data_change_drops_channel_entries(self):
+        self.cache.render(self.channel, None)
+        self.cache.render(self.channel, (60, 80))
+        self.channel.update_data(self.channel.raw_data // 2)
+        self.cache.render(self.channel, None)
+        self.assertEqual(len(self.cache._entries), 1)
+        self.assertEqual(self.cache.used_bytes, 120 * 160 * 3)
+
+    def test_budget_trims_least_recently_used(self):
+        self.cache._budget = 2 * 120 * 160 * 3
+        for max_val in (1000, 2000, 3000):
+            self.channel.display_settings.max_val = max_val
+            self.cache.render(self.channel, None)
+        self.assertEqual(len(self.cache._entries), 2)
+        self.assertLessEqual(self.cache.used_bytes, self.cache._budget)
+        self.channel.display_settings.max_val = 1000
+        self.assertIsNone(self.cache.get(self.channel, None))
+
+    def test_released_channel_is_purged(self):
+        self.cache.render(self.channel, None)
+        self.channel = None
+        gc.collect()
+        self.assertEqual(len(self.cache._entries), 0)
+        self.assertEqual(self.cache.used_bytes, 0)
+
+
+class TestEnhanceStageCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = EnhanceStageCache()
+        self.cache._budget = 64 * 1024 * 1024
+        rng = np.random.default_rng(3)
+        self.channel = ImageChannel("", color="#00FF00", data=rng.integers(0, 4096, (120, 160), dtype=np.uint16))
+        self.params = {'bg_enabled': True, 'bg_strength': 0.8, 'bg_kernel': 15,
+                       'noise_enabled': True, 'noise_sigma': 1.0,
+                       'stretch_enabled': True, 'stretch_clip': 2.0, 'gamma_enabled': True, 'gamma': 1.2}
+
+    def run_pipeline(self, params):
+        with collect_stage_times() as stages:
+            result = EnhanceProcessor.apply_pipeline(self.channel.raw_data, params,
+                                                     stage_cache=self.cache.for_input(self.channel, (None,)))
+        return result, set(stages)
+
+    def test_downstream_change_reuses_upstream_stages(self):
+        _, ran = self.run_pipeline(self.params)
+        self.assertEqual(ran, {'bg', 'noise', 'stretch', 'gamma'})
+
+        params = dict(self.params, gamma=0.8)
+        result, ran = self.run_pipeline(params)
+        self.assertEqual(ran, {'gamma'})
+        np.testing.assert_array_equal(result, EnhanceProcessor.apply_pipeline(self.channel.raw_data, params))
+
+        # Disabling a stage keeps the chain before it; unchanged settings run nothing
+        _, ran = self.run_pipeline(dict(self.params, stretch_enabled=False))
+        self.assertEqual(ran, {'gamma'})
+        _, ran = self.run_pipeline(self.params)
+        self.assertEqual(ran, set())
+
+    def test_upstream_change_reruns_downstream(self):
+        self.run_pipeline(self.params)
+        _, ran = self.run_pipeline(dict(self.params, noise_sigma=2.0))
+        self.assertEqual(ran, {'noise', 'stretch', 'gamma'})
+
+    def test_data_change_invalidates(self):
+        self.run_pipeline(self.params)
+        self.channel.update_data(self.channel.raw_data // 2)
+        result, ran = self.run_pipeline(self.params)
+        self.assertEqual(ran, {'bg', 'noise', 'stretch', 'gamma'})
+        np.testing.assert_array_equal(result, EnhanceProcessor.apply_pipeline(self.channel.raw_data, self.params))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PySide6.QtCore import QCoreApplication
+
+from src.core.data_model import ImageChannel
+from src.core.render_cache import render_signature
+from src.core.render_scheduler import RenderScheduler
+
+
+class TestRenderScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.scheduler = RenderScheduler(max_threads=2)
+        self.frames = []
+        self.scheduler.frame_ready.connect(lambda gen, images, ctx: self.frames.append((gen, images, ctx)))
+        self.channels = [ImageChannel("", color=c, data=np.arange(256 * 256, dtype=np.uint16).reshape(256, 256))
+                         for c in ("#FF0000", "#00FF00")]
+
+    def deliver(self):
+        self.scheduler.wait()
+        QCoreApplication.processEvents()
+
+    def test_only_latest_generation_is_delivered(self):
+        jobs = {i: (ch, (64, 64)) for i, ch in enumerate(self.channels)}
+        for _ in range(5):
+            last = self.scheduler.submit(jobs, context="ctx")
+        self.deliver()
+
+        self.assertEqual(len(self.frames), 1)
+        generation, images, context = self.frames[0]
+        self.assertEqual(generation, last)
+        self.assertEqual(context, "ctx")
+        self.assertEqual(set(images), {0, 1})
+        self.assertEqual(images[0].shape, (64, 64, 3))
+        self.assertFalse(self.scheduler.is_pending())
+
+    def test_cancel_drops_frame_in_flight(self):
+        self.scheduler.submit({0: (self.channels[0], None)})
+        self.scheduler.cancel()
+        self.deliver()
+        self.assertEqual(self.frames, [])
+
+    def test_render_signature_tracks_render_affecting_changes(self):
+        ch, other = self.channels
+        sig = render_signature(ch, (64, 64))
+        self.assertEqual(sig, render_signature(ch, (64, 64)))
+        self.assertNotEqual(sig, render_signature(ch, (32, 32)))
+        self.assertNotEqual(sig, render_signature(other, (64, 64)))
+
+        ch.display_settings.max_val = 1000
+        changed = render_signature(ch, (64, 64))
+        self.assertNotEqual(sig, changed)
+        ch.display_settings.enhance_params = {'gamma_enabled': True, 'gamma': 0.8}
+        self.assertNotEqual(changed, render_signature(ch, (64, 64)))
+
+        before = render_signature(ch, (64, 64))
+        ch.update_data(ch.raw_data[:128])
+        self.assertNotEqual(before, render_signature(ch, (64, 64)))
+
+
+if __name__ == '__main__':
+    unittest.main()
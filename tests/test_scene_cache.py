@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.cache_manager import SceneCacheManager
+from src.core.data_model import ImageChannel
+
+
+class TestSceneCacheBudget(unittest.TestCase):
+    def setUp(self):
+        self.manager = SceneCacheManager()
+        self.manager.get_policy = lambda: "recent"
+        self.manager.get_budget_bytes = lambda: 3 * 1024 * 1024
+
+    def make_scene(self):
+        # 1 MB of uint16 raw data per channel
+        return [ImageChannel("", data=np.zeros((512, 1024), dtype=np.uint16))]
+
+    def test_memory_bytes_counts_shared_buffers_once(self):
+        ch = self.make_scene()[0]
+        ch._pyramid_levels[1] = ch.raw_data[:256]
+        self.assertEqual(ch.memory_bytes(), 1024 * 1024)
+
+    def test_lru_eviction_within_budget(self):
+        scenes = {sid: self.make_scene() for sid in "abcd"}
+        for sid in "abc":
+            self.manager.set_current_scene(sid)
+            self.manager.store_scene(sid, scenes[sid])
+        self.manager.get_scene("a")  # "b" becomes least recently used
+
+        self.manager.set_current_scene("d")
+        self.manager.store_scene("d", scenes["d"])
+
+        self.assertFalse(self.manager.contains("b"))
+        self.assertIsNone(scenes["b"][0].raw_data)
+        for sid in "acd":
+            self.assertTrue(self.manager.contains(sid))
+        self.assertLessEqual(self.manager.get_stats()["bytes"], 3 * 1024 * 1024)
+
+    def test_aggressive_policy_is_not_bound_by_budget(self):
+        self.manager.get_policy = lambda: "all"
+        for sid in "abcd":
+            self.manager.set_current_scene(sid)
+            self.manager.store_scene(sid, self.make_scene())
+        self.assertTrue(self.manager.store_prefetched("e", self.make_scene()))
+        self.assertEqual(self.manager.get_stats()["scenes"], 5)
+
+        self.manager.handle_low_memory()
+        self.assertEqual(self.manager.get_stats()["scenes"], 1)
+
+    def test_current_scene_is_never_evicted(self):
+        self.manager.get_budget_bytes = lambda: 1
+        self.manager.set_current_scene("a")
+        self.manager.store_scene("a", self.make_scene())
+        self.assertTrue(self.manager.contains("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import tifffile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PySide6.QtCore import QCoreApplication
+
+from src.core.cache_manager import SceneCacheManager
+from src.core.project_model import ProjectModel
+from src.core.scene_prefetcher import ScenePrefetcher
+
+
+class TestScenePrefetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.model = ProjectModel()
+        paths = []
+        for name in ("a", "b", "c"):
+            path = os.path.join(self.tmp_dir, f"{name}_DAPI.tif")
+            tifffile.imwrite(path, np.full((64, 64), 100, dtype=np.uint16))
+            paths.append(path)
+        self.model._add_files_internal(paths)
+
+        self.cache = SceneCacheManager()
+        self.cache.get_policy = lambda: "recent"
+        self.cache.get_budget_bytes = lambda: 64 * 1024 * 1024
+        self._orig_instance = SceneCacheManager._instance
+        SceneCacheManager._instance = self.cache
+
+        self.prefetcher = ScenePrefetcher(self.model, lambda: ["a", "b", "c"])
+        self.prefetcher._idle_timer.setInterval(0)
+
+    def tearDown(self):
+        self.prefetcher.shutdown()
+        SceneCacheManager._instance = self._orig_instance
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def spin(self, condition, timeout=10.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        return condition()
+
+    def test_prefetches_neighbours(self):
+        self.cache.set_current_scene("b")
+        self.prefetcher.scene_ready("b")
+        self.assertTrue(self.spin(lambda: self.cache.contains("a") and self.cache.contains("c")))
+        self.assertEqual(self.cache.get_scene("c")[0].raw_data.shape, (64, 64))
+
+    def test_cancel_discards_results(self):
+        self.cache.set_current_scene("a")
+        self.prefetcher.scene_ready("a")
+        self.assertTrue(self.spin(lambda: self.prefetcher._worker is not None))
+        self.prefetcher.cancel()
+        self.spin(lambda: not self.prefetcher._live_workers, timeout=2.0)
+        self.assertFalse(self.cache.contains("b"))
+
+    def test_hand_over_adopts_inflight_load(self):
+        self.cache.set_current_scene("a")
+        self.prefetcher.scene_ready("a")
+        self.assertTrue(self.spin(lambda: self.prefetcher._worker is not None))
+        scene_id = self.prefetcher._worker_scene
+        loaded, finished = {}, []
+        # What load_scene does when the user opens the scene being prefetched
+        self.prefetcher.cancel(keep_scene=scene_id)
+        self.assertTrue(self.prefetcher.hand_over(scene_id, lambda sid, i, ch, d: loaded.__setitem__(i, ch), finished.append))
+        self.assertTrue(self.spin(lambda: finished == [scene_id]))
+        self.assertEqual(loaded[0].raw_data.shape, (64, 64))
+        self.assertFalse(self.cache.contains(scene_id)) # Stored by the view, not as a prefetch
+        self.assertFalse(self.prefetcher.hand_over("c", lambda *a: None, lambda *a: None))
+
+
+if __name__ == '__main__':
+    unittest.main()
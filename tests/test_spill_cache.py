@@ -0,0 +1,100 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.spill_cache import EvictedChannelStore
+from src.core.data_model import ImageChannel
+
+
+class TestEvictedChannelStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "sample_DAPI.tif")
+        with open(self.path, "wb") as f:
+            f.write(b"placeholder")
+        self.store = EvictedChannelStore()
+        self.store._memory_budget = 64 * 1024 * 1024
+        self.store._disk_budget = 64 * 1024 * 1024
+
+    def tearDown(self):
+        self.store._pool.waitForDone()
+        self.store.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def put(self, data):
+        ch = ImageChannel(self.path, name="DAPI", data=data)
+        self.store.put_channel(ch)
+        self.store._pool.waitForDone()
+        return ch
+
+    def test_compressible_data_round_trips_through_memory_tier(self):
+        data = np.zeros((256, 256), dtype=np.uint16)
+        data[10:20, 10:20] = 1000
+        self.put(data)
+
+        stats = self.store.get_stats()
+        self.assertEqual(stats["memory_entries"], 1)
+        self.assertLess(stats["memory_bytes"], data.nbytes)
+        restored = self.store.get(self.path, "DAPI")
+        np.testing.assert_array_equal(restored, data)
+        self.assertIsNone(self.store.get(self.path, "GFP"))
+
+    def test_noise_spills_to_disk_as_memmap(self):
+        data = np.random.default_rng(0).integers(0, 65535, (256, 256), dtype=np.uint16)
+        self.put(data)
+
+        self.assertEqual(self.store.get_stats()["disk_entries"], 1)
+        restored = self.store.get(self.path, "DAPI")
+        self.assertIsInstance(restored, np.memmap)
+        np.testing.assert_array_equal(restored, data)
+
+    def test_mapped_spill_file_is_removed_after_release(self):
+        data = np.random.default_rng(1).integers(0, 65535, (256, 256), dtype=np.uint16)
+        self.put(data)
+        restored = self.store.get(self.path, "DAPI")
+        path = restored.filename
+        with self.store._lock:
+            self.store._disk_budget = 0
+            self.store._trim_locked()
+        self.assertEqual(self.store.get_stats()["disk_entries"], 0)
+        self.assertTrue(os.path.exists(path)) # Still mapped by the restored channel
+        np.testing.assert_array_equal(restored, data)
+
+        del restored
+        with self.store._lock:
+            self.store._trim_locked()
+        self.assertFalse(os.path.exists(path))
+
+    def test_memory_overflow_is_demoted_to_disk(self):
+        data = np.zeros((256, 256), dtype=np.uint16)
+        self.put(data)
+        with self.store._lock:
+            self.store._memory_budget = 0
+            self.store._trim_locked()
+        self.store._pool.waitForDone()
+
+        stats = self.store.get_stats()
+        self.assertEqual(stats["memory_entries"], 0)
+        self.assertEqual(stats["disk_entries"], 1)
+        np.testing.assert_array_equal(self.store.get(self.path, "DAPI"), data)
+
+    def test_changed_file_or_modified_channel_is_not_served(self):
+        data = np.zeros((64, 64), dtype=np.uint16)
+        self.put(data)
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNone(self.store.get(self.path, "DAPI"))
+
+        ch = ImageChannel(self.path, name="DAPI", data=data)
+        ch.update_data(data[:32])
+        self.assertFalse(self.store.is_eligible(ch))
+
+
+if __name__ == '__main__':
+    unittest.main()
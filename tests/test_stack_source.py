@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import tifffile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.stack_source import StackSource
+from src.core.data_model import ImageChannel
+from src.core.image_loader import ImageLoader
+from src.core.workers import SceneLoaderWorker
+
+
+class TestStackSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.stack = (np.arange(5 * 16 * 16, dtype=np.uint16) % 1000).reshape(5, 16, 16)
+        self.path = os.path.join(self.tmp_dir, "zstack.tif")
+        tifffile.imwrite(self.path, self.stack, imagej=True, metadata={'axes': 'ZYX'})
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+        os.rmdir(self.tmp_dir)
+
+    def test_read_plane_and_projections(self):
+        src = StackSource.open(self.path)
+        self.assertIsNotNone(src)
+        try:
+            self.assertEqual(src.plane_count, 5)
+            self.assertEqual(src.plane_coords(3), {'Z': 3})
+            np.testing.assert_array_equal(src.read_plane(2), self.stack[2])
+            np.testing.assert_array_equal(src.projection("max"), self.stack.max(axis=0))
+            np.testing.assert_array_equal(src.projection("min", 1, 4), self.stack[1:4].min(axis=0))
+            np.testing.assert_allclose(src.projection("sum"), self.stack.sum(axis=0).astype(np.float32))
+            # Cached result is returned for the same range
+            self.assertIs(src.projection("max"), src.projection("max", 0, 5))
+        finally:
+            src.close()
+
+    def test_signed_stack_projections(self):
+        path = os.path.join(self.tmp_dir, "signed.tif")
+        signed = (self.stack.astype(np.int16) - 500)[:3]
+        tifffile.imwrite(path, signed, imagej=True, metadata={'axes': 'ZYX'})
+        src = StackSource.open(path)
+        self.assertIsNotNone(src)
+        try:
+            np.testing.assert_array_equal(src.projection("sum"), signed.astype(np.int64).sum(axis=0).astype(np.float32))
+            np.testing.assert_array_equal(src.projection("mean"), np.rint(signed.mean(axis=0)).astype(np.int16))
+        finally:
+            src.close()
+
+    def test_closed_stack_is_not_reopened(self):
+        src = StackSource.open(self.path)
+        src.read_plane(0)
+        src.close()
+        with self.assertRaises(ValueError):
+            src.read_plane(1)
+        self.assertFalse(src.is_open)
+
+    def test_cancelled_load_closes_opened_stack(self):
+        opened = []
+        worker = SceneLoaderWorker("s1", [mock.Mock(path=self.path, color="#FFFFFF", channel_type="DAPI")])
+        open_source = ImageLoader.open_source
+
+        def open_then_cancel(*args, **kwargs):
+            result = open_source(*args, **kwargs)
+            opened.append(result[1])
+            worker.cancel() # Abandoned while the file was being read
+            return result
+
+        with mock.patch.object(ImageLoader, 'open_source', side_effect=open_then_cancel):
+            worker.run()
+        self.assertEqual(len(opened), 1)
+        self.assertFalse(opened[0].is_open)
+
+    def test_channel_owns_its_stack_reference(self):
+        ch = ImageChannel(self.path, name="DAPI")
+        stack = ch.stack
+        ch.set_plane(2)
+        np.testing.assert_array_equal(ch.raw_data, self.stack[2])
+        self.assertFalse(ch.data_modified) # Switching planes is not an edit
+        self.assertIs(ch.stack, stack)
+
+        clone = ch.clone()
+        ch.unload_raw_data()
+        self.assertTrue(stack.is_open) # Still used by the clone
+        np.testing.assert_array_equal(clone.stack.read_plane(4), self.stack[4])
+
+        clone.update_data(self.stack[0, :8])
+        self.assertTrue(clone.data_modified)
+        self.assertIsNone(clone.stack)
+        self.assertFalse(stack.is_open) # Released by its last owner
+
+    def test_rejects_single_plane_and_rgb_like_files(self):
+        single = os.path.join(self.tmp_dir, "single.tif")
+        tifffile.imwrite(single, self.stack[0])
+        self.assertIsNone(StackSource.open(single))
+
+        rgb_like = os.path.join(self.tmp_dir, "rgb_like.tif")
+        tifffile.imwrite(rgb_like, self.stack[:3], photometric='minisblack')
+        self.assertIsNone(StackSource.open(rgb_like))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import tifffile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.data_model import ImageChannel
+from src.core.enhance import EnhanceProcessor
+from src.core.image_renderer import ImageRenderer
+
+
+class TestTileRender(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.channels = []
+        for color in ("#FF0000", "#FFFF00"):
+            ch = ImageChannel("", color=color, data=rng.integers(0, 4096, (300, 400), dtype=np.uint16))
+            ch.display_settings.min_val = 0
+            ch.display_settings.max_val = 2000
+            self.channels.append(ch)
+
+    def lut_rgb(self, ch, block):
+        s = ch.display_settings
+        return ImageRenderer.generate_rgb_lut(s.min_val, s.max_val, s.gamma, s.color)[block]
+
+    def test_tile_matches_region_of_full_render(self):
+        ch = self.channels[0]
+        tile = ImageRenderer.render_tile([ch], 100, 228, 256, 400)
+        np.testing.assert_array_equal(tile, self.lut_rgb(ch, ch.raw_data[100:228, 256:400]))
+
+        coarse = ImageRenderer.render_tile([ch], 0, 256, 0, 256, downsample=4)
+        self.assertEqual(coarse.shape, (64, 64, 3))
+        np.testing.assert_array_equal(coarse, self.lut_rgb(ch, ch.raw_data[0:256:4, 0:256:4]))
+
+    def test_merge_tile_saturates_and_skips_hidden(self):
+        a, b = self.channels
+        merged = ImageRenderer.render_tile(self.channels, 0, 64, 0, 64)
+        expected = np.minimum(self.lut_rgb(a, a.raw_data[:64, :64]).astype(int)
+                              + self.lut_rgb(b, b.raw_data[:64, :64]), 255)
+        np.testing.assert_array_equal(merged, expected)
+
+        b.display_settings.visible = False
+        np.testing.assert_array_equal(ImageRenderer.render_tile(self.channels, 0, 64, 0, 64),
+                                      self.lut_rgb(a, a.raw_data[:64, :64]))
+
+    def test_enhanced_region_matches_whole_image(self):
+        ch = self.channels[0]
+        params = {'bg_enabled': True, 'bg_strength': 0.8, 'bg_kernel': 30,
+                  'contrast_enabled': True, 'contrast_clip': 0.02, 'contrast_tile': 8,
+                  'noise_enabled': True, 'noise_sigma': 1.5, 'stretch_enabled': True, 'stretch_clip': 2.0}
+        ch.display_settings.enhance_params = params
+        reference = ImageRenderer._enhance_reference(ch, params)
+        for downsample in (1, 2):
+            whole = EnhanceProcessor.apply_pipeline(ch.raw_data[::downsample, ::downsample], params,
+                                                    scale_factor=1.0 / downsample, reference=dict(reference))
+            for y0, y1, x0, x1 in ((128, 256, 128, 256), (0, 100, 256, 400), (256, 300, 0, 128)):
+                expected = whole[y0 // downsample:-(-y1 // downsample), x0 // downsample:-(-x1 // downsample)]
+                np.testing.assert_array_equal(ImageRenderer.render_tile([ch], y0, y1, x0, x1, downsample),
+                                              self.lut_rgb(ch, expected))
+
+    def test_enhanced_tiles_match_overview(self):
+        ch = self.channels[0]
+        ch.display_settings.enhance_params = {'noise_enabled': True, 'noise_sigma': 1.5,
+                                              'stretch_enabled': True, 'stretch_clip': 2.0}
+        overview = ImageRenderer.render_channel(ch, target_shape=(150, 200), integer_output=True)
+        # Same stretch levels and noise range as the overview: no seams where tiles cover it
+        np.testing.assert_array_equal(ImageRenderer.render_tile([ch], 128, 256, 128, 256, downsample=2),
+                                      overview[64:128, 64:128])
+
+    def test_full_frame_render_does_not_use_reference(self):
+        # Large enough that the shared reference comes from a decimated copy
+        data = np.random.default_rng(9).gamma(2.0, 300.0, (2100, 1200)).astype(np.uint16)
+        ch = ImageChannel("", color="#FF0000", data=data)
+        ch.display_settings.min_val, ch.display_settings.max_val = 0, 2000
+        params = {'noise_enabled': True, 'noise_sigma': 1.5, 'stretch_enabled': True, 'stretch_clip': 2.0}
+        ch.display_settings.enhance_params = params
+        ImageRenderer.render_channel(ch, target_shape=(700, 400), integer_output=True) # Display render first
+        full = ImageRenderer.render_channel(ch, integer_output=True)
+        np.testing.assert_array_equal(full, self.lut_rgb(ch, EnhanceProcessor.apply_pipeline(ch.raw_data, params)))
+
+    def test_pyramid_region_reads_reduced_level(self):
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "slide.tif")
+        base = (np.arange(2048 * 1536, dtype=np.uint32) % 4000).astype(np.uint16).reshape(2048, 1536)
+        with tifffile.TiffWriter(path) as tw:
+            tw.write(base, subifds=2, tile=(256, 256))
+            tw.write(base[::2, ::2], subfiletype=1, tile=(256, 256))
+            tw.write(base[::4, ::4], subfiletype=1, tile=(256, 256))
+        ch = ImageChannel(path, "#00FF00", "GFP")
+        try:
+            for downsample in (1, 2, 4, 8):
+                region = ch.read_region(1000, 2048, 500, 1536, downsample=downsample)
+                np.testing.assert_array_equal(region, base[1000:2048:downsample, 500:1536:downsample])
+            self.assertEqual(ch.sample_value(1500, 700), base[1500, 700])
+            self.assertIsNone(ch._raw_data) # Base level never decoded
+        finally:
+            ch.unload_raw_data()
+            os.remove(path)
+            os.rmdir(tmp_dir)
+
+
+    def test_tiles_render_off_the_paint_call(self):
+        from PySide6.QtCore import QRectF
+        from PySide6.QtGui import QImage, QPainter
+        from PySide6.QtWidgets import QApplication, QGraphicsScene
+        from src.gui.tiled_image_item import TiledImageItem, _TileRenderer
+        app = QApplication.instance() or QApplication([])
+        ch = self.channels[0]
+        item = TiledImageItem(lambda: [ch])
+        scene = QGraphicsScene()
+        scene.addItem(item)
+        item.set_image_geometry(400, 300, 0.25)
+
+        def paint():
+            image = QImage(400, 300, QImage.Format.Format_RGB32)
+            painter = QPainter(image)
+            scene.render(painter, QRectF(0, 0, 400, 300), QRectF(0, 0, 400, 300))
+            painter.end()
+
+        paint()
+        self.assertEqual(len(item._tiles), 0) # Requested, not rendered in paint()
+        self.assertEqual(len(item._pending), 4)
+        _TileRenderer.pool().waitForDone()
+        app.processEvents()
+        self.assertEqual(len(item._tiles), 4)
+        self.assertEqual(len(item._pending), 0)
+
+        ch.display_settings.max_val = 1000 # New settings: old tiles are drawn until replaced
+        paint()
+        self.assertEqual((len(item._tiles), len(item._stale_tiles)), (0, 4))
+        _TileRenderer.pool().waitForDone()
+        app.processEvents()
+        self.assertEqual((len(item._tiles), len(item._stale_tiles)), (4, 0))
+
+        ch.display_settings.max_val = 1500
+        paint()
+        item.set_image_geometry(300, 300, 0.25) # Results of requests before a reset are dropped
+        _TileRenderer.pool().waitForDone()
+        app.processEvents()
+        self.assertEqual((len(item._tiles), len(item._stale_tiles)), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()